@@ -5,7 +5,10 @@ from src.ui.tabs.mask import MaskTool
 from src.ui.tabs.morphology import MorphologyTool
 from src.ui.tabs.glcm import GLCMTool
 from src.ui.tabs.edge import EdgeDetectionTool
+from src.ui.tabs.pipeline import PipelineTool
 from src.utils import lang_labels, update_ui_language_dynamic
+from src.ui.concurrency import queue_options, launch_options
+from src.processing import start_process_pool
 
 def create_ui():
     """Create the main UI"""
@@ -25,7 +28,8 @@ def create_ui():
         morphology_tool = MorphologyTool()
         glcm_tool = GLCMTool()
         edge_tool = EdgeDetectionTool()
-        tools = [resizer_tool, cropper_tool, mask_tool, morphology_tool, glcm_tool, edge_tool]  
+        pipeline_tool = PipelineTool()
+        tools = [resizer_tool, cropper_tool, mask_tool, morphology_tool, glcm_tool, edge_tool, pipeline_tool]  
         
         with gr.Tabs() as tabs:
             resizer = resizer_tool.create_tab(lang_dropdown)
@@ -34,6 +38,7 @@ def create_ui():
             morphology = morphology_tool.create_tab(lang_dropdown)
             glcm = glcm_tool.create_tab(lang_dropdown)
             edge = edge_tool.create_tab(lang_dropdown)
+            pipeline = pipeline_tool.create_tab(lang_dropdown)
         
         def on_language_change(lang):
             return update_ui_language_dynamic(lang, tools, title)
@@ -53,4 +58,6 @@ def create_ui():
 
 if __name__ == "__main__":
     demo = create_ui()
-    demo.queue().launch(debug=True)
\ No newline at end of file
+    # Start the processing workers now; process batches run on them too
+    start_process_pool()
+    demo.queue(**queue_options()).launch(debug=True, **launch_options())
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Load + aspect resize time of a large photo, decoded in full versus reduced
+on decode by utils.read_image (JPEG draft mode, Image.reduce otherwise).
+
+    python benchmarks/decode_time.py [--width 6000] [--height 4000] [--size 512] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import read_image, image_cache
+from src.processing import aspect_resize
+
+
+def best_time(call, repeat):
+    times = []
+    for _ in range(repeat):
+        image_cache.clear()
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--size", type=int, default=512, help="aspect target size")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="decode_time_")
+    y, x = np.mgrid[0:args.height, 0:args.width]
+    pixels = np.stack([x * 255 // args.width, y * 255 // args.height, (x ^ y) & 255], axis=-1)
+    image = Image.fromarray(pixels.astype(np.uint8))
+
+    print(f"{args.width}x{args.height} -> {args.size}")
+    for ext in (".jpg", ".png"):
+        path = os.path.join(folder, "photo" + ext)
+        image.save(path, quality=90)
+        full = best_time(lambda: aspect_resize(read_image(path), args.size), args.repeat)
+        reduced = best_time(lambda: aspect_resize(read_image(path, long_side=args.size), args.size),
+                            args.repeat)
+        print(f"{ext:<5} full decode {full:7.1f} ms   reduced decode {reduced:7.1f} ms   "
+              f"({full / reduced:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
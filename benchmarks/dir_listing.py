@@ -0,0 +1,64 @@
+"""
+Refresh cost of a large input folder: a full os.listdir scan per click versus
+the shared directory index (one stat while the folder is unchanged).
+
+    python benchmarks/dir_listing.py [--files 100000] [--repeat 20] [--folder PATH]
+
+Pass --folder to measure an existing (e.g. network) folder instead of a
+generated one.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import DirectoryIndex, IMAGE_EXTENSIONS
+
+
+def listdir_scan(folder):
+    """What every refresh did before the index"""
+    return [f for f in os.listdir(folder) if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS]
+
+
+def timed(call, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--folder", help="existing folder to list")
+    args = parser.parse_args()
+
+    folder = args.folder
+    if folder is None:
+        folder = tempfile.mkdtemp(prefix="dir_listing_")
+        for i in range(args.files):
+            open(os.path.join(folder, f"scan_{i:06d}.png"), "wb").close()
+
+    index = DirectoryIndex()
+    start = time.perf_counter()
+    names = index.list(folder)
+    first = (time.perf_counter() - start) * 1000
+
+    # A folder modified in the last two seconds is rescanned once more
+    time.sleep(2)
+    index.list(folder)
+
+    print(f"{len(names)} image files in {folder}")
+    print(f"os.listdir + filter:      {timed(lambda: listdir_scan(folder), args.repeat):8.2f} ms per refresh")
+    print(f"index, first scan:        {first:8.2f} ms")
+    print(f"index, unchanged folder:  {timed(lambda: index.list(folder), args.repeat):8.2f} ms per refresh")
+    print(f"index, prefix page:       "
+          f"{timed(lambda: index.page(folder, 'scan_05', 1), args.repeat):8.2f} ms per refresh")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
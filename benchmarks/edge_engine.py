@@ -0,0 +1,78 @@
+"""
+Edge detection time of the OpenCV EdgeEngine against the previous
+skimage-based dispatch, per algorithm and for all six algorithms at once.
+
+    python benchmarks/edge_engine.py [--width 4000] [--height 3000] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import EDGE_ALGORITHMS, NORMALIZED_EDGE_ALGORITHMS, detect_edges, detect_edges_multi
+
+
+def skimage_edges(image, algorithm, canny_low=50, canny_high=150, sigma=1.0):
+    """The previous implementation: skimage filters on float64, cv2 for Laplacian"""
+    import cv2
+    from skimage import feature, filters
+
+    gray_image = np.array(image.convert("L"))
+    if algorithm == "Roberts":
+        result = (filters.roberts(gray_image) * 255).astype(np.uint8)
+    elif algorithm == "Sobel":
+        result = (filters.sobel(gray_image) * 255).astype(np.uint8)
+    elif algorithm == "Prewitt":
+        result = (filters.prewitt(gray_image) * 255).astype(np.uint8)
+    elif algorithm == "Laplacian":
+        result = cv2.Laplacian(gray_image, cv2.CV_64F)
+    elif algorithm == "LoG":
+        result = filters.laplace(filters.gaussian(gray_image, sigma=sigma))
+    else:
+        result = feature.canny(gray_image, low_threshold=canny_low, high_threshold=canny_high)
+        result = (result * 255).astype(np.uint8)
+    if algorithm in NORMALIZED_EDGE_ALGORITHMS:
+        result = cv2.normalize(result, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    return Image.fromarray(result)
+
+
+def best_time(call, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:args.height, 0:args.width]
+    pixels = (np.sin(x / 17) * np.cos(y / 23) + 1) * 110 + rng.normal(0, 12, x.shape)
+    image = Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).convert("RGB")
+
+    print(f"{args.width}x{args.height}")
+    old_total = new_total = 0
+    for algorithm in EDGE_ALGORITHMS:
+        old = best_time(lambda: skimage_edges(image, algorithm), args.repeat)
+        new = best_time(lambda: detect_edges(image, algorithm), args.repeat)
+        old_total, new_total = old_total + old, new_total + new
+        print(f"{algorithm:<10} skimage {old:8.1f} ms   engine {new:8.1f} ms   ({old / new:.1f}x)")
+    multi = best_time(lambda: detect_edges_multi(image), args.repeat)
+    print(f"{'all six':<10} skimage {old_total:8.1f} ms   engine {new_total:8.1f} ms   "
+          f"multi {multi:8.1f} ms   ({old_total / multi:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Encode time and file size of each encoding profile on the kinds of outputs
+the tabs save: a photo-like RGB image, a grayscale edge map and a binary
+mask, each given a .png and a .jpg output name.
+
+    python benchmarks/encoding_profiles.py [--width 2000] [--height 1500] [--repeat 3]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import ENCODING_PROFILES, encode_output
+
+
+def sample_outputs(width, height):
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    photo = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    photo = photo + rng.normal(0, 6, photo.shape)
+    photo = Image.fromarray(np.clip(photo, 0, 255).astype(np.uint8)).filter(ImageFilter.GaussianBlur(1))
+    mask = Image.new("L", (width, height), 0)
+    draw = ImageDraw.Draw(mask)
+    for _ in range(40):
+        draw.line([tuple(rng.integers(0, min(width, height), 2)) for _ in range(4)], fill=255, width=9)
+    edges = mask.filter(ImageFilter.FIND_EDGES).filter(ImageFilter.GaussianBlur(1.5))
+    return {"photo": photo, "edge map": edges, "binary mask": mask}
+
+
+def encode(image, path, encoding):
+    """(image as written, path, encoded bytes) of one save to memory"""
+    image, path, params = encode_output(image, path, encoding)
+    params.setdefault("format", Image.registered_extensions()[os.path.splitext(path)[1].lower()])
+    buffer = io.BytesIO()
+    image.save(buffer, **params)
+    return image, path, buffer.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=2000)
+    parser.add_argument("--height", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.width}x{args.height}, best of {args.repeat}")
+    print(f"{'output':<12} {'name':<8} {'profile':<8} {'written as':<14} {'ms':>7} {'KiB':>8}")
+    for kind, image in sample_outputs(args.width, args.height).items():
+        for name in ("out.png", "out.jpg"):
+            for encoding in ENCODING_PROFILES:
+                times = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    written, path, size = encode(image, name, encoding)
+                    times.append(time.perf_counter() - start)
+                written = f"{os.path.splitext(path)[1][1:]} {written.mode}"
+                print(f"{kind:<12} {name:<8} {encoding:<8} {written:<14} "
+                      f"{min(times) * 1000:7.0f} {size / 1024:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Rendering a folder of masks over one source image: process_mask per mask
+(the generic batch path) against process_mask_set, which decodes and resizes
+the source once per mask size and composites the masks in vectorized chunks.
+
+    python benchmarks/mask_set.py [--masks 150] [--workers 4]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import process_mask, process_mask_set, process_batch
+from src.utils import image_cache
+
+# Mask sizes, used in turn
+MASK_SIZES = ((1024, 768), (768, 1024), (1024, 1024))
+
+
+def timed(run, out_dir):
+    shutil.rmtree(out_dir, ignore_errors=True)
+    image_cache.clear()
+    start = time.perf_counter()
+    for _ in run():
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--masks", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="mask_set_")
+    mask_dir = os.path.join(folder, "masks")
+    os.makedirs(mask_dir)
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:3000, 0:4000]
+    source = np.stack([x * 255 // 4000, y * 255 // 3000, (x ^ y) & 255], axis=-1)
+    Image.fromarray(source.astype(np.uint8)).save(os.path.join(folder, "source.jpg"), quality=90)
+    for index in range(args.masks):
+        mask = Image.new("L", MASK_SIZES[index % len(MASK_SIZES)], 0)
+        draw = ImageDraw.Draw(mask)
+        for _ in range(8):
+            draw.line([tuple(rng.integers(0, 768, 2)) for _ in range(4)], fill=255, width=12)
+        mask.save(os.path.join(mask_dir, f"mask_{index:04d}.png"))
+
+    print(f"{args.masks} masks in {len(MASK_SIZES)} sizes, 4000x3000 source, {args.workers} workers")
+    for use_image in ("Yes", "No"):
+        out_dir = os.path.join(folder, "out")
+        mask_args = (folder, "source.jpg", use_image, out_dir, "", "English", "default")
+        per_mask = timed(lambda: process_batch(process_mask, mask_dir, mask_args, "English",
+                                               args.workers), out_dir)
+        mask_set = timed(lambda: process_mask_set(mask_dir, mask_args, "English",
+                                                  args.workers), out_dir)
+        print(f"source image {use_image:<3}  per mask {per_mask:6.2f} s   "
+              f"mask set {mask_set:6.2f} s   ({per_mask / mask_set:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-image time of a morphology chain over a batch of small images: the
+previous implementation (fresh kernels and a copy per operation) against the
+fused, in-place apply_morphology.
+
+    python benchmarks/morphology_batch.py [--images 2000] [--size 512] [--repeat 3]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import apply_morphology, morphology_passes
+
+# (erosion, dilation, opening, closing) chains to time
+CHAINS = ((3, None, None, None), (None, None, 3, 5), (3, 5, 3, 7))
+
+
+def previous_morphology(image, erosion=None, dilation=None, opening=None, closing=None):
+    """The previous implementation, kept here as the baseline"""
+    import cv2
+
+    img_array = np.array(image)
+    gray_img = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY) if img_array.ndim == 3 else img_array
+    _, binary_img = cv2.threshold(gray_img, 127, 255, cv2.THRESH_BINARY)
+    result = binary_img.copy()
+    if erosion is not None:
+        result = cv2.erode(result, np.ones((erosion, erosion), np.uint8), iterations=1)
+    if dilation is not None:
+        result = cv2.dilate(result, np.ones((dilation, dilation), np.uint8), iterations=1)
+    if opening is not None:
+        result = cv2.morphologyEx(result, cv2.MORPH_OPEN, np.ones((opening, opening), np.uint8))
+    if closing is not None:
+        result = cv2.morphologyEx(result, cv2.MORPH_CLOSE, np.ones((closing, closing), np.uint8))
+    return Image.fromarray(result)
+
+
+def per_image(fn, images, chain, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for image in images:
+            fn(image, *chain)
+        best = min(best, time.perf_counter() - start)
+    return best / len(images) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 256, (args.size, args.size), dtype=np.uint8))
+              for _ in range(min(args.images, 64))]
+    images = [images[i % len(images)] for i in range(args.images)]
+
+    print(f"{args.images} images of {args.size}x{args.size}")
+    for chain in CHAINS:
+        old = per_image(previous_morphology, images, chain, args.repeat)
+        new = per_image(apply_morphology, images, chain, args.repeat)
+        passes = len(morphology_passes(*chain))
+        print(f"chain {str(chain):<24} previous {old:7.0f} us   fused {new:7.0f} us   "
+              f"({passes} passes, {old / new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
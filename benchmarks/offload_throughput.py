@@ -0,0 +1,83 @@
+"""
+Throughput of a CPU-bound handler called from many threads at once, run in
+the calling threads (GIL-bound) versus offloaded to the warm process pool.
+Each user works on its own input file, since the pool runs every call on
+one file in the same worker.
+
+    python benchmarks/offload_throughput.py [--users 8] [--jobs 32] [--size 1024]
+
+Set PROCESS_WORKERS to size the pool (default: CPU count).
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import (process_edge_detection, process_glcm_features, run_in_process,
+                            start_process_pool, shutdown_process_pool, process_workers)
+from src.utils import image_cache
+
+HANDLERS = {
+    "edge": lambda folder, name, out: (process_edge_detection,
+                                       (folder, name, "Sobel", 50, 150, 1.0, out, "")),
+    "glcm": lambda folder, name, out: (process_glcm_features,
+                                       (folder, name, 1, ["0°"], 32, True, True,
+                                        True, True, True, True, True, True, "English", 16, 16)),
+}
+
+
+def measure(call, calls, users, jobs):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for future in [pool.submit(call, *calls[i % len(calls)]) for i in range(jobs)]:
+            future.result()
+    return jobs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--handler", choices=HANDLERS, default="edge")
+    parser.add_argument("--users", type=int, default=8, help="concurrent callers")
+    parser.add_argument("--jobs", type=int, default=32)
+    parser.add_argument("--size", type=int, default=1024)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="offload_")
+    out = os.path.join(folder, "out")
+    rng = np.random.default_rng(0)
+    calls = []
+    for user in range(args.users):
+        name = f"input{user}.png"
+        pixels = rng.integers(0, 256, (args.size, args.size, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(folder, name))
+        calls.append(HANDLERS[args.handler](folder, name, out))
+
+    for fn, fn_args in calls:
+        fn(*fn_args)  # warm the image cache and lazy imports
+    threaded = measure(lambda fn, fn_args: fn(*fn_args), calls, args.users, args.jobs)
+
+    start = time.perf_counter()
+    start_process_pool()
+    warmup = time.perf_counter() - start
+    for fn, fn_args in calls:
+        run_in_process(fn, *fn_args)
+    offloaded = measure(lambda fn, fn_args: run_in_process(fn, *fn_args),
+                        calls, args.users, args.jobs)
+    shutdown_process_pool()
+
+    print(f"{args.handler} on {args.size}x{args.size}, {args.users} concurrent users, "
+          f"{os.cpu_count()} CPUs, {process_workers()} pool workers")
+    print(f"threads:       {threaded:7.2f} jobs/s")
+    print(f"process pool:  {offloaded:7.2f} jobs/s  ({offloaded / threaded:.2f}x, "
+          f"pool warm-up {warmup:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Latency of a Process click with the save made before the handler returns
+(output_queue_size 0) against the background output writer: time until the
+pixels reach the UI and until the file is on disk.
+
+    python benchmarks/output_writer.py [--size 3000] [--repeat 3] [--out-dir DIR]
+
+Point --out-dir at a network share to measure a slow output folder.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import batch_handler, process_image_aspect
+
+
+def click(handler, folder, out_dir, size):
+    """(seconds until the first yield, seconds until the last one)"""
+    start = time.perf_counter()
+    first = None
+    for _ in handler(False, "", 1, "thread", folder, "source.png", size, False,
+                     out_dir, "", False, 0.5, 0, False, 2, "English", "default"):
+        first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    # Handlers run in this process, so only the save differs between the runs
+    os.environ["PROCESS_WORKERS"] = "0"
+    folder = tempfile.mkdtemp(prefix="output_writer_")
+    out_dir = args.out_dir or os.path.join(folder, "out")
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (3000, 4000, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(os.path.join(folder, "source.png"))
+    handler = batch_handler(process_image_aspect, out_filename_index=3)
+
+    print(f"4000x3000 noise PNG -> {args.size} px PNG in {out_dir}")
+    for label, queue_size in (("save, then return", "0"), ("background writer", "8")):
+        os.environ["OUTPUT_QUEUE_SIZE"] = queue_size
+        click(handler, folder, out_dir, args.size)
+        runs = [click(handler, folder, out_dir, args.size) for _ in range(args.repeat)]
+        pixels_ms = min(first for first, _ in runs) * 1000
+        saved_ms = min(last for _, last in runs) * 1000
+        print(f"{label:<18}  pixels shown {pixels_ms:7.0f} ms   file written {saved_ms:7.0f} ms")
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
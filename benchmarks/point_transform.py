@@ -0,0 +1,70 @@
+"""
+Binarize + blur finish of a large resized image: the previous RGB -> L -> 1
+-> RGB round trip with a three-channel blur, against the single-channel
+lookup-table stage (point_transform) the resizer and mask tabs now use.
+
+    python benchmarks/point_transform.py [--width 6000] [--height 4000] [--blur 2] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import binarize, point_transform
+
+
+def previous_finish(image, threshold, radius):
+    """The previous binarize + blur, kept here as the baseline"""
+    threshold = threshold * 255
+    binary = image.convert("L").point(lambda p: 255 if p > threshold else 0, mode="1")
+    return binary.convert("RGB").filter(ImageFilter.GaussianBlur(radius=radius))
+
+
+def lut_finish(image, threshold, radius):
+    return binarize(image, threshold).filter(ImageFilter.GaussianBlur(radius=radius))
+
+
+def best_time(call, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--blur", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:args.height, 0:args.width]
+    pixels = np.stack([x * 255 // args.width, y * 255 // args.height,
+                       rng.integers(0, 256, x.shape)], axis=-1)
+    image = Image.fromarray(pixels.astype(np.uint8))
+
+    print(f"{args.width}x{args.height}, threshold 0.5, blur {args.blur}")
+    old, old_result = best_time(lambda: previous_finish(image, 0.5, args.blur), args.repeat)
+    new, new_result = best_time(lambda: lut_finish(image, 0.5, args.blur), args.repeat)
+    same = np.array_equal(np.asarray(old_result)[..., 0], np.asarray(new_result))
+    for label, ms, result in (("previous", old, old_result), ("lookup table", new, new_result)):
+        size = len(result.getbands()) * result.width * result.height / 2**20
+        print(f"{label:<13} {ms:7.1f} ms   result {result.mode:<3} {size:6.1f} MiB")
+    print(f"{old / new:.1f}x faster, identical pixels: {same}")
+
+    lut = best_time(lambda: point_transform(image, 0.5, invert=True, gamma=1.8,
+                                            levels=(16, 240)), args.repeat)[0]
+    print(f"levels + gamma + threshold + invert as one lookup: {lut:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Load test: image preview latency while GLCM jobs keep the heavy group busy.
+
+    python benchmarks/queue_latency.py [--heavy-clients 4] [--preview-clients 4] [--duration 20]
+
+The app is launched in-process with the queue settings from the environment
+or config file (HEAVY_CONCURRENCY, LIGHT_CONCURRENCY, ...), e.g. compare
+
+    LIGHT_CONCURRENCY=1 python benchmarks/queue_latency.py
+
+which matches Gradio's default of one job per event.
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import statistics
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_images(folder, heavy_size, preview_size, preview_clients):
+    """One heavy image, and one preview image per client so outputs never collide"""
+    rng = np.random.default_rng(0)
+    sizes = {"heavy.png": heavy_size}
+    sizes.update({f"preview_{i}.png": preview_size for i in range(preview_clients)})
+    for name, size in sizes.items():
+        pixels = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(folder, name))
+
+
+def find_event(demo, fn_name):
+    fns = list(demo.fns.values()) if isinstance(demo.fns, dict) else list(demo.fns)
+    for index, block_fn in enumerate(fns):
+        if getattr(block_fn.fn, "__name__", "") == fn_name:
+            return index, block_fn
+    raise LookupError(fn_name)
+
+
+def find_refresh(demo, dropdown):
+    """fn_index of the refresh event filling `dropdown`, needed before selecting a file"""
+    fns = list(demo.fns.values()) if isinstance(demo.fns, dict) else list(demo.fns)
+    for index, block_fn in enumerate(fns):
+        if getattr(block_fn.fn, "__name__", "") == "refresh_list" and dropdown in block_fn.outputs:
+            return index
+    raise LookupError("refresh_list")
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def report(label, latencies):
+    if not latencies:
+        print(f"{label:<28} no samples")
+        return
+    print(f"{label:<28} n={len(latencies):4d}  p50={statistics.median(latencies) * 1000:7.1f} ms  "
+          f"p95={percentile(latencies, 95) * 1000:7.1f} ms  max={max(latencies) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--heavy-clients", type=int, default=4)
+    parser.add_argument("--preview-clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20, help="seconds per phase")
+    parser.add_argument("--heavy-size", type=int, default=1024)
+    parser.add_argument("--preview-size", type=int, default=512)
+    args = parser.parse_args()
+
+    from gradio_client import Client
+    import app
+    from src.ui.concurrency import queue_options, launch_options
+    from src.processing import start_process_pool
+
+    folder = tempfile.mkdtemp(prefix="queue_latency_")
+    make_images(folder, args.heavy_size, args.preview_size, args.preview_clients)
+
+    demo = app.create_ui()
+    start_process_pool()
+    port = free_port()
+    demo.queue(**queue_options()).launch(prevent_thread_lock=True, server_port=port,
+                                         quiet=True, **launch_options())
+    url = f"http://127.0.0.1:{port}/"
+
+    glcm_index, glcm_fn = find_event(demo, "_process_glcm_wrapper")
+    glcm_refresh = find_refresh(demo, glcm_fn.inputs[1])
+    preview_index, preview_fn = find_event(demo, "on_select_image")
+    preview_refresh = find_refresh(demo, preview_fn.inputs[1])
+
+    stop = threading.Event()
+    heavy_done = []
+
+    def heavy_client():
+        client = Client(url, verbose=False)
+        client.predict(folder, "", 1, fn_index=glcm_refresh)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                client.predict(folder, "heavy.png", 1, ["0°", "90°"], 64, True, True,
+                               True, True, True, True, True, True, "English", 16, 8,
+                               fn_index=glcm_index)
+            except Exception:
+                if stop.is_set():
+                    return  # server closed under a running job
+                raise
+            heavy_done.append(time.perf_counter() - start)
+
+    def preview_client(name, latencies, until):
+        client = Client(url, verbose=False)
+        client.predict(folder, "", 1, fn_index=preview_refresh)
+        while time.perf_counter() < until:
+            start = time.perf_counter()
+            client.predict(folder, name, fn_index=preview_index)
+            latencies.append(time.perf_counter() - start)
+
+    def run_previews():
+        latencies = []
+        until = time.perf_counter() + args.duration
+        threads = [threading.Thread(target=preview_client,
+                                    args=(f"preview_{i}.png", latencies, until))
+                   for i in range(args.preview_clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies
+
+    print(f"queue: {queue_options()}  launch: {launch_options()}")
+    try:
+        idle = run_previews()
+
+        heavy_threads = [threading.Thread(target=heavy_client, daemon=True)
+                         for _ in range(args.heavy_clients)]
+        for thread in heavy_threads:
+            thread.start()
+        time.sleep(2)
+        loaded = run_previews()
+        stop.set()
+    finally:
+        demo.close()
+
+    report("preview, idle", idle)
+    report(f"preview, {args.heavy_clients} GLCM clients", loaded)
+    report("GLCM job", heavy_done)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Response path of a Process click in the mask tab: the previous float64 copy
+(np.array(output) / 255.0) that Gradio had to convert back and encode,
+against display_result's uint8 image capped at display_size for the
+browser. Times the handler's return value plus Gradio's postprocess.
+
+    python benchmarks/result_transport.py [--width 4000] [--height 3000] [--repeat 3]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing import render_mask
+from src.utils import display_result, display_size
+
+
+def best_time(call, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GRADIO_TEMP_DIR", tempfile.mkdtemp(prefix="result_transport_"))
+    import gradio as gr
+
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:args.height, 0:args.width]
+    source = np.stack([x * 255 // args.width, y * 255 // args.height, (x ^ y) & 255], axis=-1)
+    source = Image.fromarray(source.astype(np.uint8))
+    mask = Image.new("L", source.size, 0)
+    draw = ImageDraw.Draw(mask)
+    for _ in range(30):
+        draw.line([tuple(rng.integers(0, min(source.size), 2)) for _ in range(4)], fill=255, width=25)
+    output = render_mask(mask, source)
+
+    previous_component = gr.Image(type="numpy")
+    component = gr.Image(type="pil")
+    runs = (
+        ("float64 array", lambda: np.array(output) / 255.0, previous_component),
+        ("display_result", lambda: display_result(output), component),
+    )
+    print(f"{args.width}x{args.height} rendered mask, display_size {display_size()}")
+    for label, make_result, target in runs:
+        ms, data = best_time(lambda: target.postprocess(make_result()), args.repeat)
+        result = make_result()
+        held = result.nbytes if isinstance(result, np.ndarray) else len(result.tobytes())
+        sent = os.path.getsize(data.path)
+        print(f"{label:<15} {ms:7.0f} ms   result {held / 2**20:6.1f} MiB   "
+              f"sent {sent / 2**10:7.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure cold start time of the app and which heavy optional dependencies it
+loads before any tab is used.
+
+    python benchmarks/startup_time.py [--runs 5]
+
+Every measurement runs in a fresh interpreter so nothing is cached in
+sys.modules between runs.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported by the operation that needs them
+HEAVY_MODULES = ("matplotlib", "skimage", "cv2", "cairosvg", "scipy")
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_ui()
+built = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "build": built - imported,
+    "loaded": sorted(m for m in %r if m in sys.modules),
+}))
+"""
+
+MODULE_SCRIPT = """
+import time
+start = time.perf_counter()
+import %s
+print(time.perf_counter() - start)
+"""
+
+
+def run_python(code, stderr=None):
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, text=True,
+                                     stderr=stderr)
+    return output.strip().splitlines()[-1]
+
+
+def measure_startup(runs):
+    results = [json.loads(run_python(STARTUP_SCRIPT % (HEAVY_MODULES,))) for _ in range(runs)]
+    return {
+        "import": statistics.median(r["import"] for r in results),
+        "build": statistics.median(r["build"] for r in results),
+        "loaded": results[-1]["loaded"],
+    }
+
+
+def measure_module(name, runs):
+    """Median stand-alone import time of one module, or None if it cannot be imported"""
+    try:
+        return statistics.median(float(run_python(MODULE_SCRIPT % name, subprocess.DEVNULL))
+                                 for _ in range(runs))
+    except subprocess.CalledProcessError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    startup = measure_startup(args.runs)
+    print(f"import app:  {startup['import'] * 1000:8.1f} ms")
+    print(f"create_ui(): {startup['build'] * 1000:8.1f} ms")
+    print()
+    print("Deferred dependency      import cost   loaded at startup")
+    deferred = 0.0
+    for name in HEAVY_MODULES:
+        cost = measure_module(name if name != "matplotlib" else "matplotlib.pyplot", args.runs)
+        loaded = name in startup["loaded"]
+        if cost is None:
+            print(f"{name:<24} {'unavailable':>11}")
+            continue
+        if not loaded:
+            deferred += cost
+        print(f"{name:<24} {cost * 1000:8.1f} ms   {'yes' if loaded else 'no'}")
+    print()
+    print(f"Saved at startup: {deferred * 1000:.1f} ms")
+    return 1 if startup["loaded"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
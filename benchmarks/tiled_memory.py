@@ -0,0 +1,81 @@
+"""
+Peak memory and time of morphology / edge detection on a large TIFF, loaded
+in full versus streamed tile by tile (src.processing.tiled).
+
+    python benchmarks/tiled_memory.py [--size 16384] [--rgb] [--tile 1024] [--op edge]
+
+Each run happens in a fresh process so its peak RSS is measured alone.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RUN = """
+import sys, time, resource
+sys.path.insert(0, {root!r})
+from PIL import Image
+Image.MAX_IMAGE_PIXELS = None
+from src.processing import apply_morphology, detect_edges, tiled_morphology, tiled_edges
+start = time.perf_counter()
+if {tiled!r}:
+    if {op!r} == "morphology":
+        tiled_morphology({path!r}, {out!r}, 3, None, 5, None, tile={tile!r})
+    else:
+        tiled_edges({path!r}, {out!r}, "Sobel", tile={tile!r})
+else:
+    image = Image.open({path!r})
+    if {op!r} == "morphology":
+        apply_morphology(image, 3, None, 5, None).save({out!r})
+    else:
+        detect_edges(image, "Sobel").save({out!r})
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run(path, out, op, tiled, tile):
+    code = RUN.format(root=ROOT, path=path, out=out, op=op, tiled=tiled, tile=tile)
+    seconds, max_rss_kb = subprocess.run([sys.executable, "-c", code], check=True,
+                                         capture_output=True, text=True).stdout.split()
+    return float(seconds), int(max_rss_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=16384, help="edge of the square test image")
+    parser.add_argument("--rgb", action="store_true")
+    parser.add_argument("--tile", type=int, default=1024)
+    parser.add_argument("--op", choices=["morphology", "edge"], default="edge")
+    args = parser.parse_args()
+
+    import tifffile
+    folder = tempfile.mkdtemp(prefix="tiled_memory_")
+    path = os.path.join(folder, "slide.tif")
+    shape = (args.size, args.size, 3) if args.rgb else (args.size, args.size)
+    rng = np.random.default_rng(0)
+
+    def tiles():
+        for y in range(0, args.size, 512):
+            for x in range(0, args.size, 512):
+                yield rng.integers(0, 256, (512, 512) + shape[2:], dtype=np.uint8)
+
+    start = time.perf_counter()
+    tifffile.imwrite(path, tiles(), shape=shape, dtype=np.uint8, tile=(512, 512),
+                     photometric="rgb" if args.rgb else "minisblack", bigtiff=True)
+    print(f"{'x'.join(map(str, shape))} tiled TIFF written in {time.perf_counter() - start:.1f} s, "
+          f"{os.path.getsize(path) / 2**20:.0f} MiB")
+
+    for label, tiled in (("in memory", False), (f"tiled ({args.tile})", True)):
+        seconds, peak = run(path, os.path.join(folder, f"out_{tiled}.tif"), args.op, tiled, args.tile)
+        print(f"{args.op:<10} {label:<14} {seconds:7.1f} s   peak RSS {peak:8.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
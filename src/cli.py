@@ -0,0 +1,254 @@
+"""
+Headless command line interface for the processing functions.
+
+    python -m src.cli aspect input/ -o output/aspect --size 512 --square
+    python -m src.cli edge "scans/**/*.png" -o output/edges --algorithm Canny --workers 8
+    python -m src.cli pipeline input/ -o output/chain --spec pipeline.json
+
+Inputs may be files, folders or glob patterns. Only PIL and NumPy are loaded
+up front; Gradio is never imported. TIFFs of at least TILED_MIN_PIXELS pixels
+are streamed tile by tile through morphology, edge and glcm and written as
+tiled TIFFs.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from .processing import (
+    aspect_resize, custom_resize, crop_and_fit, load_for_crop, apply_morphology, detect_edges,
+    render_mask, glcm_features, resolve_batch_files, run_batch,
+    parse_pipeline, run_pipeline, use_tiled_io,
+    tiled_morphology, tiled_edges, tiled_glcm_features,
+    EDGE_ALGORITHMS, MORPHOLOGY_SHAPES, GLCM_FEATURES, ANGLE_MAP
+)
+from .utils import read_image, atomic_path, atomic_save, encode_output, ENCODING_PROFILES
+
+
+def load_input(path, mode="RGB", long_side=None, size=None):
+    """Load an image in `mode`, reduced on decode when the output size is known"""
+    return read_image(path, mode, long_side, size)
+
+
+def _aspect(path, args):
+    image = load_input(path, long_side=args.size - 2 * args.margin)
+    return aspect_resize(image, args.size, args.square, args.margin, args.binary, args.blur)
+
+
+def _custom(path, args):
+    image = load_input(path, size=(args.width, args.height))
+    return custom_resize(image, args.width, args.height, args.binary, args.blur)
+
+
+def _crop(path, args):
+    # Same SVG rendering and reduced decode as the Cropper tab, margins scaled with it
+    image, top, bottom, left, right = load_for_crop(path, args.top, args.bottom, args.left,
+                                                    args.right, args.size)
+    return crop_and_fit(image, top, bottom, left, right, args.size, args.square, args.margin)
+
+
+def _morphology(path, args):
+    image = load_input(path, mode=None)
+    return apply_morphology(image, args.erosion, args.dilation, args.opening, args.closing,
+                            args.shape)
+
+
+def _edge(path, args):
+    image = load_input(path)
+    return detect_edges(image, args.algorithm, args.canny_low, args.canny_high, args.sigma)
+
+
+def _mask(path, args):
+    mask = load_input(path, mode="L")
+    image = load_input(args.image, size=mask.size) if args.image else None
+    return render_mask(mask, image)
+
+
+def _glcm(path, args):
+    image = load_input(path, mode="L")
+    return glcm_features(image, args.distance, args.angles, args.levels, not args.asymmetric,
+                         args.features, args.window_size, args.step_size, args.glcm_workers)
+
+
+def _pipeline(path, args):
+    image = load_input(path)
+    return run_pipeline(image, args.steps)
+
+
+def _tiled_morphology(path, out_path, args):
+    tiled_morphology(path, out_path, args.erosion, args.dilation, args.opening, args.closing,
+                     args.shape)
+    return out_path
+
+
+def _tiled_edge(path, out_path, args):
+    tiled_edges(path, out_path, args.algorithm, args.canny_low, args.canny_high, args.sigma)
+    return out_path
+
+
+def _tiled_glcm(path, out_path, args):
+    _, _, paths = tiled_glcm_features(path, os.path.splitext(out_path)[0], args.distance,
+                                      args.angles, args.levels, not args.asymmetric,
+                                      args.features, args.window_size, args.step_size)
+    return ", ".join(paths.values())
+
+
+# command -> operation writing a large TIFF input tile by tile to a tiled TIFF
+TILED_COMMANDS = {
+    "morphology": _tiled_morphology,
+    "edge": _tiled_edge,
+    "glcm": _tiled_glcm,
+}
+
+
+# command -> (operation, output suffix)
+COMMANDS = {
+    "aspect": (_aspect, "aspect"),
+    "custom": (_custom, "custom"),
+    "crop": (_crop, "crop"),
+    "morphology": (_morphology, "morph"),
+    "edge": (_edge, "edge"),
+    "mask": (_mask, "stroke"),
+    "glcm": (_glcm, "glcm"),
+    "pipeline": (_pipeline, "pipeline"),
+}
+
+
+def process_file(input_dir, filename, args):
+    """Run args.command on one file and save the result; returns (out_path, message)"""
+    operation, suffix = COMMANDS[args.command]
+    input_path = os.path.join(input_dir, filename)
+    base, ext = os.path.splitext(filename)
+    try:
+        if args.command in TILED_COMMANDS and use_tiled_io(input_path):
+            out_path = os.path.join(args.output, f"{base}_{suffix}.tif")
+            return out_path, TILED_COMMANDS[args.command](input_path, out_path, args)
+        result = operation(input_path, args)
+        os.makedirs(args.output, exist_ok=True)
+        if args.command == "glcm":
+            out_path = os.path.join(args.output, f"{base}_{suffix}.npz")
+            # A file object, so numpy does not append .npz to the temporary name
+            with atomic_path(out_path) as tmp_path, open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **result)
+        else:
+            if ext.lower() == ".svg":
+                ext = ".png"
+            result, out_path, params = encode_output(
+                result, os.path.join(args.output, f"{base}_{suffix}{ext}"), args.encoding)
+            atomic_save(result, out_path, **params)
+        return out_path, out_path
+    except Exception as e:
+        return None, str(e)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Headless image processing")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="image files, folders or glob patterns")
+    common.add_argument("-o", "--output", default="output", help="output folder")
+    common.add_argument("--workers", type=int, default=None,
+                        help="parallel files (default: CPU count)")
+    common.add_argument("--executor", choices=["thread", "process"], default="thread")
+    common.add_argument("--encoding", choices=ENCODING_PROFILES, default="default",
+                        help="output format and compression profile")
+
+    finish = argparse.ArgumentParser(add_help=False)
+    finish.add_argument("--binary", type=float, default=None, metavar="THRESHOLD",
+                        help="binarize at this threshold (0-1)")
+    finish.add_argument("--blur", type=float, default=None, metavar="RADIUS",
+                        help="Gaussian blur radius")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    aspect = commands.add_parser("aspect", parents=[common, finish], help="aspect rescale")
+    aspect.add_argument("--size", type=int, default=512)
+    aspect.add_argument("--square", action="store_true")
+    aspect.add_argument("--margin", type=int, default=0)
+
+    custom = commands.add_parser("custom", parents=[common, finish], help="resize to width x height")
+    custom.add_argument("--width", type=int, required=True)
+    custom.add_argument("--height", type=int, required=True)
+
+    crop = commands.add_parser("crop", parents=[common], help="crop margins and fit")
+    for side in ("top", "bottom", "left", "right"):
+        crop.add_argument(f"--{side}", type=int, default=0)
+    crop.add_argument("--size", type=int, default=512)
+    crop.add_argument("--no-square", dest="square", action="store_false")
+    crop.add_argument("--margin", type=int, default=0)
+
+    morphology = commands.add_parser("morphology", parents=[common],
+                                     help="binary morphology (kernel sizes)")
+    for operation in ("erosion", "dilation", "opening", "closing"):
+        morphology.add_argument(f"--{operation}", type=int, default=None, metavar="KERNEL")
+    morphology.add_argument("--shape", choices=MORPHOLOGY_SHAPES, default="rect",
+                            help="structuring element")
+
+    edge = commands.add_parser("edge", parents=[common], help="edge detection")
+    edge.add_argument("--algorithm", choices=EDGE_ALGORITHMS, default="Sobel")
+    edge.add_argument("--canny-low", type=float, default=50)
+    edge.add_argument("--canny-high", type=float, default=150)
+    edge.add_argument("--sigma", type=float, default=1.0)
+
+    mask = commands.add_parser("mask", parents=[common], help="render masks")
+    mask.add_argument("--image", default=None, help="source image shown through the masks")
+
+    glcm = commands.add_parser("glcm", parents=[common],
+                               help="GLCM texture feature maps (saved as .npz)")
+    glcm.add_argument("--distance", type=int, default=1)
+    glcm.add_argument("--angles", nargs="+", choices=list(ANGLE_MAP), default=["0°"])
+    glcm.add_argument("--levels", type=int, default=64)
+    glcm.add_argument("--asymmetric", action="store_true")
+    glcm.add_argument("--features", nargs="+", choices=GLCM_FEATURES, default=GLCM_FEATURES)
+    glcm.add_argument("--window-size", type=int, default=16)
+    glcm.add_argument("--step-size", type=int, default=8)
+    glcm.add_argument("--glcm-workers", type=int, default=1,
+                      help="processes per image for the GLCM windows")
+
+    pipeline = commands.add_parser("pipeline", parents=[common],
+                                   help="run a JSON pipeline of stages in memory")
+    pipeline.add_argument("--spec", required=True,
+                          help="JSON list of steps, or a path to a .json file")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "pipeline":
+        spec = args.spec
+        if os.path.isfile(spec):
+            with open(spec, encoding="utf-8") as f:
+                spec = f.read()
+        try:
+            args.steps = parse_pipeline(spec)
+        except ValueError as e:
+            parser.error(f"invalid pipeline: {e}")
+
+    files = []
+    for source in args.inputs:
+        if os.path.isfile(source):
+            files.append(os.path.split(source))
+        else:
+            files.extend(resolve_batch_files(source))
+    if not files:
+        print("No input images found", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    failures = 0
+    tasks = ((filename, (input_dir, filename, args)) for input_dir, filename in files)
+    for name, ok, message in run_batch(process_file, tasks, args.workers, args.executor):
+        if ok:
+            print(f"{name} -> {message}", flush=True)
+        else:
+            failures += 1
+            print(f"{name}: FAILED: {message}", file=sys.stderr, flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"{len(files) - failures} succeeded, {failures} failed in {elapsed:.1f}s "
+          f"({len(files) / elapsed:.1f} images/s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
 from .crop import *
 from .mask import *
 from .resize import *
+from .point import *
 from .morphology import *
 from .glcm import *
+from .edge import *
+from .batch import *
+from .pipeline import *
+from .offload import *
+from .preview import *
+from .tiled import *
 # ---------------------------
\ No newline at end of file
@@ -0,0 +1,188 @@
+import os
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from ..utils import lang_labels, deferred_writes, finish_writes
+from .offload import run_in_process, process_context, process_pool_started, call_lang
+
+BATCH_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.svg', '.tif')
+
+# Minimum number of seconds between two streamed progress updates
+PROGRESS_INTERVAL = 0.5
+
+
+def list_batch_files(batch_folder):
+    """Sorted image files of a batch folder"""
+    return sorted(f for f in os.listdir(batch_folder)
+                  if f.lower().endswith(BATCH_EXTENSIONS))
+
+
+def resolve_batch_files(batch_source):
+    """
+    Expand a batch folder or glob pattern (e.g. "scans/**/*.tif") into
+    sorted (directory, filename) pairs of image files.
+    """
+    if os.path.isdir(batch_source):
+        return [(batch_source, f) for f in list_batch_files(batch_source)]
+    paths = sorted(p for p in glob.glob(batch_source, recursive=True)
+                   if p.lower().endswith(BATCH_EXTENSIONS) and os.path.isfile(p))
+    return [os.path.split(p) for p in paths]
+
+
+def _run_task(fn, args):
+    """Run one batch item; only the status travels back, not the image"""
+    try:
+        output, message = fn(*args)
+        return output is not None, message
+    except Exception as e:
+        return False, str(e)
+
+
+def _run_pooled(fn, args):
+    """Run one batch item on the warm process pool (see offload)"""
+    try:
+        return run_in_process(_run_task, fn, args)
+    except BrokenProcessPool as e:
+        return False, str(e)
+
+
+def run_batch(fn, tasks, workers=None, executor="thread"):
+    """
+    Run fn(*args) for every (name, args) in tasks on a thread or process pool.
+
+    Yields (name, ok, message) as items complete. At most a few items per
+    worker are in flight, so huge folders do not queue thousands of futures.
+    fn must return (output, message) with output None on failure, and must be
+    a module-level function when executor is "process".
+
+    Process batches run on the warm pool when this process started it (the
+    app), `workers` threads feeding it; elsewhere (the CLI) on a pool of
+    `workers` processes started with process_context.
+    """
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    run = _run_task
+    if executor != "process":
+        pool = ThreadPoolExecutor(max_workers=workers)
+    elif process_pool_started():
+        pool, run = ThreadPoolExecutor(max_workers=workers), _run_pooled
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=process_context())
+    tasks = iter(tasks)
+    with pool:
+        pending = {}
+        for name, args in tasks:
+            pending[pool.submit(run, fn, args)] = name
+            if len(pending) >= workers * 4:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                ok, message = future.result()
+                yield name, ok, message
+                for next_name, next_args in tasks:
+                    pending[pool.submit(run, fn, next_args)] = next_name
+                    break
+
+
+def stream_batch(fn, tasks, total, lang="English", workers=None, executor="thread"):
+    """
+    Run a batch with run_batch and yield status text for a Gradio textbox.
+
+    Progress is yielded at most every PROGRESS_INTERVAL seconds; the last
+    yield is a summary with throughput and the list of failed files.
+    Failures never stop the batch.
+    """
+    messages = lang_labels[lang]
+    start = last_update = time.perf_counter()
+    done = 0
+    failures = []
+    last_message = ""
+    for name, ok, message in run_batch(fn, tasks, workers, executor):
+        done += 1
+        last_message = f"{name}: {message}"
+        if not ok:
+            failures.append(last_message)
+        now = time.perf_counter()
+        if now - last_update >= PROGRESS_INTERVAL:
+            last_update = now
+            rate = done / (now - start)
+            yield "\n".join([
+                messages["batch_progress"].format(done, total, rate, len(failures)),
+                last_message
+            ])
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    lines = [messages["batch_summary"].format(done - len(failures), len(failures), elapsed, rate)]
+    if failures:
+        lines.append(messages["batch_failures"])
+        lines.extend(failures)
+    yield "\n".join(lines)
+
+
+def process_batch(fn, batch_source, args, lang="English", workers=None, executor="thread"):
+    """
+    Apply a single-image operation fn(input_dir, filename, *args) to every
+    image of a folder or glob, yielding (None, status) for Gradio.
+    """
+    messages = lang_labels[lang]
+    try:
+        files = resolve_batch_files(batch_source)
+    except Exception as e:
+        yield None, messages["process_failed"].format(str(e))
+        return
+    if not files:
+        yield None, messages["batch_empty"]
+        return
+    
+    tasks = ((filename, (input_dir, filename, *args)) for input_dir, filename in files)
+    for status in stream_batch(fn, tasks, len(files), lang, workers, executor):
+        yield None, status
+
+
+def stream_result(fn, args, lang="English"):
+    """
+    Yield the result of fn(*args) as soon as it returns, its saves being
+    queued on the background output writer (see utils.deferred_writes),
+    then only the updated status once they are written.
+    """
+    import gradio as gr
+    with deferred_writes() as writes:
+        result = fn(*args)
+    yield result
+    if writes:
+        yield (gr.skip(),) * (len(result) - 1) + (finish_writes(result[-1], writes, lang),)
+
+
+def batch_handler(fn, out_filename_index, batch_fn=None):
+    """
+    Wrap a single-image operation fn(input_dir, filename, *args) into a
+    Gradio generator taking (batch_process, batch_source, batch_workers,
+    batch_executor, input_dir, filename, *args). fn's `lang` parameter
+    picks the language of the status.
+
+    With batch_process off it streams fn's result with stream_result. In
+    batch mode the output filename at args[out_filename_index] is cleared so
+    every file gets its auto-generated name, and the files go through
+    process_batch, or through batch_fn(batch_source, args, lang, workers,
+    executor) for an operation with a faster way to run a whole batch.
+    """
+    def handler(batch_process, batch_source, batch_workers, batch_executor,
+                input_dir, filename, *args):
+        lang = call_lang(fn, (input_dir, filename, *args))
+        if not batch_process:
+            yield from stream_result(fn, (input_dir, filename, *args), lang)
+            return
+        args = list(args)
+        args[out_filename_index] = ""
+        if batch_fn is not None:
+            yield from batch_fn(batch_source, tuple(args), lang, batch_workers, batch_executor)
+            return
+        yield from process_batch(fn, batch_source, tuple(args), lang,
+                                 batch_workers, batch_executor)
+    
+    handler.__name__ = fn.__name__
+    handler.__doc__ = fn.__doc__
+    return handler
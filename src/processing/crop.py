@@ -1,88 +1,128 @@
 import os
-import io
 from PIL import Image
-from svglib.svglib import svg2rlg
-from reportlab.graphics import renderPM
-from ..utils import lang_labels
+from ..utils import (lang_labels, read_image, image_size, rasterize_svg, svg_size, save_output,
+                     display_result)
+from .batch import process_batch, stream_result
+from .offload import offload, run_in_process
 import numpy as np
 
 def process_image_crop(input_dir, filename, top, bottom, left, right, target_size, 
                       output_square, margin, batch_process, batch_folder, out_dir, 
-                      out_filename, lang="English"):
+                      out_filename, lang="English", batch_workers=None, batch_executor="thread",
+                      encoding=None):
     """
     Crop image based on margins and resize to target size:
     - Crop image using specified margins
     - Resize maintaining aspect ratio to target size
     - Optionally make output square with padding
     - Add output margins if specified
-    - Support batch processing
-    """
-    messages = lang_labels[lang]
+    - Support batch processing on a thread or process pool
+    - Save with the `encoding` profile
     
+    This is a generator so Gradio streams batch progress; single images
+    yield exactly one (image, status) pair.
+    """
     if batch_process:
-        # Process all images in batch folder
-        results = []
-        for img_file in os.listdir(batch_folder):
-            if img_file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.svg', '.tif')):
-                result = process_single_crop(batch_folder, img_file, top, bottom, left, right,
-                                          target_size, output_square, margin, out_dir, None, lang)
-                results.append(result)
-        return None, "\n".join([r[1] for r in results])
+        yield from process_batch_crop(batch_folder, top, bottom, left, right, target_size,
+                                      output_square, margin, out_dir, lang,
+                                      batch_workers, batch_executor, encoding)
     else:
         # Process single image
-        return process_single_crop(input_dir, filename, top, bottom, left, right,
-                                 target_size, output_square, margin, out_dir, out_filename, lang)
+        yield from stream_result(run_in_process, (
+            process_single_crop, input_dir, filename, top, bottom, left, right,
+            target_size, output_square, margin, out_dir, out_filename, lang, encoding), lang)
+
+
+def process_batch_crop(batch_folder, top, bottom, left, right, target_size, output_square,
+                       margin, out_dir, lang="English", workers=None, executor="thread",
+                       encoding=None):
+    """
+    Crop every image of a batch folder or glob in parallel, yielding
+    (None, status) as files complete and a throughput/failure summary at the end.
+    """
+    args = (top, bottom, left, right, target_size, output_square, margin, out_dir, None,
+            lang, encoding)
+    yield from process_batch(offload(process_single_crop), batch_folder, args, lang, workers, executor)
+
+
+def crop_and_fit(image, top, bottom, left, right, target_size, output_square=True, margin=0):
+    """
+    Crop an RGB image by the given margins, rescale the crop so its long side
+    equals target_size and pad it with white (to a square of
+    target_size + 2 * margin when output_square is set, else by margin).
+    """
+    # Crop image
+    width, height = image.size
+    crop_box = (left, top, width - right, height - bottom)
+    cropped = image.crop(crop_box)
+    
+    # Calculate resize factor
+    crop_width, crop_height = cropped.size
+    factor = target_size / max(crop_width, crop_height)
+    new_width = int(crop_width * factor)
+    new_height = int(crop_height * factor)
+    
+    # Resize maintaining aspect ratio
+    resized = cropped.resize((new_width, new_height), Image.LANCZOS)
+    
+    # Handle square output if requested
+    if output_square:
+        size = target_size + (2 * margin)
+        output_img = Image.new("RGB", (size, size), (255, 255, 255))
+        offset_x = (size - new_width) // 2
+        offset_y = (size - new_height) // 2
+    else:
+        output_img = Image.new("RGB", (new_width + 2*margin, new_height + 2*margin), 
+                             (255, 255, 255))
+        offset_x = margin
+        offset_y = margin
+    
+    output_img.paste(resized, (offset_x, offset_y))
+    return output_img
+
+
+def load_for_crop(input_path, top, bottom, left, right, target_size):
+    """
+    Load an image to crop by (top, bottom, left, right) and fit to
+    target_size, at the resolution the cropped area needs. Returns the RGB
+    image and the margins scaled to it (margins are given in the pixels of
+    the original, or SVG pixels).
+    """
+    if input_path.lower().endswith('.svg'):
+        # Render the SVG at the scale the cropped area will be resized to,
+        # with the margins scaled along with it
+        svg_width, svg_height = svg_size(input_path)
+        scale = target_size / max(svg_width - left - right, svg_height - top - bottom)
+        image = rasterize_svg(input_path, svg_width * scale, svg_height * scale)
+        top, bottom, left, right = (int(round(v * scale)) for v in (top, bottom, left, right))
+    else:
+        # Decode large rasters only at the resolution the cropped area needs,
+        # scaling the margins by what the decoder kept
+        width, height = image_size(input_path)
+        scale = target_size / max(width - left - right, height - top - bottom, 1)
+        image = read_image(input_path, "RGB", long_side=max(width, height) * scale)
+        if image.size != (width, height):
+            scale = image.width / width
+            top, bottom, left, right = (int(round(v * scale)) for v in (top, bottom, left, right))
+    
+    # Convert to RGB mode if necessary
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image, top, bottom, left, right
 
 
 def process_single_crop(input_dir, filename, top, bottom, left, right, target_size, 
-                       output_square, margin, out_dir, out_filename, lang):
+                       output_square, margin, out_dir, out_filename, lang="English", encoding=None):
     """Process a single image for cropping"""
     if not filename:
         return None, lang_labels[lang]["no_image"]
     
     input_path = os.path.join(input_dir, filename)
     try:
-        # Check if file is SVG
-        if filename.lower().endswith('.svg'):
-            # Convert SVG to PNG using svglib
-            drawing = svg2rlg(input_path)
-            # Convert to PIL Image
-            png_data = renderPM.drawToString(drawing, fmt='PNG')
-            image = Image.open(io.BytesIO(png_data))
-        else:
-            image = Image.open(input_path)
-        
-        # Convert to RGB mode if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-
-        # Crop image
-        width, height = image.size
-        crop_box = (left, top, width - right, height - bottom)
-        cropped = image.crop(crop_box)
-        
-        # Calculate resize factor
-        crop_width, crop_height = cropped.size
-        factor = target_size / max(crop_width, crop_height)
-        new_width = int(crop_width * factor)
-        new_height = int(crop_height * factor)
-        
-        # Resize maintaining aspect ratio
-        resized = cropped.resize((new_width, new_height), Image.LANCZOS)
-        
-        # Handle square output if requested
-        if output_square:
-            size = target_size + (2 * margin)
-            output_img = Image.new("RGB", (size, size), (255, 255, 255))
-            offset_x = (size - new_width) // 2
-            offset_y = (size - new_height) // 2
-        else:
-            output_img = Image.new("RGB", (new_width + 2*margin, new_height + 2*margin), 
-                                 (255, 255, 255))
-            offset_x = margin
-            offset_y = margin
-        
-        output_img.paste(resized, (offset_x, offset_y))
+        image, top, bottom, left, right = load_for_crop(input_path, top, bottom, left, right,
+                                                        target_size)
+        output_img = crop_and_fit(image, top, bottom, left, right, target_size,
+                                  output_square, margin)
         
         # Save the processed image
         base, ext = os.path.splitext(filename)
@@ -99,8 +139,7 @@ def process_single_crop(input_dir, filename, top, bottom, left, right, target_si
             out_filename = f"{base}_{mode_str}{ext}"
         out_path = os.path.join(out_dir, out_filename)
         
-        output_img.save(out_path)
-        return output_img, lang_labels[lang]["save_success"].format(out_path)
+        return display_result(output_img), save_output(output_img, out_path, lang, encoding)
         
     except Exception as e:
         return None, lang_labels[lang]["process_failed"].format(str(e))
\ No newline at end of file
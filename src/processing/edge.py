@@ -1,16 +1,305 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import cv2
 from PIL import Image
-from skimage import feature, filters
-from ..utils import lang_labels
+from ..utils import lang_labels, read_image, save_output, display_result
+
+EDGE_ALGORITHMS = ("Roberts", "Sobel", "Prewitt", "Laplacian", "LoG", "Canny")
+# `algorithm` value of process_edge_detection running every algorithm at once
+ALL_EDGE_ALGORITHMS = "All"
+
+
+# Algorithms whose response is min-max scaled to 0-255 over the whole image
+NORMALIZED_EDGE_ALGORITHMS = ("Laplacian", "LoG")
+
+# Canny smooths with skimage's default sigma before taking its gradients
+CANNY_SIGMA = 1.0
+# Canny gradients are handed to cv2.Canny as int16 with this many steps per gray level
+CANNY_GRADIENT_SCALE = 16
+# Responses are truncated to uint8 as skimage's float output was; this slack
+# keeps float32 results a hair below an exact integer from losing a gray level
+TRUNCATION_SLACK = 1e-3
+
+
+def gaussian_ksize(sigma):
+    """Kernel size of a Gaussian truncated at 4 sigma, like skimage's"""
+    return 2 * int(4 * float(sigma) + 0.5) + 1
+
+
+class EdgeEngine:
+    """
+    EDGE_ALGORITHMS computed with OpenCV on uint8/float32 arrays. Working
+    buffers are allocated once per image size and reused by every algorithm
+    and every image loaded; the float copy of the grayscale input and its
+    Gaussian-smoothed versions are computed once per image and shared, so
+    running several algorithms on one image costs little more than the
+    slowest of them. Kernels and borders follow the skimage filters the
+    results were originally computed with.
+    """
+    
+    def __init__(self, gray_image=None):
+        self._buffers = {}
+        if gray_image is not None:
+            self.load(gray_image)
+    
+    def load(self, gray_image):
+        """Set the grayscale uint8 image the next responses are computed on"""
+        self.gray = np.ascontiguousarray(gray_image, dtype=np.uint8)
+        self._float = None
+        self._smoothed = {}
+        return self
+    
+    def _buffer(self, name, dtype=np.float32):
+        """Preallocated array `name` of the loaded image's shape"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != self.gray.shape or buffer.dtype != dtype:
+            buffer = self._buffers[name] = np.empty(self.gray.shape, dtype)
+        return buffer
+    
+    def _gray_float(self):
+        if self._float is None:
+            self._float = self._buffer("float")
+            np.copyto(self._float, self.gray)
+        return self._float
+    
+    def _smooth(self, sigma):
+        """Gaussian of the gray image (edges replicated), shared between algorithms"""
+        import cv2
+        sigma = float(sigma)
+        if sigma not in self._smoothed:
+            ksize = gaussian_ksize(sigma)
+            self._smoothed[sigma] = cv2.GaussianBlur(
+                self._gray_float(), (ksize, ksize), sigma,
+                dst=self._buffer(f"gaussian_{len(self._smoothed)}"),
+                borderType=cv2.BORDER_REPLICATE)
+        return self._smoothed[sigma]
+    
+    def _magnitude(self, kernel_x, kernel_y):
+        """sqrt(gx^2 + gy^2) of two separable gradients, kernels pre-scaled"""
+        import cv2
+        source, border = self._gray_float(), cv2.BORDER_REFLECT
+        gx = cv2.sepFilter2D(source, cv2.CV_32F, kernel_x, kernel_y,
+                             dst=self._buffer("gx"), borderType=border)
+        gy = cv2.sepFilter2D(source, cv2.CV_32F, kernel_y, kernel_x,
+                             dst=self._buffer("gy"), borderType=border)
+        return cv2.magnitude(gx, gy, self._buffer("magnitude"))
+    
+    def _roberts(self):
+        import cv2
+        source, border = self._gray_float(), cv2.BORDER_REFLECT
+        scale = 1 / np.sqrt(2)
+        diagonal = np.array([[-scale, 0], [0, scale]], np.float32)
+        anti_diagonal = np.array([[0, -scale], [scale, 0]], np.float32)
+        gx = cv2.filter2D(source, cv2.CV_32F, diagonal, dst=self._buffer("gx"),
+                          anchor=(0, 0), borderType=border)
+        gy = cv2.filter2D(source, cv2.CV_32F, anti_diagonal, dst=self._buffer("gy"),
+                          anchor=(0, 0), borderType=border)
+        return cv2.magnitude(gx, gy, self._buffer("magnitude"))
+    
+    def _canny(self, canny_low, canny_high):
+        import cv2
+        smoothed = self._smooth(CANNY_SIGMA)
+        dx, dy = self._buffer("canny_dx", np.int16), self._buffer("canny_dy", np.int16)
+        scale = CANNY_GRADIENT_SCALE
+        cv2.Sobel(smoothed, cv2.CV_32F, 1, 0, dst=self._buffer("gx"), scale=scale,
+                  borderType=cv2.BORDER_REFLECT)
+        cv2.Sobel(smoothed, cv2.CV_32F, 0, 1, dst=self._buffer("gy"), scale=scale,
+                  borderType=cv2.BORDER_REFLECT)
+        np.copyto(dx, self._buffer("gx"), casting="unsafe")
+        np.copyto(dy, self._buffer("gy"), casting="unsafe")
+        result = cv2.Canny(dx, dy, canny_low * scale, canny_high * scale, L2gradient=True)
+        # skimage never marks the outermost pixels
+        result[[0, -1], :] = 0
+        result[:, [0, -1]] = 0
+        return result
+    
+    def response(self, algorithm="Sobel", canny_low=50, canny_high=150, sigma=1.0):
+        """
+        The final uint8 edge map of `algorithm`, or for NORMALIZED_EDGE_ALGORITHMS
+        the float32 response still to be min-max scaled. Float responses live in
+        the engine's buffers until the next call.
+        """
+        import cv2
+        
+        if algorithm == "Roberts":
+            magnitude = self._roberts()
+        elif algorithm == "Sobel":
+            scale = 0.25 / np.sqrt(2)
+            magnitude = self._magnitude(np.float32([-1, 0, 1]),
+                                        np.float32([scale, 2 * scale, scale]))
+        elif algorithm == "Prewitt":
+            scale = 1 / (3 * np.sqrt(2))
+            magnitude = self._magnitude(np.float32([-1, 0, 1]),
+                                        np.float32([scale, scale, scale]))
+        elif algorithm == "Laplacian":
+            return cv2.Laplacian(self.gray, cv2.CV_32F, dst=self._buffer("Laplacian"))
+        elif algorithm == "LoG":
+            return cv2.Laplacian(self._smooth(sigma), cv2.CV_32F, dst=self._buffer("LoG"),
+                                 scale=-1, borderType=cv2.BORDER_REFLECT)
+        elif algorithm == "Canny":
+            return self._canny(canny_low, canny_high)
+        else:
+            raise ValueError(f"Unknown edge algorithm: {algorithm}")
+        
+        return _truncate(magnitude)
+    
+    def edges(self, algorithm="Sobel", canny_low=50, canny_high=150, sigma=1.0):
+        """Final uint8 edge map of `algorithm`"""
+        result = self.response(algorithm, canny_low, canny_high, sigma)
+        if algorithm in NORMALIZED_EDGE_ALGORITHMS:
+            result = normalize_response(result)
+        return result
+    
+    def _fork(self):
+        """Engine on the same image and shared intermediates, with its own buffers"""
+        fork = EdgeEngine()
+        fork.gray, fork._float, fork._smoothed = self.gray, self._float, self._smoothed
+        return fork
+    
+    def multi(self, algorithms=EDGE_ALGORITHMS, canny_low=50, canny_high=150, sigma=1.0,
+              workers=1, timings=None):
+        """
+        {algorithm: uint8 edge map} for several algorithms in one pass. With
+        workers > 1 they run on threads (OpenCV releases the GIL), each with
+        its own buffers; the shared intermediates are computed first.
+        (algorithm, seconds) pairs are appended to `timings` when a list is given.
+        """
+        def run(engine, algorithm):
+            start = time.perf_counter()
+            result = engine.edges(algorithm, canny_low, canny_high, sigma)
+            if timings is not None:
+                timings.append((algorithm, time.perf_counter() - start))
+            return result
+        
+        workers = max(1, min(int(workers or 1), len(algorithms)))
+        if workers == 1:
+            return {algorithm: run(self, algorithm) for algorithm in algorithms}
+        
+        self._gray_float()
+        if "LoG" in algorithms:
+            self._smooth(sigma)
+        if "Canny" in algorithms:
+            self._smooth(CANNY_SIGMA)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda algorithm: run(self._fork(), algorithm), algorithms)
+            return dict(zip(algorithms, results))
+
+
+def normalize_response(response, low=None, high=None):
+    """
+    Scale a float response to uint8 the way cv2.normalize(..., 0, 255,
+    NORM_MINMAX) does, from its own range or a given global one. The
+    response buffer is overwritten.
+    """
+    if low is None:
+        low, high = float(response.min()), float(response.max())
+    scale = 255.0 * (1.0 / (high - low) if high - low > np.finfo(np.float64).eps else 0.0)
+    response *= scale
+    response += -low * scale
+    return _truncate(response)
+
+
+def _truncate(response):
+    """uint8 copy of a float response in 0-255, truncated; the response is overwritten"""
+    response += TRUNCATION_SLACK
+    result = np.empty(response.shape, np.uint8)
+    np.copyto(result, response, casting="unsafe")
+    return result
+
+
+def edge_response(gray_image, algorithm="Sobel", canny_low=50, canny_high=150, sigma=1.0,
+                  engine=None):
+    """
+    Edge response of a grayscale uint8 array: the final uint8 edge map, or the
+    float response still to be min-max scaled for NORMALIZED_EDGE_ALGORITHMS.
+    Pass an EdgeEngine to reuse its buffers between calls.
+    """
+    engine = (engine or EdgeEngine()).load(gray_image)
+    return engine.response(algorithm, canny_low, canny_high, sigma)
+
+
+def detect_edges(image, algorithm="Sobel", canny_low=50, canny_high=150, sigma=1.0):
+    """
+    Run one of EDGE_ALGORITHMS on an image and return the edge map as an "L"
+    image. canny_low/canny_high are used by Canny, sigma by LoG.
+    """
+    engine = EdgeEngine(np.asarray(image.convert("L")))
+    return Image.fromarray(engine.edges(algorithm, canny_low, canny_high, sigma))
+
+
+def detect_edges_multi(image, algorithms=EDGE_ALGORITHMS, canny_low=50, canny_high=150,
+                       sigma=1.0, workers=1, timings=None):
+    """
+    detect_edges for several algorithms at once, sharing the grayscale and
+    Gaussian-smoothed intermediates (see EdgeEngine.multi for workers and
+    timings). Returns {algorithm: "L" image}.
+    """
+    engine = EdgeEngine(np.asarray(image.convert("L")))
+    edges = engine.multi(algorithms, canny_low, canny_high, sigma, workers, timings)
+    return {algorithm: Image.fromarray(result) for algorithm, result in edges.items()}
+
+
+def _process_all_edges(image_path, filename, canny_low, canny_high, sigma, out_dir,
+                       out_filename, encoding, lang):
+    """
+    Every algorithm on one decode, run concurrently. Returns a gallery of
+    (edge map, caption with its time) and a status with the timings.
+    """
+    from .tiled import use_tiled_io, tiled_edges, tiled_output_path
+    
+    messages = lang_labels[lang]
+    base, ext = os.path.splitext(filename)
+    name = os.path.splitext(out_filename)[0] if out_filename else base
+    timings = []
+    lines = []
+    start = time.perf_counter()
+    if use_tiled_io(image_path):
+        # Large TIFFs are streamed once per algorithm and always written
+        out_dir = out_dir or os.path.join("output", base)
+        outputs = {}
+        for algorithm in EDGE_ALGORITHMS:
+            output_path = tiled_output_path(os.path.join(out_dir, f"{name}_{algorithm.lower()}{ext}"))
+            algorithm_start = time.perf_counter()
+            outputs[algorithm] = tiled_edges(image_path, output_path, algorithm,
+                                             canny_low, canny_high, sigma)
+            timings.append((algorithm, time.perf_counter() - algorithm_start))
+            lines.append(messages["save_success"].format(output_path))
+        decode_time = None
+    else:
+        image = read_image(image_path, "RGB")
+        decode_time = time.perf_counter() - start
+        workers = min(len(EDGE_ALGORITHMS), os.cpu_count() or 1)
+        outputs = detect_edges_multi(image, EDGE_ALGORITHMS, canny_low, canny_high, sigma,
+                                     workers, timings)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            for algorithm, output in outputs.items():
+                output_path = os.path.join(out_dir, f"{name}_{algorithm.lower()}{ext}")
+                lines.append(save_output(output, output_path, lang, encoding))
+    total_time = time.perf_counter() - start
+    
+    seconds = dict(timings)
+    gallery = [(outputs[algorithm], f"{algorithm} {seconds[algorithm] * 1000:.0f} ms")
+               for algorithm in EDGE_ALGORITHMS]
+    algorithm_times = ", ".join(f"{algorithm} {seconds[algorithm] * 1000:.0f} ms"
+                                for algorithm in EDGE_ALGORITHMS)
+    if decode_time is None:
+        lines.append(algorithm_times)
+    else:
+        lines.append(messages["edge_timings"].format(decode_time * 1000, algorithm_times,
+                                                     workers, total_time * 1000))
+    return display_result(gallery), "\n".join(lines)
+
 
 def process_edge_detection(input_dir, filename, algorithm, canny_low, canny_high, 
-                          sigma, out_dir, out_filename, lang="English"):
+                          sigma, out_dir, out_filename, lang="English", encoding=None):
     """
     Apply edge detection algorithms to an image:
     - Roberts, Sobel, Prewitt, Laplacian, LoG (Laplacian of Gaussian), and Canny
     - Allows customizing parameters for Canny and LoG algorithms
+    - ALL_EDGE_ALGORITHMS runs all of them on one decode and returns a
+      gallery of (edge map, caption) instead of an image
     """
     messages = lang_labels[lang]
     
@@ -18,43 +307,26 @@ def process_edge_detection(input_dir, filename, algorithm, canny_low, canny_high
         return None, messages["no_image"]
     
     try:
+        from .tiled import use_tiled_io, tiled_edges, tiled_output_path
         image_path = os.path.join(input_dir, filename)
-        image = Image.open(image_path).convert("RGB")
         
-        gray_image = np.array(image.convert("L"))
+        if algorithm == ALL_EDGE_ALGORITHMS:
+            return _process_all_edges(image_path, filename, canny_low, canny_high, sigma,
+                                      out_dir, out_filename, encoding, lang)
         
-        result = None
+        if use_tiled_io(image_path):
+            # Large TIFFs are streamed tile by tile to a tiled TIFF, so they are
+            # always written (to output/<name> without an output folder)
+            base, ext = os.path.splitext(filename)
+            output_path = tiled_output_path(os.path.join(
+                out_dir or os.path.join("output", base),
+                out_filename or f"{base}_{algorithm.lower()}{ext}"))
+            output = tiled_edges(image_path, output_path, algorithm, canny_low, canny_high, sigma)
+            return display_result(output), messages["save_success"].format(output_path)
         
-        if algorithm == "Roberts":
-            edges = filters.roberts(gray_image)
-            result = (edges * 255).astype(np.uint8)
-            
-        elif algorithm == "Sobel":
-            edges = filters.sobel(gray_image)
-            result = (edges * 255).astype(np.uint8)
-            
-        elif algorithm == "Prewitt":
-            edges = filters.prewitt(gray_image)
-            result = (edges * 255).astype(np.uint8)
-            
-        elif algorithm == "Laplacian":
-            result = cv2.Laplacian(gray_image, cv2.CV_64F)
-            result = cv2.normalize(result, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-            
-        elif algorithm == "LoG":
-            result = filters.gaussian(gray_image, sigma=sigma)
-            result = filters.laplace(result)
-            result = cv2.normalize(result, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-            
-        elif algorithm == "Canny":
-            result = feature.canny(
-                gray_image, 
-                low_threshold=canny_low,
-                high_threshold=canny_high
-            )
-            result = (result * 255).astype(np.uint8)
+        image = read_image(image_path, "RGB")
         
-        output = Image.fromarray(result)
+        output = detect_edges(image, algorithm, canny_low, canny_high, sigma)
         
         status_message = ""
         if out_dir:
@@ -64,11 +336,10 @@ def process_edge_detection(input_dir, filename, algorithm, canny_low, canny_high
                 base, ext = os.path.splitext(filename)
                 out_filename = f"{base}_{algorithm.lower()}{ext}"
             
-            output_path = os.path.join(out_dir, out_filename)
-            output.save(output_path)
-            status_message = messages["save_success"].format(output_path)
+            status_message = save_output(output, os.path.join(out_dir, out_filename), lang,
+                                         encoding)
         
-        return output, status_message
+        return display_result(output), status_message
         
     except Exception as e:
         return None, messages["process_failed"].format(str(e))
\ No newline at end of file
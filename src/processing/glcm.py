@@ -1,11 +1,388 @@
 import os
 import numpy as np
 from PIL import Image
-import matplotlib.pyplot as plt
-from skimage.feature import graycomatrix, graycoprops
-import cv2
-from ..utils import lang_labels
+from numpy.lib.stride_tricks import sliding_window_view
+from ..utils import lang_labels, read_image
 import io
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+GLCM_FEATURES = ["Contrast", "Dissimilarity", "Homogeneity", "Energy", "Correlation", "ASM"]
+
+ANGLE_MAP = {
+    "0°": 0,
+    "45°": np.pi/4,
+    "90°": np.pi/2,
+    "135°": 3*np.pi/4
+}
+
+# Upper bound on the number of co-occurrence cells materialized at once
+# (windows x levels x levels); windows are processed in chunks below it,
+# down to a part of a window row at high level counts.
+MAX_GLCM_CHUNK_CELLS = 1 << 22
+
+
+def quantize_gray_levels(img_array, levels):
+    """Quantize an 8-bit grayscale array to `levels` gray levels (0 .. levels-1)"""
+    bins = np.linspace(0, 255, levels)
+    return (np.digitize(img_array, bins) - 1).astype(np.uint8)
+
+
+def _glcm_offsets(distance, angles_rad):
+    """Pixel offsets (rows, cols) used by skimage's graycomatrix for each angle"""
+    return [(int(round(np.sin(a) * distance)), int(round(np.cos(a) * distance)))
+            for a in angles_rad]
+
+
+def _glcm_grid_shape(height, width, window_size, step_size):
+    """Number of window rows and columns covering an image"""
+    n_rows = (height - window_size) // step_size + 1 if height >= window_size else 0
+    n_cols = (width - window_size) // step_size + 1 if width >= window_size else 0
+    return n_rows, n_cols
+
+
+def _glcm_chunk_shape(n_cols, levels):
+    """
+    (window rows, window columns) per bincount chunk so a chunk stays under
+    MAX_GLCM_CHUNK_CELLS: whole window rows when one fits, otherwise a part
+    of a row (one window at least).
+    """
+    n_cols = max(n_cols, 1)
+    n_windows = max(1, MAX_GLCM_CHUNK_CELLS // (levels * levels))
+    if n_windows >= n_cols:
+        return n_windows // n_cols, n_cols
+    return 1, n_windows
+
+
+def _glcm_props(counts, feature_names):
+    """
+    Compute GLCM properties for a batch of co-occurrence matrices.
+    `counts` has shape (n, levels, levels); returns {feature_name: (n,) array}
+    matching skimage's graycoprops for each matrix.
+    """
+    n, levels, _ = counts.shape
+    sums = counts.sum(axis=(1, 2), keepdims=True)
+    sums[sums == 0] = 1
+    P = counts / sums
+    flat = P.reshape(n, -1)
+
+    I, J = np.ogrid[0:levels, 0:levels]
+    diff = (I - J).astype(np.float64)
+    props = {}
+    if "Contrast" in feature_names:
+        props["Contrast"] = flat @ (diff ** 2).ravel()
+    if "Dissimilarity" in feature_names:
+        props["Dissimilarity"] = flat @ np.abs(diff).ravel()
+    if "Homogeneity" in feature_names:
+        props["Homogeneity"] = flat @ (1.0 / (1.0 + diff ** 2)).ravel()
+    if "ASM" in feature_names or "Energy" in feature_names:
+        asm = np.einsum("ij,ij->i", flat, flat)
+        if "ASM" in feature_names:
+            props["ASM"] = asm
+        if "Energy" in feature_names:
+            props["Energy"] = np.sqrt(asm)
+    if "Correlation" in feature_names:
+        gray = np.arange(levels, dtype=np.float64)
+        p_i = P.sum(axis=2)
+        p_j = P.sum(axis=1)
+        diff_i = gray[None, :] - (p_i @ gray)[:, None]
+        diff_j = gray[None, :] - (p_j @ gray)[:, None]
+        std_i = np.sqrt(np.einsum("ni,ni->n", p_i, diff_i ** 2))
+        std_j = np.sqrt(np.einsum("nj,nj->n", p_j, diff_j ** 2))
+        cov = np.einsum("nij,ni,nj->n", P, diff_i, diff_j)
+        mask_0 = (std_i < 1e-15) | (std_j < 1e-15)
+        correlation = np.ones(n, dtype=np.float64)
+        correlation[~mask_0] = cov[~mask_0] / (std_i[~mask_0] * std_j[~mask_0])
+        props["Correlation"] = correlation
+    return props
+
+
+def glcm_window_features(quantized, distance, angles_rad, levels, symmetric,
+                         feature_names, window_size=16, step_size=8, chunk_shape=None):
+    """
+    Compute GLCM properties for every sliding window of a quantized image at once.
+
+    For each angle the image is turned into a map of co-occurrence codes
+    (i * levels + j), the windows are taken as a strided view of that map and
+    all their matrices are built with a single bincount per chunk of windows.
+    Properties are averaged over the angles like np.mean(graycoprops(...)[0]).
+
+    Returns {feature_name: (n_window_rows, n_window_cols) float64 array}.
+    """
+    height, width = quantized.shape
+    n_rows, n_cols = _glcm_grid_shape(height, width, window_size, step_size)
+    window_values = {name: np.zeros((n_rows, n_cols), dtype=np.float64)
+                     for name in feature_names}
+    if not feature_names or n_rows == 0 or n_cols == 0:
+        return window_values
+
+    n_cells = levels * levels
+    if chunk_shape is None:
+        chunk_shape = _glcm_chunk_shape(n_cols, levels)
+    rows_per_chunk, cols_per_chunk = chunk_shape
+    offsets = _glcm_offsets(distance, angles_rad)
+    q = quantized.astype(np.int32)
+
+    for dr, dc in offsets:
+        # Pairs inside a window start at most window_size - |offset| pixels away
+        h, w = window_size - abs(dr), window_size - abs(dc)
+        if h > 0 and w > 0:
+            r0, c0 = max(0, -dr), max(0, -dc)
+            r1, c1 = height - max(0, dr), width - max(0, dc)
+            codes = q[r0:r1, c0:c1] * levels + q[r0 + dr:r1 + dr, c0 + dc:c1 + dc]
+            windows = sliding_window_view(codes, (h, w))[::step_size, ::step_size]
+
+        for row_start in range(0, n_rows, rows_per_chunk):
+            row_stop = min(row_start + rows_per_chunk, n_rows)
+            for col_start in range(0, n_cols, cols_per_chunk):
+                col_stop = min(col_start + cols_per_chunk, n_cols)
+                n_windows = (row_stop - row_start) * (col_stop - col_start)
+                if h > 0 and w > 0:
+                    chunk = windows[row_start:row_stop, col_start:col_stop]
+                    chunk = chunk.reshape(n_windows, h * w)
+                    chunk = chunk + (np.arange(n_windows, dtype=np.int64) * n_cells)[:, None]
+                    counts = np.bincount(chunk.ravel(), minlength=n_windows * n_cells)
+                    counts = counts.reshape(n_windows, levels, levels).astype(np.float64)
+                    if symmetric:
+                        counts += counts.transpose(0, 2, 1)
+                else:
+                    counts = np.zeros((n_windows, levels, levels), dtype=np.float64)
+
+                block = (slice(row_start, row_stop), slice(col_start, col_stop))
+                for name, values in _glcm_props(counts, feature_names).items():
+                    window_values[name][block] += values.reshape(row_stop - row_start, -1)
+
+    for name in feature_names:
+        window_values[name] /= len(offsets)
+    return window_values
+
+
+def _glcm_band_worker(shm_name, shape, band_start, band_stop, distance, angles_rad,
+                      levels, symmetric, feature_names, window_size, step_size,
+                      chunk_shape):
+    """Compute window features for the image rows [band_start, band_stop) of a shared array"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        quantized = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        return glcm_window_features(quantized[band_start:band_stop], distance, angles_rad,
+                                    levels, symmetric, feature_names,
+                                    window_size, step_size, chunk_shape)
+    finally:
+        del quantized
+        shm.close()
+
+
+def glcm_window_features_parallel(quantized, distance, angles_rad, levels, symmetric,
+                                  feature_names, window_size=16, step_size=8, workers=2):
+    """
+    Multi-process version of glcm_window_features.
+
+    The quantized image is placed in shared memory and split into row bands
+    that overlap by the window halo. Band boundaries fall on the same chunk
+    boundaries the single-process path uses, so every chunk is computed on
+    identical input and the stitched result is bit-identical to it.
+    """
+    height, width = quantized.shape
+    n_rows, n_cols = _glcm_grid_shape(height, width, window_size, step_size)
+    chunk_shape = _glcm_chunk_shape(n_cols, levels)
+    rows_per_chunk = chunk_shape[0]
+    n_chunks = -(-n_rows // rows_per_chunk)
+    if workers <= 1 or n_chunks <= 1 or not feature_names:
+        return glcm_window_features(quantized, distance, angles_rad, levels, symmetric,
+                                    feature_names, window_size, step_size)
+    
+    # A few bands per worker keeps the pool busy when bands finish unevenly
+    chunks_per_band = max(1, -(-n_chunks // (workers * 4)))
+    rows_per_band = chunks_per_band * rows_per_chunk
+    bands = [(row, min(row + rows_per_band, n_rows)) for row in range(0, n_rows, rows_per_band)]
+    
+    shm = shared_memory.SharedMemory(create=True, size=quantized.nbytes)
+    try:
+        shared = np.ndarray(quantized.shape, dtype=np.uint8, buffer=shm.buf)
+        shared[:] = quantized
+        with ProcessPoolExecutor(max_workers=min(workers, len(bands))) as executor:
+            futures = [
+                executor.submit(
+                    _glcm_band_worker, shm.name, quantized.shape,
+                    row_start * step_size, (row_stop - 1) * step_size + window_size,
+                    distance, angles_rad, levels, symmetric, feature_names,
+                    window_size, step_size, chunk_shape
+                )
+                for row_start, row_stop in bands
+            ]
+            band_values = [future.result() for future in futures]
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    return {name: np.concatenate([values[name] for values in band_values], axis=0)
+            for name in feature_names}
+
+
+def accumulate_window_values(window_values, coverage, window_size, step_size):
+    """
+    Average per-window values over the pixels each window covers.
+
+    Window values are scattered into a difference array at the window corners
+    and integrated with two cumulative sums (a summed-area table), then divided
+    by the coverage count so every pixel gets the true mean of the windows that
+    overlap it. Pixels not covered by any window stay 0.
+    """
+    height, width = coverage.shape
+    n_rows, n_cols = window_values.shape
+    ys = np.arange(n_rows)[:, None] * step_size
+    xs = np.arange(n_cols)[None, :] * step_size
+    
+    diff = np.zeros((height + 1, width + 1), dtype=np.float64)
+    np.add.at(diff, (ys, xs), window_values)
+    np.add.at(diff, (ys + window_size, xs), -window_values)
+    np.add.at(diff, (ys, xs + window_size), -window_values)
+    np.add.at(diff, (ys + window_size, xs + window_size), window_values)
+    sums = diff.cumsum(axis=0).cumsum(axis=1)[:height, :width]
+    
+    feature_map = np.zeros((height, width), dtype=np.float32)
+    covered = coverage > 0
+    feature_map[covered] = sums[covered] / coverage[covered]
+    return feature_map
+
+
+def window_coverage(height, width, window_size, step_size):
+    """Number of sliding windows covering each pixel"""
+    ys = np.arange(0, height - window_size + 1, step_size)
+    xs = np.arange(0, width - window_size + 1, step_size)
+    
+    rows = np.zeros(height + 1, dtype=np.int64)
+    cols = np.zeros(width + 1, dtype=np.int64)
+    np.add.at(rows, ys, 1)
+    np.add.at(rows, ys + window_size, -1)
+    np.add.at(cols, xs, 1)
+    np.add.at(cols, xs + window_size, -1)
+    return np.outer(rows.cumsum()[:height], cols.cumsum()[:width])
+
+
+def compute_glcm_feature_maps(img_array, distance, angles_rad, levels, symmetric,
+                              feature_names, window_size=16, step_size=8, workers=1):
+    """
+    Vectorized GLCM feature maps for a grayscale array (unnormalized).
+    With workers > 1 the windows are computed in a process pool.
+    """
+    height, width = img_array.shape
+    quantized = quantize_gray_levels(img_array, levels)
+    window_values = glcm_window_features_parallel(quantized, distance, angles_rad, levels,
+                                                  symmetric, feature_names,
+                                                  window_size, step_size, workers)
+    coverage = window_coverage(height, width, window_size, step_size)
+    return {name: accumulate_window_values(values, coverage, window_size, step_size)
+            for name, values in window_values.items()}
+
+
+def glcm_window_features_reference(img_array, distance, angles_rad, levels,
+                                   symmetric, normalize, feature_names,
+                                   window_size=16, step_size=8):
+    """
+    Reference implementation of glcm_window_features: one graycomatrix /
+    graycoprops call per window. Kept to validate the vectorized engine against.
+    """
+    from skimage.feature import graycomatrix, graycoprops
+    
+    height, width = img_array.shape
+    ys = range(0, height - window_size + 1, step_size)
+    xs = range(0, width - window_size + 1, step_size)
+    window_values = {name: np.zeros((len(ys), len(xs)), dtype=np.float64)
+                     for name in feature_names}
+    
+    for iy, y in enumerate(ys):
+        for ix, x in enumerate(xs):
+            window = img_array[y:y+window_size, x:x+window_size]
+            
+            bins = np.linspace(0, 255, levels)
+            rescaled_window = np.digitize(window, bins) - 1
+            
+            glcm = graycomatrix(
+                rescaled_window, 
+                distances=[distance], 
+                angles=angles_rad,
+                levels=levels,
+                symmetric=symmetric,
+                normed=normalize
+            )
+            
+            for feature_name in window_values.keys():
+                if feature_name == "ASM":
+                    prop_name = "ASM"
+                else:
+                    prop_name = feature_name.lower()
+                
+                window_values[feature_name][iy, ix] = np.mean(graycoprops(glcm, prop_name)[0])
+    
+    return window_values
+
+
+def compute_glcm_feature_maps_reference(img_array, distance, angles_rad, levels,
+                                        symmetric, normalize, feature_names,
+                                        window_size=16, step_size=8):
+    """GLCM feature maps built from glcm_window_features_reference (unnormalized)"""
+    height, width = img_array.shape
+    window_values = glcm_window_features_reference(img_array, distance, angles_rad,
+                                                   levels, symmetric, normalize,
+                                                   feature_names, window_size, step_size)
+    coverage = window_coverage(height, width, window_size, step_size)
+    return {name: accumulate_window_values(values, coverage, window_size, step_size)
+            for name, values in window_values.items()}
+
+
+def normalize_feature_maps(feature_maps):
+    """Min-max scale every non-constant feature map to [0, 1]"""
+    normalized = {}
+    for feature_name, feature_map in feature_maps.items():
+        if np.max(feature_map) > np.min(feature_map):  
+            feature_map = (feature_map - np.min(feature_map)) / (np.max(feature_map) - np.min(feature_map))
+        normalized[feature_name] = feature_map
+    return normalized
+
+
+def glcm_features(image, distance=1, angles=("0°",), levels=64, symmetric=True,
+                  features=GLCM_FEATURES, window_size=16, step_size=8, workers=1):
+    """
+    GLCM texture feature maps of an image, each min-max scaled to [0, 1].
+    angles are keys of ANGLE_MAP, features a subset of GLCM_FEATURES.
+    Returns {feature_name: float32 array of the image size}.
+    """
+    img_array = np.array(image if image.mode == "L" else image.convert("L"))
+    feature_names = [name for name in GLCM_FEATURES if name in features]
+    angles_rad = [ANGLE_MAP[a] for a in angles]
+    feature_maps = compute_glcm_feature_maps(img_array, int(distance), angles_rad, int(levels),
+                                             symmetric, feature_names, int(window_size),
+                                             int(step_size), workers)
+    return normalize_feature_maps(feature_maps)
+
+
+def new_figure(*args, **kwargs):
+    """
+    A matplotlib figure that does not touch pyplot's global state, so
+    concurrent requests can render at the same time.
+    """
+    from matplotlib.figure import Figure
+    return Figure(*args, **kwargs)
+
+
+def render_figure(fig, **savefig_kwargs):
+    """Render a figure to a PNG and return it as a numpy array"""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', **savefig_kwargs)
+    buf.seek(0)
+    return np.array(Image.open(buf))
+
+
+def render_message(text, **text_kwargs):
+    """Image with a centered message, shown in place of the feature maps"""
+    fig = new_figure(figsize=(8, 6))
+    ax = fig.add_subplot()
+    ax.text(0.5, 0.5, text, ha='center', va='center', fontsize=14, **text_kwargs)
+    ax.axis('off')
+    return render_figure(fig)
+
 
 def process_glcm_features(
     input_dir, filename,
@@ -14,7 +391,7 @@ def process_glcm_features(
     include_contrast, include_dissimilarity,
     include_homogeneity, include_energy,
     include_correlation, include_asm,
-    lang="English"
+    lang="English", window_size=16, step_size=8, engine="vectorized", workers=1
 ):
     messages = lang_labels[lang]
     
@@ -22,96 +399,65 @@ def process_glcm_features(
         return None, [["No image selected", ""]], {}
     
     try:
+        from .tiled import use_tiled_io, tiled_glcm_features
         input_path = os.path.join(input_dir, filename)
-        image = Image.open(input_path)
-        
-        if image.mode != 'L':
-            image = image.convert('L')
         
-        img_array = np.array(image)
+        distance = int(distance)
+        levels = int(levels)
+        window_size = int(window_size)
+        step_size = int(step_size)
+        included = [include_contrast, include_dissimilarity, include_homogeneity,
+                    include_energy, include_correlation, include_asm]
+        feature_names = [name for name, include in zip(GLCM_FEATURES, included) if include]
+        angles_rad = [ANGLE_MAP[a] for a in angles]
+        output_paths = {}
         
-        window_size = 16  
-        step_size = 8     
-        
-        height, width = img_array.shape
-        
-        feature_maps = {}
-        if include_contrast:
-            feature_maps["Contrast"] = np.zeros((height, width), dtype=np.float32)
-        if include_dissimilarity:
-            feature_maps["Dissimilarity"] = np.zeros((height, width), dtype=np.float32)
-        if include_homogeneity:
-            feature_maps["Homogeneity"] = np.zeros((height, width), dtype=np.float32)
-        if include_energy:
-            feature_maps["Energy"] = np.zeros((height, width), dtype=np.float32)
-        if include_correlation:
-            feature_maps["Correlation"] = np.zeros((height, width), dtype=np.float32)
-        if include_asm:
-            feature_maps["ASM"] = np.zeros((height, width), dtype=np.float32)
-        
-        angle_map = {
-            "0°": 0,
-            "45°": np.pi/4,
-            "90°": np.pi/2,
-            "135°": 3*np.pi/4
-        }
-        angles_rad = [angle_map[a] for a in angles]
-        
-        for y in range(0, height - window_size + 1, step_size):
-            for x in range(0, width - window_size + 1, step_size):
-                window = img_array[y:y+window_size, x:x+window_size]
-                
-                max_value = levels - 1
-                bins = np.linspace(0, 255, levels)
-                rescaled_window = np.digitize(window, bins) - 1
-                
-                glcm = graycomatrix(
-                    rescaled_window, 
-                    distances=[distance], 
-                    angles=angles_rad,
-                    levels=levels,
-                    symmetric=symmetric,
-                    normed=normalize
+        if use_tiled_io(input_path):
+            # Large TIFFs are streamed tile by tile: the full-size maps are written
+            # as tiled TIFFs, the figure and the kept maps are downscaled copies
+            base = os.path.splitext(filename)[0]
+            out_prefix = os.path.join(messages["default_output"], base, f"{base}_glcm")
+            feature_maps, feature_stats, output_paths = tiled_glcm_features(
+                input_path, out_prefix, distance, angles, levels, symmetric,
+                feature_names, window_size, step_size
+            )
+        else:
+            img_array = np.array(read_image(input_path, "L"))
+            
+            if engine == "reference":
+                feature_maps = compute_glcm_feature_maps_reference(
+                    img_array, distance, angles_rad, levels, symmetric, normalize,
+                    feature_names, window_size, step_size
                 )
-                
-                for feature_name in feature_maps.keys():
-                    if feature_name == "ASM":
-                        prop_name = "ASM"
-                    else:
-                        prop_name = feature_name.lower()
-                    
-                    value = np.mean(graycoprops(glcm, prop_name)[0])
-                    
-                    for wy in range(window_size):
-                        for wx in range(window_size):
-                            py, px = y + wy, x + wx
-                            if py < height and px < width:
-                                if feature_maps[feature_name][py, px] != 0:
-                                    feature_maps[feature_name][py, px] = (feature_maps[feature_name][py, px] + value) / 2
-                                else:
-                                    feature_maps[feature_name][py, px] = value
-        
-        for feature_name, feature_map in feature_maps.items():
-            if np.max(feature_map) > np.min(feature_map):  
-                feature_maps[feature_name] = (feature_map - np.min(feature_map)) / (np.max(feature_map) - np.min(feature_map))
+            else:
+                feature_maps = compute_glcm_feature_maps(
+                    img_array, distance, angles_rad, levels, symmetric,
+                    feature_names, window_size, step_size, workers
+                )
+            
+            feature_maps = normalize_feature_maps(feature_maps)
+            feature_stats = {
+                feature_name: (np.mean(feature_map), np.std(feature_map),
+                               np.min(feature_map), np.max(feature_map))
+                for feature_name, feature_map in feature_maps.items()
+            }
         
         feature_table = []
-        for feature_name, feature_map in feature_maps.items():
-            mean_value = np.mean(feature_map)
-            std_value = np.std(feature_map)
-            min_value = np.min(feature_map)
-            max_value = np.max(feature_map)
+        for feature_name, (mean_value, std_value, min_value, max_value) in feature_stats.items():
             feature_table.append([
                 feature_name, 
                 f"{mean_value:.5f} ± {std_value:.5f} (min: {min_value:.5f}, max: {max_value:.5f})"
             ])
+        if output_paths:
+            feature_table.append(["Output", ", ".join(output_paths.values())])
         
         if feature_maps:
             n_features = len(feature_maps)
             n_cols = min(n_features, 3)  
             n_rows = (n_features + n_cols - 1) // n_cols  
             
-            fig, axes = plt.subplots(n_rows, n_cols, figsize=(12, 4*n_rows))
+            fig = new_figure(figsize=(12, 4*n_rows))
+            axes = fig.subplots(n_rows, n_cols)
             if n_features == 1:  
                 axes = np.array([axes])
             axes = axes.flatten()
@@ -126,40 +472,17 @@ def process_glcm_features(
             for i in range(n_features, len(axes)):
                 axes[i].axis('off')
                 
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=150)
-            buf.seek(0)
-            feature_img = np.array(Image.open(buf))
-            plt.close(fig)
+            fig.tight_layout()
+            feature_img = render_figure(fig, dpi=150)
             
             return feature_img, feature_table, feature_maps
         else:
-            plt.figure(figsize=(8, 6))
-            plt.text(0.5, 0.5, "No features selected", 
-                     ha='center', va='center', fontsize=14)
-            plt.axis('off')
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            empty_img = np.array(Image.open(buf))
-            plt.close()
+            empty_img = render_message("No features selected")
             
             return empty_img, [["No features selected", ""]], {}
     
     except Exception as e:
         # 错误处理
-        plt.figure(figsize=(8, 6))
-        plt.text(0.5, 0.5, f"Error: {str(e)}", 
-                 ha='center', va='center', fontsize=14, color='red')
-        plt.axis('off')
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        error_img = np.array(Image.open(buf))
-        plt.close()
+        error_img = render_message(f"Error: {str(e)}", color='red')
         
         return error_img, [["Error", str(e)]], {}
\ No newline at end of file
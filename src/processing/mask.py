@@ -1,28 +1,48 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from PIL import Image, ImageFilter
-from ..utils import lang_labels
+from ..utils import lang_labels, read_image, save_output, atomic_save, encode_output, display_result
+from .point import point_transform, point_lut, apply_lut
+from .batch import resolve_batch_files, PROGRESS_INTERVAL
 import numpy as np
 
-def process_mask(dir_mask, mask_file, dir_image, image_file, use_img,
-                out_dir, out_filename, lang):
-    
-    messages = lang_labels[lang]
-    if not mask_file:
-        return None, messages["no_image"]
+# Mask pixels above this (0-1 of the gray range, i.e. above 128) are drawn
+MASK_THRESHOLD = 128 / 255
+# Masks rendered together by process_mask_set take at most about this much memory
+MASK_SET_CHUNK_BYTES = 256 * 1024 * 1024
 
-    mask_path = os.path.join(dir_mask, mask_file)
-    mask = Image.open(mask_path).convert("L")
-    canvas_width, canvas_height = mask.size
-    background = Image.new("RGB", (canvas_width, canvas_height), (255, 255, 255))
-    mask_binary = mask.point(lambda p: 255 if p > 128 else 0)
-    if use_img == "Yes":
-        image_path = os.path.join(dir_image, image_file)
-        img_input = Image.open(image_path).convert("RGB").resize((canvas_width, canvas_height))
-        output = Image.composite(img_input, background, mask_binary)
+def render_mask(mask, image=None):
+    """
+    Render a mask on a white canvas of the mask's size: pixels where the "L"
+    mask is above 128 show the RGB image (resized to the mask), or black when
+    no image is given, in which case the result is a single "L" lookup.
+    """
+    if image is None:
+        return point_transform(mask, MASK_THRESHOLD, invert=True)
+    background = Image.new("RGB", mask.size, (255, 255, 255))
+    mask_binary = point_transform(mask, MASK_THRESHOLD)
+    img_input = image.resize(mask.size)
+    return Image.composite(img_input, background, mask_binary)
+
+def render_masks(masks, image=None):
+    """
+    render_mask for same-sized "L" masks at once: the image is resized once,
+    then all masks are thresholded with one lookup and composited in one
+    vectorized pass. Returns the rendered images in order.
+    """
+    stack = np.stack([np.asarray(mask) for mask in masks])
+    if image is None:
+        rendered = apply_lut(stack, point_lut(MASK_THRESHOLD, invert=True))
     else:
-        black_image = Image.new("RGB", (canvas_width, canvas_height), (0, 0, 0))
-        output = Image.composite(black_image, background, mask_binary)
-    
+        source = np.asarray(image.resize(masks[0].size))
+        # Same selection as point_transform(mask, MASK_THRESHOLD): above 128
+        selected = stack > round(MASK_THRESHOLD * 255)
+        rendered = np.where(selected[..., None], source, np.uint8(255))
+    return [Image.fromarray(array) for array in rendered]
+
+def _mask_output_path(mask_file, out_dir, out_filename):
+    """Output path of a rendered mask; default folder output/<mask name>"""
     base, ext = os.path.splitext(mask_file)
     if not out_dir or out_dir.strip() == "" or out_dir.strip() == "output":
         out_dir = os.path.join("output", base)
@@ -31,12 +51,138 @@ def process_mask(dir_mask, mask_file, dir_image, image_file, use_img,
     mode_str = "stroke"
     if not out_filename:
         out_filename = f"{base}_{mode_str}{ext}"
-    out_path = os.path.join(out_dir, out_filename)
+    return os.path.join(out_dir, out_filename)
+
+def process_mask(dir_mask, mask_file, dir_image, image_file, use_img,
+                out_dir, out_filename, lang="English", encoding=None):
     
+    messages = lang_labels[lang]
+    if not mask_file:
+        return None, messages["no_image"]
+
+    mask_path = os.path.join(dir_mask, mask_file)
+    mask = read_image(mask_path, "L")
+    image = None
+    if use_img == "Yes":
+        image_path = os.path.join(dir_image, image_file)
+        # Only needed at the mask's size
+        image = read_image(image_path, "RGB", size=mask.size)
+    output = render_mask(mask, image)
+    
+    out_path = _mask_output_path(mask_file, out_dir, out_filename)
+    status = save_output(output, out_path, lang, encoding)
+
+    return display_result(output), status
+
+def _save_encoded(output, out_path, encoding):
+    """Save one rendered mask with an encoding profile; returns the path written"""
+    output, out_path, params = encode_output(output, out_path, encoding)
+    return atomic_save(output, out_path, **params)
+
+def process_mask_set(batch_source, args, lang="English", workers=None, executor="thread"):
+    """
+    Batch mode of the mask tab: render every mask of a folder or glob over
+    one source image, yielding (None, status) for Gradio. args are
+    process_mask's arguments after the mask (dir_image, image_file, use_img,
+    out_dir, out_filename, lang, encoding).
+    
+    Masks are decoded `workers` at a time and collected by size; the source
+    is decoded and resized once per mask size, and each size's masks are
+    rendered together by render_masks once about MASK_SET_CHUNK_BYTES of
+    them are waiting. A chunk is written by the worker threads while the
+    next one is decoded and rendered. The executor choice is ignored:
+    rendering is vectorized and decoding and writing run on threads.
+    """
+    dir_image, image_file, use_img, out_dir, _, _, encoding = args[:7]
+    messages = lang_labels[lang]
     try:
-        output.save(out_path)
-        status = messages["save_success"].format(out_path)
+        files = resolve_batch_files(batch_source)
     except Exception as e:
-        status = messages["save_failed"].format(str(e))
+        yield None, messages["process_failed"].format(str(e))
+        return
+    if not files:
+        yield None, messages["batch_empty"]
+        return
+    
+    image_path = os.path.join(dir_image, image_file) if use_img == "Yes" and image_file else None
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    start = last_update = time.perf_counter()
+    done = 0
+    failures = []
+    last_message = ""
+    sources = {}
+    pending = {}
+    writing = {}
+    
+    def collect_writes():
+        """Wait for the queued writes, counting them"""
+        nonlocal done, last_message
+        for future in wait(writing).done:
+            done += 1
+            try:
+                last_message = messages["save_success"].format(future.result())
+            except Exception as e:
+                last_message = f"{writing[future]}: {e}"
+                failures.append(last_message)
+        writing.clear()
+    
+    def render(size):
+        """Render the waiting masks of one size and queue their writes"""
+        nonlocal done
+        chunk = pending.pop(size)
+        try:
+            if image_path and size not in sources:
+                sources[size] = read_image(image_path, "RGB", size=size).resize(size)
+            rendered = render_masks([mask for _, mask in chunk], sources.get(size))
+        except Exception as e:
+            failures.extend(f"{filename}: {e}" for filename, _ in chunk)
+            done += len(chunk)
+            return
+        # Back-pressure: the previous chunk is written before this one is queued
+        collect_writes()
+        for (filename, _), output in zip(chunk, rendered):
+            future = pool.submit(_save_encoded, output, _mask_output_path(filename, out_dir, ""),
+                                 encoding)
+            writing[future] = filename
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for offset in range(0, len(files), workers):
+            batch = files[offset:offset + workers]
+            paths = [os.path.join(input_dir, filename) for input_dir, filename in batch]
+            for (_, filename), mask in zip(batch, pool.map(_read_mask, paths)):
+                if isinstance(mask, Exception):
+                    failures.append(f"{filename}: {mask}")
+                    done += 1
+                    continue
+                chunk = pending.setdefault(mask.size, [])
+                chunk.append((filename, mask))
+                channels = 3 if image_path else 1
+                if len(chunk) * mask.width * mask.height * channels >= MASK_SET_CHUNK_BYTES:
+                    render(mask.size)
+            
+            now = time.perf_counter()
+            if now - last_update >= PROGRESS_INTERVAL:
+                last_update = now
+                yield None, "\n".join([
+                    messages["batch_progress"].format(done, len(files), done / (now - start),
+                                                      len(failures)),
+                    last_message
+                ])
+        for size in list(pending):
+            render(size)
+        collect_writes()
+    
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    lines = [messages["batch_summary"].format(done - len(failures), len(failures), elapsed, rate)]
+    if failures:
+        lines.append(messages["batch_failures"])
+        lines.extend(failures)
+    yield None, "\n".join(lines)
 
-    return np.array(output) / 255.0, status
+def _read_mask(path):
+    """The "L" mask at path, or the exception reading it raised"""
+    try:
+        return read_image(path, "L")
+    except Exception as e:
+        return e
@@ -1,8 +1,77 @@
 import os
+from functools import lru_cache
 import numpy as np
 from PIL import Image
-import cv2
-from ..utils import lang_labels
+from ..utils import lang_labels, read_image, save_output, display_result
+
+MORPHOLOGY_OPERATIONS = ("erosion", "dilation", "opening", "closing")
+# Structuring element shapes, as named in the UI, CLI and pipeline specs
+MORPHOLOGY_SHAPES = ("rect", "ellipse", "cross")
+
+
+@lru_cache(maxsize=128)
+def structuring_element(shape, size):
+    """Read-only size x size structuring element of one of MORPHOLOGY_SHAPES, cached"""
+    import cv2
+    
+    flags = {"rect": cv2.MORPH_RECT, "ellipse": cv2.MORPH_ELLIPSE, "cross": cv2.MORPH_CROSS}
+    if shape not in flags:
+        raise ValueError(f"Unknown structuring element: {shape}")
+    element = cv2.getStructuringElement(flags[shape], (size, size))
+    element.flags.writeable = False
+    return element
+
+
+def morphology_passes(erosion=None, dilation=None, opening=None, closing=None, shape="rect"):
+    """
+    The requested operations as ("erode" | "dilate", size, anchor) passes in
+    the order erosion, dilation, opening, closing. Consecutive passes of the
+    same kind are merged for rect elements: a box of a then a box of b is
+    one box of a + b - 1 anchored at the sum of the anchors, which gives the
+    same result, borders included. Kernels of size 1 are no-ops and dropped.
+    """
+    passes = []
+    for kernel, kinds in ((erosion, ("erode",)), (dilation, ("dilate",)),
+                          (opening, ("erode", "dilate")), (closing, ("dilate", "erode"))):
+        if kernel is None or int(kernel) <= 1:
+            continue
+        size = int(kernel)
+        for kind in kinds:
+            if shape == "rect" and passes and passes[-1][0] == kind:
+                _, last_size, last_anchor = passes.pop()
+                passes.append((kind, last_size + size - 1, last_anchor + size // 2))
+            else:
+                passes.append((kind, size, size // 2))
+    return passes
+
+
+def apply_morphology(image, erosion=None, dilation=None, opening=None, closing=None,
+                     shape="rect"):
+    """
+    Binarize an image at 127 and apply the requested operations in the order
+    erosion, dilation, opening, closing. Each argument is a kernel size, or
+    None to skip that operation; shape is one of MORPHOLOGY_SHAPES. All
+    passes run in place on the one binarized buffer. Returns an "L" image.
+    """
+    import cv2
+    
+    img_array = np.asarray(image)
+    if len(img_array.shape) == 3:
+        gray_img = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        result = gray_img
+    else:
+        gray_img = img_array
+        result = np.empty_like(gray_img)
+    
+    cv2.threshold(gray_img, 127, 255, cv2.THRESH_BINARY, dst=result)
+    
+    operations = {"erode": cv2.erode, "dilate": cv2.dilate}
+    for kind, size, anchor in morphology_passes(erosion, dilation, opening, closing, shape):
+        operations[kind](result, structuring_element(shape, size), dst=result,
+                         anchor=(anchor, anchor))
+    
+    return Image.fromarray(result)
+
 
 def process_morphology(
     input_dir, filename, 
@@ -10,7 +79,7 @@ def process_morphology(
     apply_dilation, dilation_kernel,
     apply_opening, opening_kernel,
     apply_closing, closing_kernel,
-    out_dir, out_filename, lang="English"
+    out_dir, out_filename, lang="English", kernel_shape="rect", encoding=None
 ):
     messages = lang_labels[lang]
     if not filename:
@@ -18,48 +87,23 @@ def process_morphology(
     
     input_path = os.path.join(input_dir, filename)
     try:
-        image = Image.open(input_path)
-        
-        img_array = np.array(image)
-        if len(img_array.shape) == 3:
-            gray_img = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray_img = img_array
-        
-        _, binary_img = cv2.threshold(gray_img, 127, 255, cv2.THRESH_BINARY)
-        result = binary_img.copy()
-        
-        applied_operations = []
-        
-        if apply_erosion == "Yes":
-            kernel_size = int(erosion_kernel)
-            kernel = np.ones((kernel_size, kernel_size), np.uint8)
-            result = cv2.erode(result, kernel, iterations=1)
-            applied_operations.append("erosion")
-        
-        if apply_dilation == "Yes":
-            kernel_size = int(dilation_kernel)
-            kernel = np.ones((kernel_size, kernel_size), np.uint8)
-            result = cv2.dilate(result, kernel, iterations=1)
-            applied_operations.append("dilation")
-        
-        if apply_opening == "Yes":
-            kernel_size = int(opening_kernel)
-            kernel = np.ones((kernel_size, kernel_size), np.uint8)
-            result = cv2.morphologyEx(result, cv2.MORPH_OPEN, kernel)
-            applied_operations.append("opening")
-        
-        if apply_closing == "Yes":
-            kernel_size = int(closing_kernel)
-            kernel = np.ones((kernel_size, kernel_size), np.uint8)
-            result = cv2.morphologyEx(result, cv2.MORPH_CLOSE, kernel)
-            applied_operations.append("closing")
+        from .tiled import use_tiled_io, tiled_morphology, tiled_output_path
         
-        output_img = Image.fromarray(result)
+        kernel_sizes = [
+            int(kernel) if apply == "Yes" else None
+            for apply, kernel in ((apply_erosion, erosion_kernel),
+                                  (apply_dilation, dilation_kernel),
+                                  (apply_opening, opening_kernel),
+                                  (apply_closing, closing_kernel))
+        ]
+        applied_operations = [name for name, kernel in zip(MORPHOLOGY_OPERATIONS, kernel_sizes)
+                              if kernel is not None]
         
         base, ext = os.path.splitext(filename)
         
         operations_str = "_".join(applied_operations) if applied_operations else "original"
+        if applied_operations and kernel_shape != "rect":
+            operations_str += f"_{kernel_shape}"
         
         if not out_dir or out_dir.strip() == "":
             out_dir = os.path.join("output", base)
@@ -70,8 +114,14 @@ def process_morphology(
             out_filename = f"{base}_morph_{operations_str}{ext}"
         out_path = os.path.join(out_dir, out_filename)
         
-        output_img.save(out_path)
-        return output_img, messages["save_success"].format(out_path)
+        if use_tiled_io(input_path):
+            # Large TIFFs are streamed tile by tile; a downscaled copy is returned
+            out_path = tiled_output_path(out_path)
+            output_img = tiled_morphology(input_path, out_path, *kernel_sizes, kernel_shape)
+            return display_result(output_img), messages["save_success"].format(out_path)
+        output_img = apply_morphology(read_image(input_path, None), *kernel_sizes, kernel_shape)
+        status = save_output(output_img, out_path, lang, encoding)
+        return display_result(output_img), status
     
     except Exception as e:
         return None, messages["process_failed"].format(str(e))
\ No newline at end of file
@@ -0,0 +1,276 @@
+import os
+import zlib
+import inspect
+import itertools
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from PIL import Image
+from ..utils import (get_setting, image_cache, deferred_writes, deferring_writes, queue_writes,
+                     lang_labels)
+
+# Arrays smaller than this are cheaper to pickle than to place in shared memory
+SHARED_MEMORY_MIN_BYTES = 64 * 1024
+
+_pools = []
+_pool_lock = threading.Lock()
+_round_robin = itertools.count()
+
+
+class SharedArray:
+    """
+    Picklable handle to an array in a shared memory block. `mode` is set when
+    the array is the pixel data of a PIL image.
+    """
+
+    def __init__(self, array, mode=None):
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self.mode = mode
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        self.name = shm.name
+        shm.close()
+        # The receiving process unlinks the block, not this one's resource tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    def take(self, unlink=True):
+        """Copy the array (or image) out of shared memory, unlinking the block"""
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            array = np.array(np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf))
+        finally:
+            shm.close()
+            if unlink:
+                shm.unlink()
+            else:
+                # Only the process that unlinks keeps the block registered
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return Image.fromarray(array, self.mode) if self.mode else array
+
+
+def to_shared(value):
+    """Replace large arrays and images nested in tuples/lists/dicts with SharedArray handles"""
+    if isinstance(value, Image.Image):
+        array = np.asarray(value)
+        if value.mode in ("RGB", "RGBA", "L") and array.nbytes >= SHARED_MEMORY_MIN_BYTES:
+            return SharedArray(array, value.mode)
+        return value
+    if isinstance(value, np.ndarray):
+        return SharedArray(value) if value.nbytes >= SHARED_MEMORY_MIN_BYTES else value
+    if isinstance(value, (tuple, list)):
+        return type(value)(to_shared(item) for item in value)
+    if isinstance(value, dict):
+        return {key: to_shared(item) for key, item in value.items()}
+    return value
+
+
+def from_shared(value, unlink=True):
+    """Inverse of to_shared; every block is unlinked once read unless unlink is False"""
+    if isinstance(value, SharedArray):
+        return value.take(unlink)
+    if isinstance(value, (tuple, list)):
+        return type(value)(from_shared(item, unlink) for item in value)
+    if isinstance(value, dict):
+        return {key: from_shared(item, unlink) for key, item in value.items()}
+    return value
+
+
+def release_shared(value):
+    """Unlink the blocks of a to_shared value that will never be read"""
+    if isinstance(value, SharedArray):
+        try:
+            shared_memory.SharedMemory(name=value.name).unlink()
+        except FileNotFoundError:
+            pass
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            release_shared(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            release_shared(item)
+
+
+def _init_worker(cache_bytes):
+    """Warm a pool worker: share the image cache budget and preload the heavy modules"""
+    image_cache.set_max_bytes(cache_bytes)
+    for module in ("cv2", "skimage.filters", "skimage.feature", "matplotlib.figure"):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def _call_shared(fn, args, defer_writes=False):
+    """
+    Pool-side half of run_in_process. With defer_writes the saves fn makes
+    are returned with its result, for the calling process's output writer:
+    the full-resolution images to save come back through shared memory
+    along with the (display-sized) result.
+    """
+    if not defer_writes:
+        return to_shared(fn(*from_shared(args, unlink=False)))
+    with deferred_writes(record_only=True) as requests:
+        result = fn(*from_shared(args, unlink=False))
+    return to_shared((result, requests))
+
+
+def process_workers():
+    """Size of the offload pool; 0 runs handlers in the calling thread"""
+    return get_setting("process_workers", os.cpu_count() or 1, int)
+
+
+def get_process_pool(key=None):
+    """
+    One worker of the warm process pool, the workers being created together
+    on first use (None when disabled). Each worker is a single-process pool
+    with its own share of the image cache budget, so calls with the same key
+    (an input file) always go to the same worker and find the file still
+    decoded there (concurrent calls on one file queue on its worker);
+    calls without a key go round robin.
+    """
+    workers = process_workers()
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if not _pools:
+            _pools.extend(_new_worker(workers) for _ in range(workers))
+        if key is None:
+            return _pools[next(_round_robin) % len(_pools)]
+        return _pools[zlib.crc32(key.encode("utf-8", "surrogatepass")) % len(_pools)]
+
+
+def process_context():
+    """
+    Start method of the process pools: forkserver (spawn where it is not
+    available), since forking the threaded server can hand the child a lock
+    that another thread held and deadlock it.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def process_pool_started():
+    """True in the process running the warm pool, once it has been created"""
+    return bool(_pools) and multiprocessing.parent_process() is None
+
+
+def _new_worker(workers):
+    return ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=process_context(),
+        initializer=_init_worker,
+        initargs=(image_cache.max_bytes // workers,)
+    )
+
+
+def _replace_worker(pool):
+    """
+    Put a fresh worker in the slot of `pool`, whose process died (killed,
+    out of memory, crashed in native code): a broken executor never
+    recovers, and affinity would keep sending the same files to it.
+    """
+    with _pool_lock:
+        if pool in _pools:
+            _pools[_pools.index(pool)] = _new_worker(len(_pools))
+    pool.shutdown(wait=False)
+
+
+def start_process_pool():
+    """Create the pool and start every worker now instead of on the first request"""
+    if get_process_pool() is not None:
+        for future in [pool.submit(os.getpid) for pool in _pools]:
+            future.result()
+    return _pools
+
+
+def shutdown_process_pool():
+    with _pool_lock:
+        for pool in _pools:
+            pool.shutdown()
+        _pools.clear()
+
+
+def call_lang(fn, args):
+    """The `lang` argument of the call fn(*args), "English" when it is not passed"""
+    try:
+        index = list(inspect.signature(fn).parameters).index("lang")
+    except ValueError:
+        return "English"
+    return args[index] if index < len(args) else "English"
+
+
+def _affinity_key(args):
+    """Input file of a handler call (input_dir, filename, ...), which picks its worker"""
+    if len(args) >= 2 and isinstance(args[0], str) and isinstance(args[1], str):
+        return os.path.join(args[0], args[1])
+    return None
+
+
+def _submit(pool, fn, shared_args, defer_writes):
+    try:
+        return pool.submit(_call_shared, fn, shared_args, defer_writes).result()
+    except BrokenProcessPool:
+        _replace_worker(pool)
+        raise
+
+
+def run_in_process(fn, *args):
+    """
+    Run fn(*args) in the warm process pool and return its result.
+
+    Calls on the same input file (args starting with input_dir, filename)
+    run on the same worker, see get_process_pool. Images and arrays in the
+    arguments and the result travel through shared memory instead of being
+    pickled. Inside utils.deferred_writes, the images fn saves come back too
+    and are queued on this process's output writer. fn must be a
+    module-level function. Runs fn directly when offloading is disabled or
+    when already inside a worker (e.g. a process-pool batch), so calls never
+    nest pools.
+
+    When the worker dies during the call it is replaced and the call retried
+    once; BrokenProcessPool is raised if the fresh worker dies too.
+    """
+    key = _affinity_key(args)
+    pool = get_process_pool(key) if multiprocessing.parent_process() is None else None
+    if pool is None:
+        return fn(*args)
+    defer_writes = deferring_writes()
+    shared_args = to_shared(args)
+    try:
+        try:
+            result = _submit(pool, fn, shared_args, defer_writes)
+        except BrokenProcessPool:
+            result = _submit(get_process_pool(key), fn, shared_args, defer_writes)
+    finally:
+        release_shared(shared_args)
+    if not defer_writes:
+        return from_shared(result)
+    result, requests = from_shared(result)
+    queue_writes(requests)
+    return result
+
+
+class offload:
+    """
+    Wrap a handler so each call runs through run_in_process. The wrapper is
+    picklable and keeps fn's name, so it can be passed to batch_handler and
+    to process-pool batches like the plain function. fn returns (image,
+    status); a call whose worker keeps dying returns (None, process_failed
+    status) like a failing handler, in fn's `lang`.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        functools.update_wrapper(self, fn)
+
+    def __call__(self, *args):
+        try:
+            return run_in_process(self.fn, *args)
+        except BrokenProcessPool as e:
+            messages = lang_labels.get(call_lang(self.fn, args), lang_labels["English"])
+            return None, messages["process_failed"].format(str(e))
\ No newline at end of file
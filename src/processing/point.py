@@ -0,0 +1,56 @@
+import numpy as np
+from PIL import Image
+
+# Stage order inside a point transform; every step maps 0-255 to 0-255
+POINT_STEPS = ("levels", "gamma", "threshold", "invert")
+
+
+def point_lut(threshold=None, invert=False, gamma=None, levels=None):
+    """
+    Compile the point operations into one 256-entry uint8 lookup table,
+    applied in the order of POINT_STEPS:
+      - levels: (black, white) input points stretched to 0-255
+      - gamma: v ** (1 / gamma) on 0-1 values, > 1 brightens the midtones
+      - threshold: 0-1 of the gray range, values above it become 255, others 0
+      - invert: 255 - v
+    """
+    values = np.arange(256, dtype=np.float64)
+    if levels is not None:
+        black, white = (float(level) for level in levels)
+        if white <= black:
+            raise ValueError("levels: white must be above black")
+        values = np.clip((values - black) * (255.0 / (white - black)), 0, 255)
+    if gamma is not None and float(gamma) != 1.0:
+        if float(gamma) <= 0:
+            raise ValueError("gamma must be positive")
+        values = 255.0 * (values / 255.0) ** (1.0 / float(gamma))
+    values = np.rint(values)
+    if threshold is not None:
+        values = np.where(values > float(threshold) * 255, 255.0, 0.0)
+    if invert:
+        values = 255.0 - values
+    return values.astype(np.uint8)
+
+
+def apply_lut(pixels, lut):
+    """
+    Map pixels through a 256-entry table in one pass: "L" images stay PIL
+    images (Image.point's table path), uint8 arrays of any shape go through
+    cv2.LUT.
+    """
+    import cv2
+    
+    if isinstance(pixels, Image.Image):
+        return pixels.point(lut.tolist())
+    pixels = np.ascontiguousarray(pixels)
+    return cv2.LUT(pixels.reshape(-1, pixels.shape[-1]), lut).reshape(pixels.shape)
+
+
+def point_transform(image, threshold=None, invert=False, gamma=None, levels=None):
+    """
+    Apply levels, gamma, threshold and invert (see point_lut) to an image
+    as a single lookup. The result is a single-channel "L" image.
+    """
+    if image.mode != "L":
+        image = image.convert("L")
+    return apply_lut(image, point_lut(threshold, invert, gamma, levels))
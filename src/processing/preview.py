@@ -0,0 +1,136 @@
+import os
+from PIL import Image
+from ..utils import (get_setting, image_cache, ImageCache, read_image, image_size,
+                     rasterize_svg_to_fit, svg_size)
+from .resize import aspect_resize, custom_resize, _ui_finish_options
+from .crop import crop_and_fit
+from .morphology import apply_morphology
+from .edge import detect_edges, detect_edges_multi, EDGE_ALGORITHMS, ALL_EDGE_ALGORITHMS
+
+# Default long side of the proxy images live previews run on
+DEFAULT_PREVIEW_SIZE = 1024
+
+
+def preview_size():
+    return get_setting("preview_size", DEFAULT_PREVIEW_SIZE, int)
+
+
+def load_preview(path, long_side=None):
+    """
+    Return (proxy, scale): a downscaled RGB copy of the image whose long side is
+    at most `long_side` (default: the preview_size setting) and its size
+    relative to the original. Proxies are kept in the shared image cache, so
+    moving a slider never decodes or downsamples the original again.
+    """
+    long_side = long_side or preview_size()
+    if path.lower().endswith(".svg"):
+        width, height = svg_size(path)
+        proxy = rasterize_svg_to_fit(path, min(long_side, max(width, height)))
+        return proxy, proxy.width / width
+
+    key = ImageCache.make_key(path, ("preview", long_side))
+    proxy = image_cache.lookup(key)
+    if proxy is None:
+        width, height = image_size(path)
+        if max(width, height) <= long_side:
+            return read_image(path, "RGB"), 1.0
+        # Decoded at reduced scale, so the original is never held in full
+        proxy = read_image(path, "RGB", long_side=long_side).copy()
+        proxy.thumbnail((long_side, long_side), Image.LANCZOS)
+        proxy.info["preview_scale"] = proxy.width / width
+        image_cache.put(key, proxy)
+    return proxy, proxy.info["preview_scale"]
+
+
+def _output_scale(*sizes):
+    """Factor that keeps a preview's output size within preview_size"""
+    return min(1.0, preview_size() / max(sizes))
+
+
+def _scaled_kernel(kernel, scale):
+    """Odd kernel size covering the same fraction of the proxy as of the original"""
+    return max(1, int(round(int(kernel) * scale)) | 1)
+
+
+def preview_aspect(input_dir, filename, target_size, output_square, apply_binary,
+                   binary_threshold, margin, apply_blur, blur_radius):
+    """Aspect rescale of the preview proxy; None when no image is selected"""
+    if not filename:
+        return None
+    proxy, _ = load_preview(os.path.join(input_dir, filename))
+    binary_threshold, blur_radius = _ui_finish_options(apply_binary, binary_threshold,
+                                                       apply_blur, blur_radius)
+    k = _output_scale(target_size)
+    return aspect_resize(proxy, int(round(target_size * k)), output_square,
+                         int(round(margin * k)), binary_threshold,
+                         blur_radius * k if blur_radius is not None else None)
+
+
+def preview_custom(input_dir, filename, target_width, target_height, apply_binary,
+                   binary_threshold, apply_blur, blur_radius):
+    """Custom resize of the preview proxy; None when no image is selected"""
+    if not filename:
+        return None
+    proxy, _ = load_preview(os.path.join(input_dir, filename))
+    binary_threshold, blur_radius = _ui_finish_options(apply_binary, binary_threshold,
+                                                       apply_blur, blur_radius)
+    k = _output_scale(target_width, target_height)
+    return custom_resize(proxy, max(1, int(round(target_width * k))),
+                         max(1, int(round(target_height * k))), binary_threshold,
+                         blur_radius * k if blur_radius is not None else None)
+
+
+def preview_crop(input_dir, filename, top, bottom, left, right, target_size,
+                 output_square, margin):
+    """Crop of the preview proxy, with the margins scaled from original pixels"""
+    if not filename:
+        return None
+    proxy, scale = load_preview(os.path.join(input_dir, filename))
+    top, bottom, left, right = (int(round(v * scale)) for v in (top, bottom, left, right))
+    k = _output_scale(target_size + 2 * margin)
+    return crop_and_fit(proxy, top, bottom, left, right, int(round(target_size * k)),
+                        output_square, int(round(margin * k)))
+
+
+def preview_morphology(input_dir, filename, apply_erosion, erosion_kernel,
+                       apply_dilation, dilation_kernel, apply_opening, opening_kernel,
+                       apply_closing, closing_kernel, kernel_shape="rect"):
+    """Morphology on the preview proxy with kernels scaled to its resolution"""
+    if not filename:
+        return None
+    proxy, scale = load_preview(os.path.join(input_dir, filename))
+    kernel_sizes = [
+        _scaled_kernel(kernel, scale) if apply == "Yes" else None
+        for apply, kernel in ((apply_erosion, erosion_kernel),
+                              (apply_dilation, dilation_kernel),
+                              (apply_opening, opening_kernel),
+                              (apply_closing, closing_kernel))
+    ]
+    return apply_morphology(proxy, *kernel_sizes, kernel_shape)
+
+
+def preview_edge(input_dir, filename, algorithm, canny_low, canny_high, sigma):
+    """Edge detection on the preview proxy with the LoG sigma scaled to its resolution"""
+    if not filename:
+        return None
+    proxy, scale = load_preview(os.path.join(input_dir, filename))
+    sigma = max(0.1, sigma * scale)
+    if algorithm == ALL_EDGE_ALGORITHMS:
+        return _contact_sheet(detect_edges_multi(proxy, EDGE_ALGORITHMS, canny_low, canny_high,
+                                                 sigma).values())
+    return detect_edges(proxy, algorithm, canny_low, canny_high, sigma)
+
+
+def _contact_sheet(images, columns=3):
+    """Same-sized images laid out in a grid, each scaled to fit a preview-sized sheet"""
+    images = list(images)
+    rows = -(-len(images) // columns)
+    width, height = images[0].size
+    cell = preview_size() / max(columns * width, rows * height)
+    cell_size = (max(1, round(width * cell)), max(1, round(height * cell)))
+    sheet = Image.new(images[0].mode, (cell_size[0] * columns, cell_size[1] * rows))
+    for index, image in enumerate(images):
+        row, column = divmod(index, columns)
+        sheet.paste(image.resize(cell_size, Image.BILINEAR),
+                    (column * cell_size[0], row * cell_size[1]))
+    return sheet
\ No newline at end of file
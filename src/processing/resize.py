@@ -1,36 +1,25 @@
-import io
 import os
-import cairosvg
 from PIL import Image, ImageFilter
-from ..utils import lang_labels
+from ..utils import lang_labels, read_image, save_output, display_result
+from .point import point_transform
 
-def load_image(input_path, lang="English"):
-    """Helper function to load both regular images and SVGs"""
+def load_image(input_path, lang="English", long_side=None, size=None):
+    """
+    Helper function to load both regular images and SVGs as RGB.
+    With the long side (`long_side`) or the size (`size`) the caller will
+    resize to, SVGs are rendered at that size and large rasters are decoded
+    at a reduced scale instead of in full (see utils.read_image).
+    """
     messages = lang_labels[lang]
     
     if not os.path.exists(input_path):
         raise FileNotFoundError(messages["file_not_found"])
         
-    if input_path.lower().endswith('.svg'):
-        try:
-            # Use cairosvg instead of svglib/reportlab
-            png_data = cairosvg.svg2png(
-                url=input_path,
-                output_height=1024,  # Reasonable default size
-                output_width=1024,   # Will maintain aspect ratio
-                scale=2.0,           # Better quality
-                background_color='white'  # Set white background for SVG
-            )
-            image = Image.open(io.BytesIO(png_data))
-        except Exception as e:
-            raise ValueError(f"{messages['svg_convert_failed']}: {str(e)}")
-    else:
-        try:
-            image = Image.open(input_path)
-            image.verify()  # Verify image integrity
-            image = Image.open(input_path)  # Reopen after verify
-        except Exception as e:
-            raise ValueError(f"{messages['image_load_failed']}: {str(e)}")
+    try:
+        image = read_image(input_path, "RGB", long_side, size)
+    except Exception as e:
+        failed = "svg_convert_failed" if input_path.lower().endswith('.svg') else "image_load_failed"
+        raise ValueError(f"{messages[failed]}: {str(e)}")
     
     # Convert to RGB mode if necessary
     try:
@@ -41,30 +30,47 @@ def load_image(input_path, lang="English"):
     
     return image
 
-def process_image_aspect(input_dir, filename, target_size, output_square,
-                         out_dir, out_filename, apply_binary, binary_threshold, margin, apply_blur, blur_radius, lang="English"):
+def binarize(image, threshold):
+    """Threshold an image at `threshold` (0-1 of the gray range) into a black/white "L" image"""
+    return point_transform(image, threshold=threshold)
+
+def _finish(output_img, binary_threshold, blur_radius):
     """
-    Processes the image in Aspect Rescale mode:
-      - Rescales the image so that its long side equals target_size.
-      - If output_square is True, pads the image to output a square.
-      - If apply_binary is True, applies binary conversion using the binary_threshold.
-    
-    Saves the processed image to the specified output folder. If no output folder is provided,
-    it automatically saves to "output/{input_filename_without_ext}".
-    
-    Returns the processed image and a status message.
+    Optional binarization followed by an optional Gaussian blur. A binarized
+    image stays single-channel through the blur and is saved as grayscale.
     """
-    messages = lang_labels[lang]
-    if not filename:
-        return None, messages["no_image"]
-    input_path = os.path.join(input_dir, filename)
-    try:
-        image = load_image(input_path, lang)
-    except Exception as e:
-        return None, messages["open_failed"].format(str(e))
-    
-    effective_target_size = target_size - (2 * margin)
+    if binary_threshold is not None:
+        output_img = binarize(output_img, binary_threshold)
+    if blur_radius is not None:
+        output_img = output_img.filter(ImageFilter.GaussianBlur(radius=float(blur_radius)))
+    return output_img
+
+def _ui_finish_options(apply_binary, binary_threshold, apply_blur, blur_radius):
+    """Map the UI checkbox/slider pairs to aspect_resize/custom_resize options"""
+    if not apply_binary:
+        binary_threshold = None
+    if not (apply_blur and isinstance(blur_radius, (int, float))):
+        blur_radius = None
+    return binary_threshold, blur_radius
+
+def _finish_suffix(binary_threshold, blur_radius):
+    suffix = ""
+    if binary_threshold is not None:
+        suffix += "_binary"
+    if blur_radius is not None:
+        suffix += "_blur"
+    return suffix
 
+def aspect_resize(image, target_size, output_square=False, margin=0,
+                  binary_threshold=None, blur_radius=None):
+    """
+    Rescale an RGB image so its long side equals target_size - 2 * margin,
+    then pad it with white to a target_size square (output_square) or by
+    margin on each side. binary_threshold (0-1) and blur_radius are applied
+    afterwards when given.
+    """
+    effective_target_size = target_size - (2 * margin)
+    
     # Calculate scale factor for aspect rescaling
     factor = effective_target_size / max(image.width, image.height)
     new_width = int(image.width * factor)
@@ -82,21 +88,43 @@ def process_image_aspect(input_dir, filename, target_size, output_square,
         offset_y = margin
     
     output_img.paste(resized_img, (offset_x, offset_y))
-    mode_str = "aspect_square" if output_square else "aspect"
+    return _finish(output_img, binary_threshold, blur_radius)
 
+def custom_resize(image, width, height, binary_threshold=None, blur_radius=None):
+    """Resize an RGB image to exactly width x height, then binarize / blur when given"""
+    output_img = image.resize((width, height), Image.LANCZOS)
+    return _finish(output_img, binary_threshold, blur_radius)
+
+def process_image_aspect(input_dir, filename, target_size, output_square,
+                         out_dir, out_filename, apply_binary, binary_threshold, margin, apply_blur, blur_radius,
+                         lang="English", encoding=None):
+    """
+    Processes the image in Aspect Rescale mode:
+      - Rescales the image so that its long side equals target_size.
+      - If output_square is True, pads the image to output a square.
+      - If apply_binary is True, applies binary conversion using the binary_threshold.
     
-    # Apply binary conversion if enabled (convert UI threshold 0-1 to 0-255)
-    if apply_binary:
-        gray_img = output_img.convert("L")
-        threshold = binary_threshold * 255
-        binary_img = gray_img.point(lambda p: 255 if p > threshold else 0, mode="1")
-        output_img = binary_img.convert("RGB")
-        mode_str += "_binary"
+    Saves the processed image to the specified output folder with the `encoding`
+    profile. If no output folder is provided, it automatically saves to
+    "output/{input_filename_without_ext}".
     
-    # Apply Gaussian blur after binary processing if requested
-    if apply_blur and isinstance(blur_radius, (int, float)):
-        output_img = output_img.filter(ImageFilter.GaussianBlur(radius=float(blur_radius)))
-        mode_str += "_blur"
+    Returns the processed image and a status message.
+    """
+    messages = lang_labels[lang]
+    if not filename:
+        return None, messages["no_image"]
+    input_path = os.path.join(input_dir, filename)
+    try:
+        image = load_image(input_path, lang, target_size - (2 * margin))
+    except Exception as e:
+        return None, messages["open_failed"].format(str(e))
+    
+    binary_threshold, blur_radius = _ui_finish_options(apply_binary, binary_threshold,
+                                                       apply_blur, blur_radius)
+    output_img = aspect_resize(image, target_size, output_square, margin,
+                               binary_threshold, blur_radius)
+    mode_str = "aspect_square" if output_square else "aspect"
+    mode_str += _finish_suffix(binary_threshold, blur_radius)
         
     # Automatically structure the output directory if not specified or default is used
     base, ext = os.path.splitext(filename)
@@ -112,23 +140,21 @@ def process_image_aspect(input_dir, filename, target_size, output_square,
         out_filename = f"{base}_{mode_str}{ext}"
     out_path = os.path.join(out_dir, out_filename)
     
-    try:
-        output_img.save(out_path)
-        status = messages["save_success"].format(out_path)
-    except Exception as e:
-        status = messages["save_failed"].format(str(e))
+    status = save_output(output_img, out_path, lang, encoding)
     
-    return output_img, status
+    return display_result(output_img), status
 
 def process_image_custom(input_dir, filename, target_width, target_height,
-                         out_dir, out_filename, apply_binary, binary_threshold, apply_blur, blur_radius, lang):
+                         out_dir, out_filename, apply_binary, binary_threshold, apply_blur, blur_radius,
+                         lang="English", encoding=None):
     """
     Processes the image in Custom Resize mode:
       - Directly resizes the image to target_width and target_height.
       - If apply_binary is True, applies binary conversion using the binary_threshold.
     
-    Saves the processed image to the specified output folder. If no output folder is provided,
-    it automatically saves to "output/{input_filename_without_ext}".
+    Saves the processed image to the specified output folder with the `encoding`
+    profile. If no output folder is provided, it automatically saves to
+    "output/{input_filename_without_ext}".
     
     Returns the processed image and a status message.
     """
@@ -137,24 +163,15 @@ def process_image_custom(input_dir, filename, target_width, target_height,
         return None, messages["no_image"]
     input_path = os.path.join(input_dir, filename)
     try:
-        image = load_image(input_path, lang)
+        image = load_image(input_path, lang, size=(target_width, target_height))
     except Exception as e:
         return None, messages["open_failed"].format(str(e))
     
-    output_img = image.resize((target_width, target_height), Image.LANCZOS)
-    mode_str = "custom"
-    
-    if apply_binary:
-        gray_img = output_img.convert("L")
-        threshold = binary_threshold * 255
-        binary_img = gray_img.point(lambda p: 255 if p > threshold else 0, mode="1")
-        output_img = binary_img.convert("RGB")
-        mode_str += "_binary"
-    
-    # Apply Gaussian blur after binary processing if requested
-    if apply_blur and isinstance(blur_radius, (int, float)):
-        output_img = output_img.filter(ImageFilter.GaussianBlur(radius=float(blur_radius)))
-        mode_str += "_blur"
+    binary_threshold, blur_radius = _ui_finish_options(apply_binary, binary_threshold,
+                                                       apply_blur, blur_radius)
+    output_img = custom_resize(image, target_width, target_height,
+                               binary_threshold, blur_radius)
+    mode_str = "custom" + _finish_suffix(binary_threshold, blur_radius)
 
     base, ext = os.path.splitext(filename)
     if not out_dir or out_dir.strip() == "" or out_dir.strip() == messages["default_output"]:
@@ -168,10 +185,6 @@ def process_image_custom(input_dir, filename, target_width, target_height,
         out_filename = f"{base}_{mode_str}{ext}"
     out_path = os.path.join(out_dir, out_filename)
     
-    try:
-        output_img.save(out_path)
-        status = messages["save_success"].format(out_path)
-    except Exception as e:
-        status = messages["save_failed"].format(str(e))
+    status = save_output(output_img, out_path, lang, encoding)
     
-    return output_img, status
+    return display_result(output_img), status
@@ -0,0 +1,408 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+from ..utils import get_setting, atomic_path
+from .morphology import apply_morphology
+from .edge import EdgeEngine, NORMALIZED_EDGE_ALGORITHMS, gaussian_ksize, normalize_response
+from .glcm import (GLCM_FEATURES, ANGLE_MAP, quantize_gray_levels, glcm_window_features,
+                   _glcm_grid_shape)
+
+# Default edge of the square tiles streamed through an operation and written
+# to the output TIFF (a multiple of 16, as TIFF requires)
+DEFAULT_TILE_SIZE = 1024
+
+# TIFFs with at least this many pixels are processed tile by tile
+DEFAULT_TILED_MIN_PIXELS = 1 << 26
+
+# Long side of the downscaled copy of a tiled result returned for display
+TILED_PREVIEW_SIZE = 2048
+
+# Decoded input segments kept per reader, so halos do not decode them again
+SEGMENT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Canny links edges by hysteresis across the whole image; seams are exact for
+# chains that reconnect within this many pixels of a tile
+CANNY_HALO = 32
+
+# OpenCV's vectorized float filters round a pixel differently depending on
+# its position in a row (SIMD lanes, scalar row tails); edge tiles are read
+# from a multiple of this many columns, with as many extra columns on the
+# right, so every pixel is computed exactly as in the whole image
+FLOAT_FILTER_ALIGN = 64
+
+
+def tile_size():
+    return max(16, get_setting("tile_size", DEFAULT_TILE_SIZE, int) // 16 * 16)
+
+
+def tiled_min_pixels():
+    return get_setting("tiled_min_pixels", DEFAULT_TILED_MIN_PIXELS, int)
+
+
+def _supported_page(page):
+    """8-bit gray, RGB or RGBA pages with interleaved samples can be read by region"""
+    return (page.dtype == np.uint8 and page.samplesperpixel in (1, 3, 4)
+            and (page.samplesperpixel == 1 or page.planarconfig == 1)
+            and page.imagedepth == 1)
+
+
+def use_tiled_io(path):
+    """True for TIFFs large enough (tiled_min_pixels) to be streamed tile by tile"""
+    if not path.lower().endswith((".tif", ".tiff")):
+        return False
+    try:
+        import tifffile
+    except ImportError:
+        return False
+    try:
+        with tifffile.TiffFile(path) as tif:
+            page = tif.pages.first
+            return (page.imagelength * page.imagewidth >= tiled_min_pixels()
+                    and _supported_page(page))
+    except Exception:
+        return False
+
+
+def tiled_output_path(path):
+    """Tiled results are always TIFF files"""
+    base, ext = os.path.splitext(path)
+    return path if ext.lower() in (".tif", ".tiff") else base + ".tif"
+
+
+class TiffRegionReader:
+    """
+    Random access to rectangular regions of the first page of a TIFF.
+
+    Uncompressed contiguous images are memory-mapped. Tiled and striped
+    images decode only the segments a region touches, keeping recently
+    decoded ones (up to SEGMENT_CACHE_BYTES) for the halos of the next tiles.
+    """
+
+    def __init__(self, path):
+        import tifffile
+        self._tif = tifffile.TiffFile(path)
+        page = self._tif.pages.first
+        if not _supported_page(page):
+            self._tif.close()
+            raise ValueError("only 8-bit gray, RGB or RGBA TIFFs can be read by region")
+        self.page = page
+        self.height, self.width = page.imagelength, page.imagewidth
+        self.samples = page.samplesperpixel
+        self._memmap = tifffile.memmap(path, mode="r") if page.is_memmappable else None
+        self._segment_shape = page.chunks[:2]
+        self._segments_per_row = -(-self.width // self._segment_shape[1])
+        self._segments = OrderedDict()
+        self._segment_bytes = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._memmap = None
+        self._segments.clear()
+        self._tif.close()
+
+    def _pixel_shape(self):
+        return (self.samples,) if self.samples > 1 else ()
+
+    def _segment(self, index):
+        with self._lock:
+            segment = self._segments.get(index)
+            if segment is not None:
+                self._segments.move_to_end(index)
+                return segment
+            page = self.page
+            data = None
+            if page.databytecounts[index]:
+                fh = self._tif.filehandle
+                fh.seek(page.dataoffsets[index])
+                data = fh.read(page.databytecounts[index])
+            segment, _, shape = page.decode(data, index, jpegtables=page.jpegtables)
+            if segment is None:
+                # Sparse TIFFs leave empty segments out
+                segment = np.zeros(tuple(shape[1:3]) + self._pixel_shape(), np.uint8)
+            segment = segment.reshape(segment.shape[1:3] + self._pixel_shape())
+            self._segments[index] = segment
+            self._segment_bytes += segment.nbytes
+            while self._segment_bytes > SEGMENT_CACHE_BYTES and len(self._segments) > 1:
+                _, evicted = self._segments.popitem(last=False)
+                self._segment_bytes -= evicted.nbytes
+            return segment
+
+    def read(self, y0, y1, x0, x1):
+        """Pixels of rows [y0, y1) and columns [x0, x1) as a new array"""
+        if self._memmap is not None:
+            return np.array(self._memmap[y0:y1, x0:x1])
+        seg_h, seg_w = self._segment_shape
+        region = np.empty((y1 - y0, x1 - x0) + self._pixel_shape(), np.uint8)
+        for row in range(y0 // seg_h, (y1 - 1) // seg_h + 1):
+            for col in range(x0 // seg_w, (x1 - 1) // seg_w + 1):
+                segment = self._segment(row * self._segments_per_row + col)
+                top, left = row * seg_h, col * seg_w
+                ya, yb = max(y0, top), min(y1, top + seg_h)
+                xa, xb = max(x0, left), min(x1, left + seg_w)
+                region[ya - y0:yb - y0, xa - x0:xb - x0] = \
+                    segment[ya - top:yb - top, xa - left:xb - left]
+        return region
+
+
+class _Thumbnail:
+    """Strided downscale of a result that arrives tile by tile"""
+
+    def __init__(self, height, width, dtype=np.uint8, long_side=TILED_PREVIEW_SIZE):
+        self.step = max(1, -(-max(height, width) // long_side))
+        self.array = np.zeros((-(-height // self.step), -(-width // self.step)), dtype)
+
+    def add(self, y0, x0, tile):
+        oy, ox = (-y0) % self.step, (-x0) % self.step
+        part = tile[oy::self.step, ox::self.step]
+        ty, tx = (y0 + oy) // self.step, (x0 + ox) // self.step
+        self.array[ty:ty + part.shape[0], tx:tx + part.shape[1]] = part
+
+
+def _tile_grid(height, width, tile):
+    """(y0, x0, y1, x1) of every tile in the row-major order TIFF stores them"""
+    for y0 in range(0, height, tile):
+        for x0 in range(0, width, tile):
+            yield y0, x0, min(y0 + tile, height), min(x0 + tile, width)
+
+
+def _map_tiles(reader, fn, halo, tile, align=1):
+    """
+    Yield (y0, x0, result) for every tile, fn being run on the tile read with
+    `halo` pixels of context on each side and its result cropped back. With
+    `align` > 1 the read starts on a multiple of `align` columns and reaches
+    `align` columns further right (see FLOAT_FILTER_ALIGN).
+    """
+    pad = align if align > 1 else 0
+    for y0, x0, y1, x1 in _tile_grid(reader.height, reader.width, tile):
+        ry0, rx0 = max(0, y0 - halo), max(0, x0 - halo) // align * align
+        ry1, rx1 = min(reader.height, y1 + halo), min(reader.width, x1 + halo + pad)
+        result = fn(reader.read(ry0, ry1, rx0, rx1))
+        yield y0, x0, result[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+
+
+def write_tiled_tiff(path, tiles, height, width, dtype, tile):
+    """
+    Write row-major tiles of a single-channel image as a deflate-compressed
+    tiled TIFF, renamed into place once complete (see utils.atomic_path)
+    """
+    import tifffile
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    nbytes = height * width * np.dtype(dtype).itemsize
+    with atomic_path(path) as tmp_path:
+        tifffile.imwrite(tmp_path, tiles, shape=(height, width), dtype=dtype, tile=(tile, tile),
+                         photometric="minisblack", compression="zlib",
+                         bigtiff=nbytes > 2**31)
+
+
+def _stream(reader, out_path, fn, halo, tile, dtype=np.uint8, align=1):
+    """Write fn mapped over the tiles of reader to out_path; returns the thumbnail"""
+    thumbnail = _Thumbnail(reader.height, reader.width, dtype)
+
+    def tiles():
+        for y0, x0, result in _map_tiles(reader, fn, halo, tile, align):
+            thumbnail.add(y0, x0, result)
+            yield result
+
+    write_tiled_tiff(out_path, tiles(), reader.height, reader.width, dtype, tile)
+    return thumbnail.array
+
+
+def _gray(region):
+    """Grayscale of a region, converted the way the in-memory path does it"""
+    return region if region.ndim == 2 else np.asarray(Image.fromarray(region).convert("L"))
+
+
+def morphology_halo(erosion=None, dilation=None, opening=None, closing=None):
+    """Pixels of context apply_morphology needs around a tile"""
+    halo = 0
+    for kernel, passes in ((erosion, 1), (dilation, 1), (opening, 2), (closing, 2)):
+        if kernel is not None:
+            halo += passes * (int(kernel) // 2)
+    return halo
+
+
+def tiled_morphology(input_path, out_path, erosion=None, dilation=None, opening=None,
+                     closing=None, shape="rect", tile=None):
+    """
+    apply_morphology on a large TIFF, streamed tile by tile with enough halo
+    for the kernels (the result is identical to the in-memory one) and written
+    to out_path as a tiled TIFF. Returns a downscaled "L" preview.
+    """
+    tile = tile or tile_size()
+
+    def operate(region):
+        return np.asarray(apply_morphology(Image.fromarray(region), erosion, dilation,
+                                           opening, closing, shape))
+
+    with TiffRegionReader(input_path) as reader:
+        preview = _stream(reader, out_path, operate,
+                          morphology_halo(erosion, dilation, opening, closing), tile)
+    return Image.fromarray(preview)
+
+
+def edge_halo(algorithm, sigma=1.0):
+    """Pixels of context an edge algorithm needs around a tile"""
+    if algorithm == "LoG":
+        # the Gaussian's radius, then a 3x3 Laplacian
+        return gaussian_ksize(sigma) // 2 + 1
+    if algorithm == "Canny":
+        return CANNY_HALO
+    return 1
+
+
+def tiled_edges(input_path, out_path, algorithm="Sobel", canny_low=50, canny_high=150,
+                sigma=1.0, tile=None):
+    """
+    detect_edges on a large TIFF, streamed tile by tile and written to
+    out_path as a tiled TIFF. Laplacian and LoG take a first pass for the
+    global range their output is scaled to. Returns a downscaled "L" preview.
+    """
+    tile = tile or tile_size()
+    halo = edge_halo(algorithm, sigma)
+    # one engine, so same-sized tiles reuse its buffers
+    engine = EdgeEngine()
+
+    def respond(region):
+        return engine.load(_gray(region)).response(algorithm, canny_low, canny_high, sigma)
+
+    with TiffRegionReader(input_path) as reader:
+        operate = respond
+        if algorithm in NORMALIZED_EDGE_ALGORITHMS:
+            low, high = np.inf, -np.inf
+            for _, _, response in _map_tiles(reader, respond, halo, tile, FLOAT_FILTER_ALIGN):
+                low, high = min(low, float(response.min())), max(high, float(response.max()))
+
+            def operate(region):
+                return normalize_response(respond(region), low, high)
+
+        preview = _stream(reader, out_path, operate, halo, tile, align=FLOAT_FILTER_ALIGN)
+    return Image.fromarray(preview)
+
+
+def _accumulate_region(window_values, y0, y1, x0, x1, window_size, step_size):
+    """accumulate_window_values restricted to the pixels [y0, y1) x [x0, x1)"""
+    n_rows, n_cols = window_values.shape
+    height, width = y1 - y0, x1 - x0
+    i0 = max(0, -(-(y0 - window_size + 1) // step_size))
+    i1 = min(n_rows, (y1 - 1) // step_size + 1)
+    j0 = max(0, -(-(x0 - window_size + 1) // step_size))
+    j1 = min(n_cols, (x1 - 1) // step_size + 1)
+    feature_map = np.zeros((height, width), dtype=np.float32)
+    if i1 <= i0 or j1 <= j0:
+        return feature_map
+
+    # Window extents clipped to the region
+    ys = np.clip(np.arange(i0, i1) * step_size - y0, 0, height)
+    ye = np.clip(np.arange(i0, i1) * step_size + window_size - y0, 0, height)
+    xs = np.clip(np.arange(j0, j1) * step_size - x0, 0, width)
+    xe = np.clip(np.arange(j0, j1) * step_size + window_size - x0, 0, width)
+    values = np.asarray(window_values[i0:i1, j0:j1])
+
+    diff = np.zeros((height + 1, width + 1), dtype=np.float64)
+    np.add.at(diff, (ys[:, None], xs[None, :]), values)
+    np.add.at(diff, (ye[:, None], xs[None, :]), -values)
+    np.add.at(diff, (ys[:, None], xe[None, :]), -values)
+    np.add.at(diff, (ye[:, None], xe[None, :]), values)
+    sums = diff.cumsum(axis=0).cumsum(axis=1)[:height, :width]
+
+    rows = np.zeros(height + 1, dtype=np.int64)
+    cols = np.zeros(width + 1, dtype=np.int64)
+    np.add.at(rows, ys, 1)
+    np.add.at(rows, ye, -1)
+    np.add.at(cols, xs, 1)
+    np.add.at(cols, xe, -1)
+    coverage = np.outer(rows.cumsum()[:height], cols.cumsum()[:width])
+
+    covered = coverage > 0
+    feature_map[covered] = sums[covered] / coverage[covered]
+    return feature_map
+
+
+def tiled_glcm_features(input_path, out_prefix, distance=1, angles=("0°",), levels=64,
+                        symmetric=True, features=GLCM_FEATURES, window_size=16, step_size=8,
+                        tile=None):
+    """
+    glcm_features for a large TIFF.
+
+    Window values are computed block by block into disk-backed arrays. Each
+    feature map is then accumulated tile by tile into a disk-backed map while
+    its range is tracked, and written from there min-max scaled to [0, 1] as
+    a float32 tiled TIFF at "{out_prefix}_{feature}.tif". Returns (previews, stats, paths): downscaled
+    maps, (mean, std, min, max) of every scaled map and the written files.
+    """
+    tile = tile or tile_size()
+    distance, levels = int(distance), int(levels)
+    window_size, step_size = int(window_size), int(step_size)
+    feature_names = [name for name in GLCM_FEATURES if name in features]
+    angles_rad = [ANGLE_MAP[a] for a in angles]
+    previews, stats, paths = {}, {}, {}
+
+    with TiffRegionReader(input_path) as reader, tempfile.TemporaryDirectory() as scratch:
+        height, width = reader.height, reader.width
+        n_rows, n_cols = _glcm_grid_shape(height, width, window_size, step_size)
+        window_values = {
+            name: np.lib.format.open_memmap(os.path.join(scratch, f"{name}.npy"), mode="w+",
+                                            dtype=np.float64, shape=(n_rows, n_cols))
+            for name in feature_names
+        }
+        block = max(1, tile // step_size)
+        for r0 in range(0, n_rows, block):
+            r1 = min(r0 + block, n_rows)
+            for c0 in range(0, n_cols, block):
+                c1 = min(c0 + block, n_cols)
+                region = reader.read(r0 * step_size, (r1 - 1) * step_size + window_size,
+                                     c0 * step_size, (c1 - 1) * step_size + window_size)
+                values = glcm_window_features(quantize_gray_levels(_gray(region), levels),
+                                              distance, angles_rad, levels, symmetric,
+                                              feature_names, window_size, step_size)
+                for name in feature_names:
+                    window_values[name][r0:r1, c0:c1] = values[name]
+
+        grid = list(_tile_grid(height, width, tile))
+        for name in feature_names:
+            # Accumulated once into a disk-backed map while its range is
+            # tracked, then scaled from there as it is written
+            feature_map = np.lib.format.open_memmap(
+                os.path.join(scratch, f"{name}_map.npy"), mode="w+", dtype=np.float32,
+                shape=(height, width))
+            low, high = np.float32(np.inf), np.float32(-np.inf)
+            for y0, x0, y1, x1 in grid:
+                feature_tile = _accumulate_region(window_values[name], y0, y1, x0, x1,
+                                                  window_size, step_size)
+                feature_map[y0:y1, x0:x1] = feature_tile
+                low, high = min(low, feature_tile.min()), max(high, feature_tile.max())
+            total = total_sq = 0.0
+            thumbnail = _Thumbnail(height, width, np.float32)
+
+            def scaled_tiles():
+                nonlocal total, total_sq
+                for y0, x0, y1, x1 in grid:
+                    feature_tile = np.array(feature_map[y0:y1, x0:x1])
+                    if high > low:
+                        feature_tile = (feature_tile - low) / (high - low)
+                    total += feature_tile.sum(dtype=np.float64)
+                    total_sq += np.square(feature_tile, dtype=np.float64).sum()
+                    thumbnail.add(y0, x0, feature_tile)
+                    yield feature_tile
+
+            paths[name] = f"{out_prefix}_{name}.tif"
+            write_tiled_tiff(paths[name], scaled_tiles(), height, width, np.float32, tile)
+            count = height * width
+            mean = total / count
+            scaled_low, scaled_high = (0.0, 1.0) if high > low else (float(low), float(high))
+            stats[name] = (mean, np.sqrt(max(0.0, total_sq / count - mean ** 2)),
+                           scaled_low, scaled_high)
+            previews[name] = thumbnail.array
+            del feature_map
+        del window_values
+
+    return previews, stats, paths
@@ -1,8 +1,12 @@
+import os
 import gradio as gr
-from ..utils import lang_labels, refresh_list
+from ..utils import lang_labels, refresh_list, ENCODING_PROFILES
 
 def create_image_selection(lang="English"):
-    """Create directory input, image selection dropdown and refresh button"""
+    """
+    Create directory input, image selection dropdown and refresh button, with
+    a name prefix filter and page number for folders too large for one dropdown
+    """
     with gr.Row():
         dir_text = gr.Textbox(
             label=lang_labels[lang]["input_folder"], 
@@ -14,14 +18,35 @@ def create_image_selection(lang="English"):
             allow_custom_value=False
         )
         refresh_btn = gr.Button(lang_labels[lang]["refresh_list"])
-        
-    refresh_btn.click(
+    
+    name_filter, list_page = create_list_filter(lang)
+    bind_list_refresh(dir_text, image_list, refresh_btn, name_filter, list_page)
+    
+    return dir_text, image_list, refresh_btn, name_filter, list_page
+
+def create_list_filter(lang="English", visible=True):
+    """Create the name prefix filter and page number of an image dropdown"""
+    with gr.Row():
+        name_filter = gr.Textbox(
+            label=lang_labels[lang]["name_filter"],
+            value="",
+            visible=visible
+        )
+        list_page = gr.Number(
+            label=lang_labels[lang]["list_page"],
+            value=1, minimum=1, precision=0,
+            visible=visible
+        )
+    return name_filter, list_page
+
+def bind_list_refresh(dir_text, dropdown, refresh_btn, name_filter, list_page):
+    """Fill the dropdown from the directory index on refresh, filter submit or page change"""
+    gr.on(
+        triggers=[refresh_btn.click, name_filter.submit, list_page.change],
         fn=refresh_list,
-        inputs=[dir_text],
-        outputs=[image_list]
+        inputs=[dir_text, name_filter, list_page],
+        outputs=[dropdown]
     )
-    
-    return dir_text, image_list, refresh_btn
 
 def create_image_display(interactive=False):
     """Create input and output image display components"""
@@ -49,4 +74,52 @@ def create_output_settings(lang="English"):
             label=lang_labels[lang]["output_filename"], 
             value=""
         )
-    return out_dir, out_filename
\ No newline at end of file
+    return out_dir, out_filename
+
+def create_batch_controls(lang="English"):
+    """
+    Create batch toggle, folder/glob input and worker pool settings, and the
+    encoding profile used for single images and batches alike
+    """
+    with gr.Row():
+        batch_process = gr.Checkbox(
+            label=lang_labels[lang]["batch_process"],
+            value=False
+        )
+        batch_folder = gr.Textbox(
+            label=lang_labels[lang]["batch_folder"],
+            value="input",
+            visible=False
+        )
+        batch_workers = gr.Slider(
+            label=lang_labels[lang]["batch_workers"],
+            minimum=1, maximum=max(8, 2 * (os.cpu_count() or 1)), step=1,
+            value=os.cpu_count() or 1,
+            visible=False
+        )
+        batch_executor = gr.Radio(
+            choices=["thread", "process"],
+            value="thread",
+            label=lang_labels[lang]["batch_executor"],
+            visible=False
+        )
+        encoding = gr.Dropdown(
+            choices=list(ENCODING_PROFILES),
+            value="default",
+            label=lang_labels[lang]["encoding_profile"]
+        )
+        
+    batch_process.change(
+        fn=lambda x: (gr.update(visible=x),) * 3,
+        inputs=[batch_process],
+        outputs=[batch_folder, batch_workers, batch_executor]
+    )
+    
+    return batch_process, batch_folder, batch_workers, batch_executor, encoding
+
+def create_live_preview(lang="English"):
+    """Create the toggle for re-rendering a downscaled preview on every parameter change"""
+    return gr.Checkbox(
+        label=lang_labels[lang]["live_preview"],
+        value=True
+    )
@@ -0,0 +1,52 @@
+"""
+Queue settings for the app.
+
+CPU-bound handlers (processing, batches, GLCM) share one concurrency group
+limited to heavy_concurrency jobs, so a slow job only ever waits for other
+heavy jobs. Every other event (list refresh, image preview, language switch)
+keeps its own queue with light_concurrency slots and is never stuck behind
+processing. Settings come from the environment or the config file (see
+utils.get_setting).
+"""
+import os
+from ..utils import get_setting
+
+HEAVY_CONCURRENCY_ID = "heavy"
+
+# Default gradio thread pool size, raised when the limits below need more
+DEFAULT_MAX_THREADS = 40
+
+
+def heavy_concurrency():
+    return get_setting("heavy_concurrency", os.cpu_count() or 1, int)
+
+
+def light_concurrency():
+    return get_setting("light_concurrency", 8, int)
+
+
+def heavy_event():
+    """Keyword arguments for .click()/.change() of a CPU-bound handler"""
+    return {
+        "concurrency_limit": heavy_concurrency(),
+        "concurrency_id": HEAVY_CONCURRENCY_ID,
+    }
+
+
+def queue_options():
+    """Keyword arguments for Blocks.queue()"""
+    return {
+        "default_concurrency_limit": light_concurrency(),
+        "max_size": get_setting("queue_max_size", None, int),
+    }
+
+
+def launch_options():
+    """
+    Keyword arguments for Blocks.launch(). The thread pool must fit the heavy
+    group plus a few light events, otherwise previews wait for a thread.
+    """
+    needed = heavy_concurrency() + 2 * light_concurrency()
+    return {
+        "max_threads": get_setting("max_threads", max(DEFAULT_MAX_THREADS, needed), int),
+    }
\ No newline at end of file
@@ -3,4 +3,5 @@ from .cropper import CropperTool
 from .mask import MaskTool
 from .morphology import MorphologyTool
 from .glcm import GLCMTool
-from .edge import EdgeDetectionTool  # Add this import
\ No newline at end of file
+from .edge import EdgeDetectionTool  # Add this import
+from .pipeline import PipelineTool
\ No newline at end of file
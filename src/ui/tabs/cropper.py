@@ -1,7 +1,8 @@
 import gradio as gr
 from ..tool import ProcessingTool
 from ...utils import lang_labels, on_select_image
-from ...processing import process_image_crop
+from ...processing import process_image_crop, preview_crop
+from ..concurrency import heavy_event
 from ..components import create_image_selection, create_image_display, create_output_settings
 
 class CropperTool(ProcessingTool):
@@ -17,14 +18,18 @@ class CropperTool(ProcessingTool):
             
             self.components["lang_dropdown"] = lang_dropdown
             
-            dir_text, image_list, refresh_btn = create_image_selection(lang)
+            dir_text, image_list, refresh_btn, name_filter, list_page = create_image_selection(lang)
             self.register_for_language_update(dir_text, "input_folder")
             self.register_for_language_update(image_list, "select_image")
             self.register_for_language_update(refresh_btn, "refresh_list", "value")
+            self.register_for_language_update(name_filter, "name_filter")
+            self.register_for_language_update(list_page, "list_page")
             
             self.components["dir_text"] = dir_text
             self.components["image_list"] = image_list
             self.components["refresh_btn"] = refresh_btn
+            self.components["name_filter"] = name_filter
+            self.components["list_page"] = list_page
             
             input_image, output_image = create_image_display(interactive=True)
             self.register_for_language_update(input_image, "input_image")
@@ -33,11 +38,13 @@ class CropperTool(ProcessingTool):
             self.components["input_image"] = input_image
             self.components["output_image"] = output_image
             
+            self.create_live_preview(lang)
+            
             self.components["crop"] = self._create_crop_controls(lang)
             
             self.components["process"] = self._create_process_controls(lang)
             
-            self.components["batch"] = self._create_batch_controls(lang)
+            self.components["batch"] = self.create_batch_controls(lang)
             
             out_dir, out_filename = create_output_settings(lang)
             self.register_for_language_update(out_dir, "output_folder")
@@ -63,6 +70,21 @@ class CropperTool(ProcessingTool):
                 outputs=[input_image]
             )
             
+            preview_params = [
+                self.components["crop"]["top"],
+                self.components["crop"]["bottom"],
+                self.components["crop"]["left"],
+                self.components["crop"]["right"],
+                self.components["process"]["target_size"],
+                self.components["process"]["output_square"],
+                self.components["process"]["margin"]
+            ]
+            self.bind_live_preview(
+                preview_crop,
+                inputs=[dir_text, image_list] + preview_params,
+                triggers=[image_list] + preview_params
+            )
+            
             process_btn.click(
                 fn=process_image_crop,
                 inputs=[
@@ -79,12 +101,17 @@ class CropperTool(ProcessingTool):
                     self.components["batch"]["folder"],
                     out_dir,
                     out_filename,
-                    lang_dropdown
+                    lang_dropdown,
+                    self.components["batch"]["workers"],
+                    self.components["batch"]["executor"],
+                    self.components["batch"]["encoding"]
                 ],
                 outputs=[
                     output_image,
                     save_status
-                ]
+                ],
+                api_name="process_crop",
+                **heavy_event()
             )
             
         return self.components
@@ -149,30 +176,4 @@ class CropperTool(ProcessingTool):
             "target_size": target_size,
             "output_square": output_square,
             "margin": margin
-        }
-    
-    def _create_batch_controls(self, lang):
-        with gr.Row():
-            batch_process = gr.Checkbox(
-                label=lang_labels[lang]["batch_process"],
-                value=False
-            )
-            self.register_for_language_update(batch_process, "batch_process")
-            
-            batch_folder = gr.Textbox(
-                label=lang_labels[lang]["batch_folder"],
-                value="input",
-                visible=False
-            )
-            self.register_for_language_update(batch_folder, "batch_folder")
-            
-            batch_process.change(
-                fn=lambda x: gr.update(visible=x),
-                inputs=[batch_process],
-                outputs=[batch_folder]
-            )
-            
-        return {
-            "process": batch_process,
-            "folder": batch_folder
         }
\ No newline at end of file
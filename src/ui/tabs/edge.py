@@ -1,9 +1,13 @@
 import gradio as gr
 
+from ..concurrency import heavy_event
 from ..components import create_image_selection, create_image_display, create_output_settings
 from ..tool import ProcessingTool
 from ...utils import lang_labels
-from ...processing.edge import process_edge_detection
+from ...processing.edge import process_edge_detection, EDGE_ALGORITHMS, ALL_EDGE_ALGORITHMS
+from ...processing.preview import preview_edge
+from ...processing.batch import batch_handler
+from ...processing.offload import offload
 
 class EdgeDetectionTool(ProcessingTool):
     
@@ -19,14 +23,18 @@ class EdgeDetectionTool(ProcessingTool):
             
             self.components["lang_dropdown"] = lang_dropdown
             
-            dir_text, image_list, refresh_btn = create_image_selection(lang)
+            dir_text, image_list, refresh_btn, name_filter, list_page = create_image_selection(lang)
             self.register_for_language_update(dir_text, "input_folder")
             self.register_for_language_update(image_list, "select_image")
             self.register_for_language_update(refresh_btn, "refresh_list", "value")
+            self.register_for_language_update(name_filter, "name_filter")
+            self.register_for_language_update(list_page, "list_page")
             
             self.components["dir_text"] = dir_text
             self.components["image_list"] = image_list
             self.components["refresh_btn"] = refresh_btn
+            self.components["name_filter"] = name_filter
+            self.components["list_page"] = list_page
             
             input_image, output_image = create_image_display()
             self.register_for_language_update(input_image, "input_image")
@@ -35,8 +43,21 @@ class EdgeDetectionTool(ProcessingTool):
             self.components["input_image"] = input_image
             self.components["output_image"] = output_image
             
+            output_gallery = gr.Gallery(
+                label=lang_labels[lang]["edge_gallery"],
+                columns=3,
+                format="png",
+                visible=False
+            )
+            self.register_for_language_update(output_gallery, "edge_gallery")
+            self.components["output_gallery"] = output_gallery
+            
+            self.create_live_preview(lang)
+            
             self.components["edge_params"] = self._create_edge_controls(lang)
             
+            self.components["batch"] = self.create_batch_controls(lang)
+            
             out_dir, out_filename = create_output_settings(lang)
             self.register_for_language_update(out_dir, "output_folder")
             self.register_for_language_update(out_filename, "output_filename")
@@ -61,9 +82,28 @@ class EdgeDetectionTool(ProcessingTool):
                 outputs=[input_image]
             )
             
+            preview_params = [
+                self.components["edge_params"]["algorithm"],
+                self.components["edge_params"]["canny_low"],
+                self.components["edge_params"]["canny_high"],
+                self.components["edge_params"]["sigma"]
+            ]
+            self.bind_live_preview(
+                preview_edge,
+                inputs=[dir_text, image_list] + preview_params,
+                triggers=[image_list] + preview_params
+            )
+            
+            self.components["edge_params"]["algorithm"].change(
+                fn=self._update_output_visibility,
+                inputs=[self.components["edge_params"]["algorithm"]],
+                outputs=[output_image, output_gallery]
+            )
+            
             process_btn.click(
-                fn=process_edge_detection,
-                inputs=[
+                fn=self._split_outputs(
+                    batch_handler(offload(process_edge_detection), out_filename_index=5)),
+                inputs=self.batch_inputs() + [
                     dir_text,
                     image_list,
                     self.components["edge_params"]["algorithm"],
@@ -72,12 +112,16 @@ class EdgeDetectionTool(ProcessingTool):
                     self.components["edge_params"]["sigma"],
                     out_dir,
                     out_filename,
-                    lang_dropdown
+                    lang_dropdown,
+                    self.components["batch"]["encoding"]
                 ],
                 outputs=[
                     output_image,
+                    output_gallery,
                     save_status
-                ]
+                ],
+                api_name="process_edge",
+                **heavy_event()
             )
             
         return self.components
@@ -86,7 +130,7 @@ class EdgeDetectionTool(ProcessingTool):
         with gr.Accordion(label=lang_labels[lang]["edge_parameters"], open=True):
             with gr.Row():
                 algorithm = gr.Radio(
-                    choices=["Roberts", "Sobel", "Prewitt", "Laplacian", "LoG", "Canny"],
+                    choices=list(EDGE_ALGORITHMS) + [ALL_EDGE_ALGORITHMS],
                     value="Sobel",
                     label=lang_labels[lang]["edge_algorithm"]
                 )
@@ -131,8 +175,8 @@ class EdgeDetectionTool(ProcessingTool):
         }
     
     def _update_parameter_visibility(self, algorithm):
-        show_canny = algorithm == "Canny"
-        show_sigma = algorithm in ["LoG"]
+        show_canny = algorithm in ["Canny", ALL_EDGE_ALGORITHMS]
+        show_sigma = algorithm in ["LoG", ALL_EDGE_ALGORITHMS]
         
         return (
             gr.update(visible=show_canny),
@@ -140,6 +184,26 @@ class EdgeDetectionTool(ProcessingTool):
             gr.update(visible=show_sigma)
         )
     
+    def _update_output_visibility(self, algorithm):
+        show_gallery = algorithm == ALL_EDGE_ALGORITHMS
+        return gr.update(visible=not show_gallery), gr.update(visible=show_gallery)
+    
+    def _split_outputs(self, handler):
+        """Send the all-algorithms gallery to the gallery and single edge maps to the image"""
+        def split(*args):
+            for output, status in handler(*args):
+                if isinstance(output, dict):
+                    # Status-only update once background writes finish
+                    yield output, output, status
+                elif isinstance(output, list):
+                    yield None, output, status
+                else:
+                    yield output, None, status
+        
+        split.__name__ = handler.__name__
+        split.__doc__ = handler.__doc__
+        return split
+    
     def _on_select_image(self, directory, filename):
         from ...utils.files import on_select_image
         return on_select_image(directory, filename)
\ No newline at end of file
@@ -1,21 +1,20 @@
 import gradio as gr
 from ..tool import ProcessingTool
-from ...utils import lang_labels, on_select_image
-from ...processing import process_glcm_features
+from ...utils import lang_labels, on_select_image, create_session_store, atomic_path
+from ...processing import process_glcm_features, new_figure, run_in_process
+from ..concurrency import heavy_event
 from ..components import create_image_selection, create_image_display, create_output_settings
 import os
-import matplotlib.pyplot as plt
-import io
-from PIL import Image
 import numpy as np
+from concurrent.futures.process import BrokenProcessPool
 
 class GLCMTool(ProcessingTool):
     
     def __init__(self):
         super().__init__("glcm")
         self.tab_titles = {}
-        self.feature_maps = {}  
-        self.current_image_name = None  
+        # (image name, feature maps) of each user's last run, for Save
+        self.results = create_session_store()
     
     def create_tab(self, lang_dropdown):
         lang = lang_dropdown.value
@@ -25,14 +24,18 @@ class GLCMTool(ProcessingTool):
             
             self.components["lang_dropdown"] = lang_dropdown
             
-            dir_text, image_list, refresh_btn = create_image_selection(lang)
+            dir_text, image_list, refresh_btn, name_filter, list_page = create_image_selection(lang)
             self.register_for_language_update(dir_text, "input_folder")
             self.register_for_language_update(image_list, "select_image")
             self.register_for_language_update(refresh_btn, "refresh_list", "value")
+            self.register_for_language_update(name_filter, "name_filter")
+            self.register_for_language_update(list_page, "list_page")
             
             self.components["dir_text"] = dir_text
             self.components["image_list"] = image_list
             self.components["refresh_btn"] = refresh_btn
+            self.components["name_filter"] = name_filter
+            self.components["list_page"] = list_page
             
             with gr.Row():
                 with gr.Column():
@@ -104,12 +107,15 @@ class GLCMTool(ProcessingTool):
                     self.components["feature_selection"]["energy"],
                     self.components["feature_selection"]["correlation"],
                     self.components["feature_selection"]["ASM"],
-                    lang_dropdown
+                    lang_dropdown,
+                    self.components["glcm_params"]["window_size"],
+                    self.components["glcm_params"]["step_size"]
                 ],
                 outputs=[
                     feature_image,
                     feature_values
-                ]
+                ],
+                **heavy_event()
             )
             
             save_btn.click(
@@ -119,30 +125,47 @@ class GLCMTool(ProcessingTool):
                     out_filename,
                     lang_dropdown
                 ],
-                outputs=[status]
+                outputs=[status],
+                **heavy_event()
             )
             
         return self.components
     
-    def _process_glcm_wrapper(self, input_dir, filename, *args):
-        # 存储当前图像名称
-        self.current_image_name = filename
-        
-        # 调用实际处理函数
-        feature_img, feature_table, feature_maps = process_glcm_features(input_dir, filename, *args)
+    def _process_glcm_wrapper(self, input_dir, filename, distance, angles, levels, symmetric,
+                              normalize, include_contrast, include_dissimilarity,
+                              include_homogeneity, include_energy, include_correlation,
+                              include_asm, lang, window_size, step_size, request: gr.Request):
+        try:
+            feature_img, feature_table, feature_maps = run_in_process(
+                process_glcm_features, input_dir, filename, distance, angles, levels,
+                symmetric, normalize, include_contrast, include_dissimilarity,
+                include_homogeneity, include_energy, include_correlation, include_asm,
+                lang, window_size, step_size
+            )
+        except BrokenProcessPool as e:
+            # The worker died twice on this image (see run_in_process)
+            feature_img, feature_maps = None, {}
+            feature_table = [[lang_labels[lang]["process_failed"].format(str(e)), ""]]
         
-        # 存储特征图
-        self.feature_maps = feature_maps
+        # 按会话保存特征图，避免不同用户互相覆盖
+        session = self.results.session_key(request)
+        if feature_maps:
+            nbytes = sum(feature_map.nbytes for feature_map in feature_maps.values())
+            self.results.put(session, (filename, feature_maps), nbytes)
+        else:
+            self.results.pop(session)
         
         return feature_img, feature_table
     
-    def _save_features(self, out_dir, out_filename, lang):
+    def _save_features(self, out_dir, out_filename, lang, request: gr.Request):
         from ...utils import lang_labels
         
         messages = lang_labels[lang]
         
-        if not self.feature_maps or not self.current_image_name:
+        result = self.results.get(self.results.session_key(request))
+        if result is None:
             return messages["no_features_to_save"]
+        image_name, feature_maps = result
         
         try:
             if not out_dir or out_dir.strip() == "":
@@ -151,22 +174,23 @@ class GLCMTool(ProcessingTool):
             os.makedirs(out_dir, exist_ok=True)
             
             if not out_filename or out_filename.strip() == "":
-                base = os.path.splitext(self.current_image_name)[0] if self.current_image_name else "glcm_features"
+                base = os.path.splitext(image_name)[0] if image_name else "glcm_features"
             else:
                 base = os.path.splitext(out_filename)[0]
             
             saved_files = []
             
-            fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+            fig = new_figure(figsize=(15, 10))
+            axes = fig.subplots(2, 3)
             axes = axes.flatten()
             
             min_val = float('inf')
             max_val = float('-inf')
-            for feature_map in self.feature_maps.values():
+            for feature_map in feature_maps.values():
                 min_val = min(min_val, np.min(feature_map))
                 max_val = max(max_val, np.max(feature_map))
             
-            for i, (feature_name, feature_map) in enumerate(self.feature_maps.items()):
+            for i, (feature_name, feature_map) in enumerate(feature_maps.items()):
                 if i < len(axes):
                     im = axes[i].imshow(feature_map, cmap='viridis', vmin=min_val, vmax=max_val)
                     axes[i].set_title(feature_name)
@@ -176,25 +200,27 @@ class GLCMTool(ProcessingTool):
                 feature_filename = f"{base}_{feature_name}.png"
                 feature_path = os.path.join(out_dir, feature_filename)
                 
-                plt.figure(figsize=(8, 6))
-                plt.imshow(feature_map, cmap='viridis')
-                plt.colorbar(label=feature_name)
-                plt.title(feature_name)
-                plt.axis('off')
-                plt.tight_layout()
-                plt.savefig(feature_path, dpi=150, bbox_inches='tight')
-                plt.close()
+                feature_fig = new_figure(figsize=(8, 6))
+                ax = feature_fig.add_subplot()
+                feature_im = ax.imshow(feature_map, cmap='viridis')
+                feature_fig.colorbar(feature_im, ax=ax, label=feature_name)
+                ax.set_title(feature_name)
+                ax.axis('off')
+                feature_fig.tight_layout()
+                # The temporary name has no extension, so name the format
+                with atomic_path(feature_path) as tmp_path:
+                    feature_fig.savefig(tmp_path, format="png", dpi=150, bbox_inches='tight')
                 
                 saved_files.append(feature_filename)
             
-            plt.tight_layout()
+            fig.tight_layout()
             combined_path = os.path.join(out_dir, f"{base}_combined.png")
-            fig.savefig(combined_path, dpi=150, bbox_inches='tight')
-            plt.close(fig)
+            with atomic_path(combined_path) as tmp_path:
+                fig.savefig(tmp_path, format="png", dpi=150, bbox_inches='tight')
             saved_files.append(f"{base}_combined.png")
             
             stats_data = []
-            for feature_name, feature_map in self.feature_maps.items():
+            for feature_name, feature_map in feature_maps.items():
                 mean_val = np.mean(feature_map)
                 std_val = np.std(feature_map)
                 min_val = np.min(feature_map)
@@ -214,7 +240,8 @@ class GLCMTool(ProcessingTool):
                 columns=["Feature", "Mean", "Std Dev", "Min", "Max"]
             )
             csv_path = os.path.join(out_dir, f"{base}_stats.csv")
-            stats_df.to_csv(csv_path, index=False)
+            with atomic_path(csv_path) as tmp_path:
+                stats_df.to_csv(tmp_path, index=False)
             saved_files.append(f"{base}_stats.csv")
             
             saved_list = ", ".join(saved_files)
@@ -261,13 +288,30 @@ class GLCMTool(ProcessingTool):
                         value=True
                     )
                     self.register_for_language_update(normalize, "glcm_normalize")
+            
+            with gr.Row():
+                with gr.Column():
+                    window_size = gr.Slider(
+                        label=lang_labels[lang]["glcm_window_size"],
+                        minimum=4, maximum=64, step=1, value=16
+                    )
+                    self.register_for_language_update(window_size, "glcm_window_size")
+                
+                with gr.Column():
+                    step_size = gr.Slider(
+                        label=lang_labels[lang]["glcm_step_size"],
+                        minimum=1, maximum=64, step=1, value=8
+                    )
+                    self.register_for_language_update(step_size, "glcm_step_size")
         
         return {
             "distance": distance,
             "angles": angles,
             "levels": levels,
             "symmetric": symmetric,
-            "normalize": normalize
+            "normalize": normalize,
+            "window_size": window_size,
+            "step_size": step_size
         }
     
     def _create_feature_selection(self, lang):
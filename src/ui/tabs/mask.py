@@ -1,8 +1,9 @@
 import gradio as gr
 from ..tool import ProcessingTool
-from ...utils import lang_labels, refresh_image_list, toggle_image_inputs
-from ...processing import process_mask
-from ..components import create_output_settings
+from ...utils import lang_labels, toggle_image_inputs
+from ...processing import process_mask, process_mask_set, batch_handler, offload
+from ..concurrency import heavy_event
+from ..components import create_output_settings, create_list_filter, bind_list_refresh
 
 class MaskTool(ProcessingTool):
     
@@ -20,6 +21,8 @@ class MaskTool(ProcessingTool):
             
             self._create_image_selection(lang)
             
+            self.components["batch"] = self.create_batch_controls(lang)
+            
             out_dir, out_filename = create_output_settings(lang)
             self.register_for_language_update(out_dir, "output_folder")
             self.register_for_language_update(out_filename, "output_filename")
@@ -32,7 +35,7 @@ class MaskTool(ProcessingTool):
             self.components["process_btn"] = process_btn
             
             result_image = gr.Image(
-                type="numpy",
+                type="pil",
                 label=lang_labels[lang]["rendered_mask"]
             )
             self.register_for_language_update(result_image, "rendered_mask")
@@ -67,9 +70,15 @@ class MaskTool(ProcessingTool):
         )
         self.register_for_language_update(mask_dropdown, "mask_select")
         
+        mask_filter, mask_page = create_list_filter(lang)
+        self.register_for_language_update(mask_filter, "name_filter")
+        self.register_for_language_update(mask_page, "list_page")
+        
         self.components["mask_dir"] = mask_dir
         self.components["mask_refresh"] = mask_refresh
         self.components["mask_dropdown"] = mask_dropdown
+        self.components["mask_filter"] = mask_filter
+        self.components["mask_page"] = mask_page
     
     def _create_image_selection(self, lang):
         with gr.Row():
@@ -101,43 +110,50 @@ class MaskTool(ProcessingTool):
         )
         self.register_for_language_update(image_dropdown, "select_image")
         
+        image_filter, image_page = create_list_filter(lang, visible=False)
+        self.register_for_language_update(image_filter, "name_filter")
+        self.register_for_language_update(image_page, "list_page")
+        
         self.components["use_image"] = use_image
         self.components["image_dir"] = image_dir
         self.components["image_refresh"] = image_refresh
         self.components["image_dropdown"] = image_dropdown
+        self.components["image_filter"] = image_filter
+        self.components["image_page"] = image_page
     
     def _bind_events(self):
-        self.components["mask_refresh"].click(
-            fn=lambda d: gr.update(
-                choices=refresh_image_list(d),
-                value=(refresh_image_list(d)[0] if refresh_image_list(d) else None)
-            ),
-            inputs=[self.components["mask_dir"]],
-            outputs=[self.components["mask_dropdown"]]
+        bind_list_refresh(
+            self.components["mask_dir"],
+            self.components["mask_dropdown"],
+            self.components["mask_refresh"],
+            self.components["mask_filter"],
+            self.components["mask_page"]
         )
         
-        self.components["image_refresh"].click(
-            fn=lambda d: gr.update(
-                choices=refresh_image_list(d),
-                value=(refresh_image_list(d)[0] if refresh_image_list(d) else None)
-            ),
-            inputs=[self.components["image_dir"]],
-            outputs=[self.components["image_dropdown"]]
+        bind_list_refresh(
+            self.components["image_dir"],
+            self.components["image_dropdown"],
+            self.components["image_refresh"],
+            self.components["image_filter"],
+            self.components["image_page"]
         )
         
         self.components["use_image"].change(
-            fn=toggle_image_inputs,
+            fn=lambda use_img: toggle_image_inputs(use_img) + (gr.update(visible=use_img == "Yes"),) * 2,
             inputs=[self.components["use_image"]],
             outputs=[
                 self.components["image_dir"], 
                 self.components["image_refresh"], 
-                self.components["image_dropdown"]
+                self.components["image_dropdown"],
+                self.components["image_filter"],
+                self.components["image_page"]
             ]
         )
         
         self.components["process_btn"].click(
-            fn=process_mask,
-            inputs=[
+            fn=batch_handler(offload(process_mask), out_filename_index=4,
+                             batch_fn=process_mask_set),
+            inputs=self.batch_inputs() + [
                 self.components["mask_dir"],
                 self.components["mask_dropdown"],
                 self.components["image_dir"],
@@ -145,10 +161,13 @@ class MaskTool(ProcessingTool):
                 self.components["use_image"],
                 self.components["out_dir"],
                 self.components["out_filename"],
-                self.components["lang_dropdown"]
+                self.components["lang_dropdown"],
+                self.components["batch"]["encoding"]
             ],
             outputs=[
                 self.components["result_image"],
                 self.components["save_status"]
-            ]
+            ],
+            api_name="process_mask",
+            **heavy_event()
         )
\ No newline at end of file
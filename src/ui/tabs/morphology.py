@@ -1,7 +1,9 @@
 import gradio as gr
 from ..tool import ProcessingTool
 from ...utils import lang_labels, on_select_image
-from ...processing import process_morphology
+from ...processing import (process_morphology, preview_morphology, batch_handler, offload,
+                            MORPHOLOGY_SHAPES)
+from ..concurrency import heavy_event
 from ..components import create_image_selection, create_image_display, create_output_settings
 
 class MorphologyTool(ProcessingTool):
@@ -18,14 +20,18 @@ class MorphologyTool(ProcessingTool):
             
             self.components["lang_dropdown"] = lang_dropdown
             
-            dir_text, image_list, refresh_btn = create_image_selection(lang)
+            dir_text, image_list, refresh_btn, name_filter, list_page = create_image_selection(lang)
             self.register_for_language_update(dir_text, "input_folder")
             self.register_for_language_update(image_list, "select_image")
             self.register_for_language_update(refresh_btn, "refresh_list", "value")
+            self.register_for_language_update(name_filter, "name_filter")
+            self.register_for_language_update(list_page, "list_page")
             
             self.components["dir_text"] = dir_text
             self.components["image_list"] = image_list
             self.components["refresh_btn"] = refresh_btn
+            self.components["name_filter"] = name_filter
+            self.components["list_page"] = list_page
             
             input_image, output_image = create_image_display()
             self.register_for_language_update(input_image, "input_image")
@@ -34,8 +40,12 @@ class MorphologyTool(ProcessingTool):
             self.components["input_image"] = input_image
             self.components["output_image"] = output_image
             
+            self.create_live_preview(lang)
+            
             self.components["morphology"] = self._create_morphology_controls(lang)
             
+            self.components["batch"] = self.create_batch_controls(lang)
+            
             out_dir, out_filename = create_output_settings(lang)
             self.register_for_language_update(out_dir, "output_folder")
             self.register_for_language_update(out_filename, "output_filename")
@@ -60,9 +70,20 @@ class MorphologyTool(ProcessingTool):
                 outputs=[input_image]
             )
             
+            preview_params = [
+                self.components["morphology"][op][key]
+                for op in ("erosion", "dilation", "opening", "closing")
+                for key in ("apply", "kernel_size")
+            ] + [self.components["morphology"]["kernel_shape"]]
+            self.bind_live_preview(
+                preview_morphology,
+                inputs=[dir_text, image_list] + preview_params,
+                triggers=[image_list] + preview_params
+            )
+            
             process_btn.click(
-                fn=process_morphology,
-                inputs=[
+                fn=batch_handler(offload(process_morphology), out_filename_index=9),
+                inputs=self.batch_inputs() + [
                     dir_text,
                     image_list,
                     self.components["morphology"]["erosion"]["apply"],
@@ -75,12 +96,16 @@ class MorphologyTool(ProcessingTool):
                     self.components["morphology"]["closing"]["kernel_size"],
                     out_dir,
                     out_filename,
-                    lang_dropdown
+                    lang_dropdown,
+                    self.components["morphology"]["kernel_shape"],
+                    self.components["batch"]["encoding"]
                 ],
                 outputs=[
                     output_image,
                     save_status
-                ]
+                ],
+                api_name="process_morphology",
+                **heavy_event()
             )
             
         return self.components
@@ -164,6 +189,14 @@ class MorphologyTool(ProcessingTool):
                         )
                         self.register_for_language_update(closing_kernel, "kernel_size")
             
+            with gr.Row():
+                kernel_shape = gr.Radio(
+                    choices=list(MORPHOLOGY_SHAPES),
+                    value="rect",
+                    label=lang_labels[lang]["kernel_shape"]
+                )
+                self.register_for_language_update(kernel_shape, "kernel_shape")
+            
         morphology_controls["erosion"] = {
             "apply": erosion_apply,
             "kernel_size": erosion_kernel
@@ -184,4 +217,6 @@ class MorphologyTool(ProcessingTool):
             "kernel_size": closing_kernel
         }
         
+        morphology_controls["kernel_shape"] = kernel_shape
+        
         return morphology_controls
\ No newline at end of file
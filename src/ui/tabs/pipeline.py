@@ -0,0 +1,98 @@
+import gradio as gr
+from ..tool import ProcessingTool
+from ...utils import lang_labels, on_select_image
+from ...processing import process_pipeline, batch_handler, offload, EXAMPLE_PIPELINE
+from ..concurrency import heavy_event
+from ..components import create_image_selection, create_image_display, create_output_settings
+
+class PipelineTool(ProcessingTool):
+
+    def __init__(self):
+        super().__init__("pipeline")
+        self.tab_titles = {}
+
+    def create_tab(self, lang_dropdown):
+        lang = lang_dropdown.value
+
+        with gr.TabItem(label=lang_labels[lang]["pipeline_tool"]) as tab:
+            self.tab_titles["pipeline_tool"] = (tab, "label")
+
+            self.components["lang_dropdown"] = lang_dropdown
+
+            dir_text, image_list, refresh_btn, name_filter, list_page = create_image_selection(lang)
+            self.register_for_language_update(dir_text, "input_folder")
+            self.register_for_language_update(image_list, "select_image")
+            self.register_for_language_update(refresh_btn, "refresh_list", "value")
+            self.register_for_language_update(name_filter, "name_filter")
+            self.register_for_language_update(list_page, "list_page")
+
+            self.components["dir_text"] = dir_text
+            self.components["image_list"] = image_list
+            self.components["refresh_btn"] = refresh_btn
+            self.components["name_filter"] = name_filter
+            self.components["list_page"] = list_page
+
+            input_image, output_image = create_image_display()
+            self.register_for_language_update(input_image, "input_image")
+            self.register_for_language_update(output_image, "output_image")
+
+            self.components["input_image"] = input_image
+            self.components["output_image"] = output_image
+
+            pipeline_help = gr.Markdown(lang_labels[lang]["pipeline_help"])
+            self.register_for_language_update(pipeline_help, "pipeline_help", "value")
+
+            spec = gr.Code(
+                value=EXAMPLE_PIPELINE,
+                language="json",
+                label=lang_labels[lang]["pipeline_spec"]
+            )
+            self.register_for_language_update(spec, "pipeline_spec")
+            self.components["spec"] = spec
+
+            self.components["batch"] = self.create_batch_controls(lang)
+
+            out_dir, out_filename = create_output_settings(lang)
+            self.register_for_language_update(out_dir, "output_folder")
+            self.register_for_language_update(out_filename, "output_filename")
+
+            self.components["out_dir"] = out_dir
+            self.components["out_filename"] = out_filename
+
+            process_btn = gr.Button(lang_labels[lang]["process_pipeline"])
+            self.register_for_language_update(process_btn, "process_pipeline", "value")
+            self.components["process_btn"] = process_btn
+
+            save_status = gr.Textbox(
+                label=lang_labels[lang]["save_status"],
+                interactive=False
+            )
+            self.register_for_language_update(save_status, "save_status")
+            self.components["save_status"] = save_status
+
+            image_list.change(
+                fn=on_select_image,
+                inputs=[dir_text, image_list],
+                outputs=[input_image]
+            )
+
+            process_btn.click(
+                fn=batch_handler(offload(process_pipeline), out_filename_index=2),
+                inputs=self.batch_inputs() + [
+                    dir_text,
+                    image_list,
+                    spec,
+                    out_dir,
+                    out_filename,
+                    lang_dropdown,
+                    self.components["batch"]["encoding"]
+                ],
+                outputs=[
+                    output_image,
+                    save_status
+                ],
+                api_name="process_pipeline",
+                **heavy_event()
+            )
+
+        return self.components
\ No newline at end of file
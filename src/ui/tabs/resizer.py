@@ -1,7 +1,9 @@
 import gradio as gr
 from ..tool import ProcessingTool
 from ...utils import lang_labels, on_select_image
-from ...processing import process_image_aspect, process_image_custom
+from ...processing import (process_image_aspect, process_image_custom, batch_handler, offload,
+                           preview_aspect, preview_custom)
+from ..concurrency import heavy_event
 from ..components import create_image_selection, create_image_display, create_output_settings
 
 class ResizerTool(ProcessingTool):
@@ -17,14 +19,18 @@ class ResizerTool(ProcessingTool):
                 
             self.components["lang_dropdown"] = lang_dropdown
             
-            dir_text, image_list, refresh_btn = create_image_selection(lang)
+            dir_text, image_list, refresh_btn, name_filter, list_page = create_image_selection(lang)
             self.register_for_language_update(dir_text, "input_folder")
             self.register_for_language_update(image_list, "select_image")
             self.register_for_language_update(refresh_btn, "refresh_list", "value")
+            self.register_for_language_update(name_filter, "name_filter")
+            self.register_for_language_update(list_page, "list_page")
             
             self.components["dir_text"] = dir_text
             self.components["image_list"] = image_list
             self.components["refresh_btn"] = refresh_btn
+            self.components["name_filter"] = name_filter
+            self.components["list_page"] = list_page
             
             input_image, output_image = create_image_display()
             self.register_for_language_update(input_image, "input_image")
@@ -33,6 +39,8 @@ class ResizerTool(ProcessingTool):
             self.components["input_image"] = input_image
             self.components["output_image"] = output_image
             
+            self.create_live_preview(lang)
+            
             out_dir, out_filename = create_output_settings(lang)
             self.register_for_language_update(out_dir, "output_folder")
             self.register_for_language_update(out_filename, "output_filename")
@@ -47,6 +55,8 @@ class ResizerTool(ProcessingTool):
             self.register_for_language_update(save_status, "save_status")
             self.components["save_status"] = save_status
             
+            self.components["batch"] = self.create_batch_controls(lang)
+            
             with gr.Accordion("Advanced Options", open=False):
                 self.components["binary"] = self._create_binary_controls(lang)
                 self.components["blur"] = self._create_blur_controls(lang)
@@ -66,8 +76,39 @@ class ResizerTool(ProcessingTool):
                 outputs=[input_image]
             )
             
+            # The live preview follows whichever resize mode tab is open
+            resize_mode = gr.State("aspect")
+            aspect_tab.select(fn=lambda: "aspect", outputs=[resize_mode])
+            custom_tab.select(fn=lambda: "custom", outputs=[resize_mode])
+            
+            preview_params = [
+                self.components["aspect"]["target_size"],
+                self.components["aspect"]["output_square"],
+                self.components["aspect"]["margin"],
+                self.components["custom"]["width"],
+                self.components["custom"]["height"],
+                self.components["binary"]["apply"],
+                self.components["binary"]["threshold"],
+                self.components["blur"]["apply"],
+                self.components["blur"]["radius"]
+            ]
+            self.bind_live_preview(
+                self._preview_resize,
+                inputs=[resize_mode, dir_text, image_list] + preview_params,
+                triggers=[resize_mode, image_list] + preview_params
+            )
+            
         return self.components
     
+    @staticmethod
+    def _preview_resize(mode, input_dir, filename, target_size, output_square, margin,
+                        width, height, apply_binary, binary_threshold, apply_blur, blur_radius):
+        if mode == "custom":
+            return preview_custom(input_dir, filename, width, height, apply_binary,
+                                  binary_threshold, apply_blur, blur_radius)
+        return preview_aspect(input_dir, filename, target_size, output_square, apply_binary,
+                              binary_threshold, margin, apply_blur, blur_radius)
+    
     def _create_aspect_tab(self, lang):
         with gr.Column():
             target_size = gr.Slider(
@@ -92,8 +133,8 @@ class ResizerTool(ProcessingTool):
             self.register_for_language_update(process_btn, "process_aspect", "value")
             
             process_btn.click(
-                fn=process_image_aspect,
-                inputs=[
+                fn=batch_handler(offload(process_image_aspect), out_filename_index=3),
+                inputs=self.batch_inputs() + [
                     self.components["dir_text"],
                     self.components["image_list"],
                     target_size,
@@ -105,12 +146,15 @@ class ResizerTool(ProcessingTool):
                     margin,
                     self.components["blur"]["apply"],
                     self.components["blur"]["radius"],
-                    self.components["lang_dropdown"]
+                    self.components["lang_dropdown"],
+                    self.components["batch"]["encoding"]
                 ],
                 outputs=[
                     self.components["output_image"],
                     self.components["save_status"]
-                ]
+                ],
+                api_name="process_aspect",
+                **heavy_event()
             )
         
         return {
@@ -138,8 +182,8 @@ class ResizerTool(ProcessingTool):
             self.register_for_language_update(process_btn, "process_custom", "value")
             
             process_btn.click(
-                fn=process_image_custom,
-                inputs=[
+                fn=batch_handler(offload(process_image_custom), out_filename_index=3),
+                inputs=self.batch_inputs() + [
                     self.components["dir_text"],
                     self.components["image_list"],
                     width,
@@ -150,12 +194,15 @@ class ResizerTool(ProcessingTool):
                     self.components["binary"]["threshold"],
                     self.components["blur"]["apply"],
                     self.components["blur"]["radius"],
-                    self.components["lang_dropdown"]
+                    self.components["lang_dropdown"],
+                    self.components["batch"]["encoding"]
                 ],
                 outputs=[
                     self.components["output_image"],
                     self.components["save_status"]
-                ]
+                ],
+                api_name="process_custom",
+                **heavy_event()
             )
         
         return {
@@ -22,6 +22,61 @@ class ProcessingTool(ABC):
                 self.language_components.append((component, lang_key, update_type))
         return component
     
+    def create_batch_controls(self, lang):
+        from .components import create_batch_controls
+        batch_process, batch_folder, batch_workers, batch_executor, encoding = create_batch_controls(lang)
+        self.register_for_language_update(batch_process, "batch_process")
+        self.register_for_language_update(batch_folder, "batch_folder")
+        self.register_for_language_update(batch_workers, "batch_workers")
+        self.register_for_language_update(batch_executor, "batch_executor")
+        self.register_for_language_update(encoding, "encoding_profile")
+        return {
+            "process": batch_process,
+            "folder": batch_folder,
+            "workers": batch_workers,
+            "executor": batch_executor,
+            "encoding": encoding
+        }
+    
+    def batch_inputs(self):
+        """Leading inputs expected by handlers built with processing.batch_handler"""
+        batch = self.components["batch"]
+        return [batch["process"], batch["folder"], batch["workers"], batch["executor"]]
+    
+    def create_live_preview(self, lang):
+        from .components import create_live_preview
+        live_preview = create_live_preview(lang)
+        self.register_for_language_update(live_preview, "live_preview")
+        self.components["live_preview"] = live_preview
+        return live_preview
+
+    def bind_live_preview(self, fn, inputs, triggers):
+        """
+        Re-render output_image with fn(*inputs) on the downscaled proxy whenever
+        a trigger changes and live preview is on. Runs in the light concurrency
+        group; the process button still renders and saves at full resolution.
+        """
+        import gradio as gr
+        live_preview = self.components["live_preview"]
+
+        def live_preview_handler(live, *args):
+            if not live:
+                return gr.update()
+            try:
+                return fn(*args)
+            except Exception:
+                # Invalid settings are reported by the full-resolution run
+                return gr.update()
+
+        gr.on(
+            triggers=[component.change for component in [live_preview] + triggers],
+            fn=live_preview_handler,
+            inputs=[live_preview] + inputs,
+            outputs=[self.components["output_image"]],
+            trigger_mode="always_last",
+            show_progress="hidden"
+        )
+
     def get_language_updates(self, lang):
         import gradio as gr
         updates = []
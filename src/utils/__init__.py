@@ -1,2 +1,10 @@
 from .language import *
-from .files import *
\ No newline at end of file
+from .config import *
+from .files import *
+from .dir_index import *
+from .image_cache import *
+from .svg import *
+from .image_io import *
+from .session_store import *
+from .encoding import *
+from .output_writer import *
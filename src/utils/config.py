@@ -0,0 +1,32 @@
+import os
+import json
+from functools import lru_cache
+
+# JSON file read for settings not given as environment variables
+DEFAULT_CONFIG_FILE = "config.json"
+
+
+@lru_cache(maxsize=None)
+def load_config_file(path=None):
+    """Settings from the JSON file at `path`, $APP_CONFIG or ./config.json ({} if absent)"""
+    path = path or os.environ.get("APP_CONFIG", DEFAULT_CONFIG_FILE)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_setting(name, default=None, cast=None):
+    """
+    Look a setting up in the environment (upper-case name), then in the
+    config file (lower-case key), then fall back to `default`. An empty
+    environment variable or a JSON null means "no value".
+    """
+    value = os.environ.get(name.upper())
+    if value is None:
+        value = load_config_file().get(name.lower(), default)
+    elif value == "":
+        value = None
+    if value is None or cast is None:
+        return value
+    return cast(value)
\ No newline at end of file
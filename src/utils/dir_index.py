@@ -0,0 +1,107 @@
+import os
+import time
+import bisect
+import threading
+from collections import OrderedDict
+from .config import get_setting
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".svg", ".tif", ".tiff")
+
+# A directory modified this close to its last scan may have changed again
+# within the same timestamp tick (2 s on FAT and some network mounts)
+MTIME_GRANULARITY_NS = 2 * 10**9
+
+# Number of directory listings kept
+MAX_DIRECTORIES = 64
+
+# Default number of filenames sent to a dropdown at once
+DEFAULT_LIST_PAGE_SIZE = 1000
+
+
+def list_page_size():
+    return get_setting("list_page_size", DEFAULT_LIST_PAGE_SIZE, int)
+
+
+class DirectoryIndex:
+    """
+    Cached listings of the image files in directories, shared by every tab.
+
+    A listing is rescanned (with os.scandir) only when the directory's mtime
+    changed, which happens whenever a file is added, removed or renamed, so
+    refreshing a folder of 100k files costs a single stat. Names are sorted
+    case-insensitively, which lets prefix filters use bisection.
+    """
+
+    def __init__(self, extensions=IMAGE_EXTENSIONS, max_directories=MAX_DIRECTORIES):
+        self.extensions = extensions
+        self.max_directories = max_directories
+        self._listings = OrderedDict()  # path -> (mtime_ns, scanned_ns, names, keys)
+        self._lock = threading.Lock()
+
+    def _scan(self, path):
+        with os.scandir(path) as entries:
+            names = [entry.name for entry in entries
+                     if entry.name.lower().endswith(self.extensions) and entry.is_file()]
+        names.sort(key=str.casefold)
+        return tuple(names), tuple(name.casefold() for name in names)
+
+    def _listing(self, directory):
+        """(names, keys) of directory, rescanned only if it changed"""
+        path = os.path.abspath(directory)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._listings.pop(path, None)
+            return (), ()
+
+        with self._lock:
+            cached = self._listings.get(path)
+            if (cached is not None and cached[0] == mtime_ns
+                    and cached[1] - mtime_ns > MTIME_GRANULARITY_NS):
+                self._listings.move_to_end(path)
+                return cached[2], cached[3]
+
+        # Taken before scanning so a change during the scan is never missed
+        scanned_ns = time.time_ns()
+        try:
+            names, keys = self._scan(path)
+        except OSError:
+            return (), ()
+        with self._lock:
+            self._listings[path] = (mtime_ns, scanned_ns, names, keys)
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.max_directories:
+                self._listings.popitem(last=False)
+        return names, keys
+
+    def list(self, directory):
+        """Sorted image filenames of directory (empty if it does not exist)"""
+        return self._listing(directory)[0]
+
+    def page(self, directory, prefix="", page=1, page_size=None):
+        """
+        One page of the image filenames of directory that start with prefix
+        (case-insensitive). Returns (names, first, total), where first is the
+        index of names[0] among the total matches; page is clamped to range.
+        """
+        names, keys = self._listing(directory)
+        prefix = (prefix or "").casefold()
+        start = bisect.bisect_left(keys, prefix)
+        stop = bisect.bisect_left(keys, prefix + "\U0010ffff", start) if prefix else len(keys)
+        total = stop - start
+        page_size = max(1, page_size or list_page_size())
+        last_page = max(1, -(-total // page_size))
+        first = (min(max(1, int(page or 1)), last_page) - 1) * page_size
+        return list(names[start + first:min(stop, start + first + page_size)]), first, total
+
+    def invalidate(self, directory=None):
+        """Forget one directory's listing, or all of them"""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(os.path.abspath(directory), None)
+
+
+directory_index = DirectoryIndex()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import os
+from PIL import Image
+
+# Encoding profiles for saved outputs; "default" keeps the output's
+# extension and PIL's default settings
+ENCODING_PROFILES = ("default", "fast", "archive", "web")
+
+# Format each profile writes in place of the output extension's format
+_PROFILE_FORMATS = {
+    "fast": {},
+    "archive": {"JPEG": "PNG", "WEBP": "PNG", "BMP": "PNG"},
+    "web": {"PNG": "WEBP", "JPEG": "WEBP", "BMP": "WEBP", "TIFF": "WEBP"},
+}
+
+# Save parameters of each profile by format
+_PROFILE_PARAMS = {
+    "fast": {
+        "PNG": {"compress_level": 1},
+        "JPEG": {"quality": 90},
+        "WEBP": {"quality": 90, "method": 0},
+        "TIFF": {"compression": "raw"},
+    },
+    "archive": {
+        "PNG": {"compress_level": 9, "optimize": True},
+        "TIFF": {"compression": "tiff_adobe_deflate"},
+    },
+    "web": {
+        "PNG": {"optimize": True},
+        "WEBP": {"quality": 80, "method": 4},
+    },
+}
+
+# Formats that keep binary images exact at 1 bit per pixel
+_BILEVEL_FORMATS = ("PNG", "TIFF")
+
+# Largest width or height a WebP image can have
+WEBP_MAX_SIZE = 16383
+
+
+def is_binary(image):
+    """True for a "1" image, or an "L" image holding only black and white"""
+    if image.mode == "1":
+        return True
+    if image.mode != "L":
+        return False
+    return sum(image.histogram()[1:255]) == 0
+
+
+def encode_output(image, path, encoding=None):
+    """
+    Apply an encoding profile to an output: returns the (image, path, save
+    params) to save. The profile picks the format (the path's extension is
+    changed to match) and its compression settings; binary images are
+    written as 1-bit PNG or TIFF. None or "default" returns the output as
+    given.
+    """
+    if not encoding or encoding == "default":
+        return image, path, {}
+    if encoding not in _PROFILE_FORMATS:
+        raise ValueError(f"unknown encoding profile: {encoding}")
+
+    base, ext = os.path.splitext(path)
+    image_format = Image.registered_extensions().get(ext.lower())
+    image_format = _PROFILE_FORMATS[encoding].get(image_format, image_format)
+    binary = is_binary(image)
+    if image_format == "WEBP" and (binary or max(image.size) > WEBP_MAX_SIZE):
+        # Lossy encoders blur black/white edges, and WebP has a size limit
+        image_format = "PNG"
+    if binary and image_format not in _BILEVEL_FORMATS:
+        image_format = "PNG"
+    if binary and image.mode != "1":
+        image = image.convert("1", dither=Image.Dither.NONE)
+
+    if Image.registered_extensions().get(ext.lower()) != image_format:
+        ext = {"PNG": ".png", "WEBP": ".webp"}.get(image_format, ext)
+    params = dict(_PROFILE_PARAMS[encoding].get(image_format, {}), format=image_format)
+    return image, base + ext, params
@@ -1,40 +1,36 @@
 import os
-import io
 import numpy as np
 from PIL import Image
-import gradio as gr
-import cairosvg
+from .dir_index import directory_index
+from .image_io import read_image
 
 
 
 def refresh_file_list(directory):
     """
     Returns a list of image files in the specified directory (supports common image formats).
+    Listings come from the shared directory index and are only rescanned when the folder changed.
     """
-    valid_extensions = [".png", ".jpg", ".jpeg", ".bmp", ".gif", ".svg", ".tif", ".tiff"]
-    if not os.path.exists(directory):
-        return []
-    files = [f for f in os.listdir(directory)
-             if os.path.splitext(f)[1].lower() in valid_extensions]
-    return files
+    return list(directory_index.list(directory))
 
-def refresh_list(directory):
+def refresh_list(directory, prefix="", page=1):
     """
     Refreshes the dropdown options based on the specified directory.
+    Only one page of the files starting with `prefix` is sent to the browser;
+    the dropdown info shows which part of the matches it holds.
     Returns the updated dropdown value (first image if available).
     """
-    files = refresh_file_list(directory)
+    import gradio as gr
+    files, first, total = directory_index.page(directory, prefix, page)
     default_val = files[0] if files else None
-    return gr.update(choices=files, value=default_val)
+    info = f"{first + 1}-{first + len(files)} / {total}" if total > len(files) else ""
+    return gr.update(choices=files, value=default_val, info=info)
 
 def refresh_image_list(dir_path):
-    try:
-        return [f for f in os.listdir(dir_path) if f.lower().endswith(
-            (".png", ".jpg", ".jpeg", ".svg", ".tif", ".tiff"))]
-    except Exception as e:
-        return []
+    return refresh_file_list(dir_path)
             
 def toggle_image_inputs(use_img):
+    import gradio as gr
     if use_img == "Yes":
         return gr.update(visible=True), gr.update(visible=True), gr.update(visible=True)
     else:
@@ -54,28 +50,9 @@ def load_selected_image(directory, filename):
         return None
 
     try:
-        # Handle SVG files
-        if filename.lower().endswith('.svg'):
-            # Convert SVG to PNG using cairosvg
-            png_data = cairosvg.svg2png(
-                url=path,
-                output_height=1024,  # Default size
-                output_width=1024,   # Will maintain aspect ratio
-                scale=2.0,           # Better quality
-                background_color='white'  # Set white background for SVG
-            )
-            image = Image.open(io.BytesIO(png_data))
-        else:
-            # Handle regular image formats
-            image = Image.open(path)
-            image.verify()  # Verify image integrity
-            image = Image.open(path)  # Reopen after verify
-        
-        # Convert to RGB if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-            
-        return image
+        # Decoded once and shared with the processing tabs; SVGs are
+        # rasterized straight to preview size through the shared SVG cache
+        return read_image(path, "RGB")
         
     except Exception as e:
         print(f"Error loading image {filename}: {str(e)}")
@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageOps
+from .config import get_setting
+
+# Default memory budget for decoded images, overridable with the image_cache_bytes setting
+DEFAULT_IMAGE_CACHE_BYTES = 512 * 1024 * 1024
+
+_MODE_BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I": 4, "F": 4}
+
+
+def image_nbytes(image):
+    """Approximate memory held by a decoded PIL image"""
+    per_pixel = _MODE_BYTES_PER_PIXEL.get(image.mode, len(image.getbands()))
+    return image.width * image.height * per_pixel
+
+
+class ImageCache:
+    """
+    Process-wide LRU cache of decoded images.
+
+    Entries are keyed by (path, mtime, file size, mode), so a file that changes
+    on disk is decoded again. mode=None stores the image as decoded; other modes
+    are converted from that entry, so asking for "RGB" and then "L" of the same
+    file decodes it only once. Images are stored with their EXIF orientation
+    applied. Cached images are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(path, mode=None):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, mode)
+
+    def lookup(self, key):
+        """Return the cached image for `key` (marking it recently used) or None"""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def get(self, path, mode=None):
+        """Return the decoded image for `path` in `mode`, decoding on a miss"""
+        key = self.make_key(path, mode)
+        image = self.lookup(key)
+        if image is not None:
+            return image
+
+        if mode is None:
+            with Image.open(path) as image:
+                image.load()
+                # Orientation is applied once here, so every mode and user sees upright pixels
+                ImageOps.exif_transpose(image, in_place=True)
+        else:
+            base = self.get(path)
+            if base.mode == mode:
+                return base
+            image = base.convert(mode)
+
+        self.put(key, image)
+        return image
+
+    def put(self, key, image):
+        nbytes = image_nbytes(image)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= image_nbytes(self._entries.pop(key))
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = image
+            self.current_bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, image = self._entries.popitem(last=False)
+            self.current_bytes -= image_nbytes(image)
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+image_cache = ImageCache(get_setting("image_cache_bytes", DEFAULT_IMAGE_CACHE_BYTES, int))
+
+
+def load_cached_image(path, mode=None):
+    """Load an image through the shared cache (see ImageCache.get)"""
+    return image_cache.get(path, mode)
@@ -0,0 +1,130 @@
+import math
+from PIL import Image, ImageOps
+from .image_cache import image_cache, ImageCache
+from .config import get_setting
+from .svg import rasterize_svg_to_fit, SVG_PREVIEW_SIZE
+
+# Images are decoded at no less than this multiple of their final size, so
+# the final resize still has enough pixels to filter (as Image.thumbnail does)
+REDUCING_GAP = 2.0
+
+# Default long side of the result images sent to the browser, overridable
+# with the display_size setting (0 sends them at full size)
+DEFAULT_DISPLAY_SIZE = 2048
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_ORIENTATION_TAG = 0x0112
+
+# Modes Image.reduce supports
+_REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA", "CMYK", "I", "F")
+
+
+def _oriented_size(image):
+    """Size of an opened image once its EXIF orientation is applied"""
+    if image.getexif().get(_ORIENTATION_TAG) in _TRANSPOSED_ORIENTATIONS:
+        return image.height, image.width
+    return image.size
+
+
+def image_size(path):
+    """(width, height) of a raster image as displayed, read from its header only"""
+    with Image.open(path) as image:
+        return _oriented_size(image)
+
+
+def _reduction(source_size, long_side=None, size=None):
+    """Integer factor an image may shrink by on decode before its final resize"""
+    width, height = source_size
+    if long_side:
+        scale = long_side / max(width, height)
+    else:
+        scale = max(size[0] / width, size[1] / height)
+    if scale <= 0:
+        return 1
+    return max(1, int(1 / (scale * REDUCING_GAP)))
+
+
+def _decode_reduced(path, mode, long_side, size):
+    """Decode at a reduced scale (JPEG DCT scaling, else Image.reduce); None if not worth it"""
+    with Image.open(path) as image:
+        factor = _reduction(_oriented_size(image), long_side, size)
+        if factor < 2:
+            return None
+        width, height = image.size
+        if image.format == "JPEG":
+            # Picks the largest of the 1/2, 1/4, 1/8 scales still covering the request
+            image.draft(mode, (math.ceil(width / factor), math.ceil(height / factor)))
+        image.load()
+        ImageOps.exif_transpose(image, in_place=True)
+    if image.mode not in _REDUCIBLE_MODES:
+        image = image.convert(mode)
+    # Whatever the JPEG draft left of the reduction is done by Image.reduce
+    remaining = int(factor * max(image.size) / max(width, height))
+    if remaining >= 2:
+        image = image.reduce(remaining)
+    if image.mode != mode:
+        image = image.convert(mode)
+    return image
+
+
+def read_image(path, mode="RGB", long_side=None, size=None):
+    """
+    Load the image at `path` in `mode` for an operation. Every processing
+    module loads its inputs through here.
+
+    When the caller already knows its output size, i.e. the long side the
+    image will be scaled to (`long_side`) or the (width, height) it will be
+    stretched to (`size`), large rasters are decoded directly at a reduced
+    scale that keeps at least REDUCING_GAP times the needed resolution, and
+    cached as such. SVGs are rasterized at that size. EXIF orientation is
+    applied once when an image is decoded. The result is shared and must be
+    treated as read-only.
+    """
+    if path.lower().endswith(".svg"):
+        image = rasterize_svg_to_fit(path, long_side or (max(size) if size else SVG_PREVIEW_SIZE))
+        return image if mode is None or image.mode == mode else image.convert(mode)
+    if mode is None or not (long_side or size):
+        return image_cache.get(path, mode)
+
+    # A full decode that is already cached costs nothing
+    for cached_mode in (mode, None):
+        image = image_cache.lookup(ImageCache.make_key(path, cached_mode))
+        if image is not None and image.mode == mode:
+            return image
+
+    long_side = math.ceil(long_side) if long_side else None
+    size = tuple(int(side) for side in size) if size and not long_side else None
+    key = ImageCache.make_key(path, ("reduced", mode, long_side, size))
+    image = image_cache.lookup(key)
+    if image is None:
+        image = _decode_reduced(path, mode, long_side, size)
+        if image is None:
+            return image_cache.get(path, mode)
+        image_cache.put(key, image)
+    return image
+
+
+def display_size():
+    return get_setting("display_size", DEFAULT_DISPLAY_SIZE, int)
+
+
+def display_result(result):
+    """
+    A handler's result image as sent to the browser: an 8-bit "L", "RGB" or
+    "RGBA" image no larger than display_size() on its long side. The file
+    saved by the handler keeps full resolution. Gallery lists of (image,
+    caption) are converted item by item; None passes through.
+    """
+    if isinstance(result, list):
+        return [(display_result(image), caption) for image, caption in result]
+    if result is None:
+        return None
+    if result.mode not in ("L", "RGB", "RGBA"):
+        result = result.convert("L" if len(result.getbands()) == 1 else "RGB")
+    long_side = display_size()
+    if long_side > 0 and max(result.size) > long_side:
+        scale = long_side / max(result.size)
+        size = (max(1, round(result.width * scale)), max(1, round(result.height * scale)))
+        result = result.resize(size, Image.BILINEAR, reducing_gap=REDUCING_GAP)
+    return result
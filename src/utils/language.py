@@ -4,6 +4,8 @@ lang_labels = {
         "title": "Image Processing Tool",
         "input_folder": "Input Image Folder",
         "refresh_list": "Refresh Image List",
+        "name_filter": "Filter by Name Prefix",
+        "list_page": "List Page",
         "select_image": "Select Image",
         "input_image": "Input Image",
         "output_image": "Output Image",
@@ -25,6 +27,7 @@ lang_labels = {
         "open_failed": "Failed to open image: {}",
         "save_success": "Save successful: {}",
         "save_failed": "Save failed: {}",
+        "save_queued": "Writing in the background: {}",
         "default_output": "output",
         "image_resizer": "Image Resizer",
         "mask_renderer": "Mask Renderer",
@@ -49,7 +52,15 @@ lang_labels = {
         "crop_margins": "Output Margins",
         "batch_process": "Batch Process",
         "process_crop": "Process Crop",
-        "batch_folder": "Batch Input Folder",
+        "batch_folder": "Batch Input Folder or Glob",
+        "batch_workers": "Batch Workers",
+        "batch_executor": "Batch Pool",
+        "encoding_profile": "Encoding Profile",
+        "live_preview": "Live Preview (downscaled)",
+        "batch_progress": "Processed {}/{} ({:.1f} images/s), {} failed",
+        "batch_summary": "Batch finished: {} succeeded, {} failed in {:.1f}s ({:.1f} images/s)",
+        "batch_failures": "Failed files:",
+        "batch_empty": "No images found in batch folder",
         "file_not_found": "File not found",
         "invalid_svg": "Invalid SVG file",
         "svg_convert_failed": "Failed to convert SVG",
@@ -64,6 +75,7 @@ lang_labels = {
         "apply_opening": "Apply Opening",
         "apply_closing": "Apply Closing",
         "kernel_size": "Kernel Size",
+        "kernel_shape": "Structuring Element",
         "process_morph": "Process Morphology",
         "glcm_tool": "GLCM Texture Analysis",
         "glcm_parameters": "GLCM Parameters",
@@ -72,6 +84,8 @@ lang_labels = {
         "glcm_levels": "Gray Levels",
         "glcm_symmetric": "Symmetric",
         "glcm_normalize": "Normalize",
+        "glcm_window_size": "Window Size (pixels)",
+        "glcm_step_size": "Window Step (pixels)",
         "feature_selection": "Feature Selection",
         "feature_contrast": "Contrast",
         "feature_dissimilarity": "Dissimilarity",
@@ -94,11 +108,21 @@ lang_labels = {
         "canny_high_threshold": "Canny High Threshold",
         "gaussian_sigma": "Gaussian Sigma",
         "process_edge": "Detect Edges",
+        "edge_gallery": "Edge Maps",
+        "edge_timings": "Decoded once in {:.0f} ms; {} ({} threads, {:.0f} ms in total)",
+        "pipeline_tool": "Pipeline",
+        "pipeline_spec": "Pipeline Steps (JSON)",
+        "pipeline_help": "Stages: crop, aspect, custom, binarize, point, blur, morphology, edge. Each step is {\"op\": stage, ...parameters}; only the final image is saved.",
+        "process_pipeline": "Run Pipeline",
+        "pipeline_invalid": "Invalid pipeline: {}",
+        "pipeline_timings": "Stages: {}",
     },
     "中文": {
         "title": "图片处理工具",
         "input_folder": "输入图片文件夹",
         "refresh_list": "刷新图片列表",
+        "name_filter": "按文件名前缀筛选",
+        "list_page": "列表页码",
         "select_image": "选择图片",
         "input_image": "输入图片",
         "output_image": "输出图片",
@@ -120,6 +144,7 @@ lang_labels = {
         "open_failed": "打开图片失败：{}",
         "save_success": "保存成功：{}",
         "save_failed": "保存失败：{}",
+        "save_queued": "后台写入中：{}",
         "default_output": "output",
         "image_resizer": "图像缩放器",
         "mask_renderer": "遮罩生成器",
@@ -144,7 +169,15 @@ lang_labels = {
         "crop_margins": "输出边距",
         "batch_process": "批量处理",
         "process_crop": "处理裁剪",
-        "batch_folder": "批量输入文件夹",
+        "batch_folder": "批量输入文件夹或通配符",
+        "batch_workers": "批量线程/进程数",
+        "batch_executor": "批量执行池",
+        "encoding_profile": "编码配置",
+        "live_preview": "实时预览（缩小）",
+        "batch_progress": "已处理 {}/{}（{:.1f} 张/秒），失败 {} 张",
+        "batch_summary": "批量处理完成：成功 {} 张，失败 {} 张，用时 {:.1f} 秒（{:.1f} 张/秒）",
+        "batch_failures": "失败的文件：",
+        "batch_empty": "批量文件夹中没有图片",
         "file_not_found": "找不到文件",
         "invalid_svg": "无效的SVG文件",
         "svg_convert_failed": "SVG转换失败",
@@ -159,6 +192,7 @@ lang_labels = {
         "apply_opening": "应用开运算",
         "apply_closing": "应用闭运算",
         "kernel_size": "核大小",
+        "kernel_shape": "结构元素",
         "process_morph": "处理形态学",
         "glcm_tool": "GLCM纹理分析",
         "glcm_parameters": "GLCM参数",
@@ -167,6 +201,8 @@ lang_labels = {
         "glcm_levels": "灰度级别",
         "glcm_symmetric": "对称性",
         "glcm_normalize": "归一化",
+        "glcm_window_size": "窗口大小（像素）",
+        "glcm_step_size": "窗口步长（像素）",
         "feature_selection": "特征选择",
         "feature_contrast": "对比度",
         "feature_dissimilarity": "差异性",
@@ -189,10 +225,17 @@ lang_labels = {
         "canny_high_threshold": "Canny 高阈值",
         "gaussian_sigma": "高斯 Sigma",
         "process_edge": "检测边缘",
+        "edge_gallery": "边缘图",
+        "edge_timings": "解码一次 {:.0f} 毫秒；{}（{} 个线程，共 {:.0f} 毫秒）",
+        "pipeline_tool": "流水线",
+        "pipeline_spec": "流水线步骤 (JSON)",
+        "pipeline_help": "可用步骤：crop、aspect、custom、binarize、point、blur、morphology、edge。每一步写作 {\"op\": 步骤名, ...参数}；只保存最终结果。",
+        "process_pipeline": "运行流水线",
+        "pipeline_invalid": "流水线无效：{}",
+        "pipeline_timings": "各步骤耗时：{}",
     }
 }
 
-import gradio as gr
 # ---------------------------
 # Callback to Update UI Labels Dynamically
 # ---------------------------
@@ -201,6 +244,8 @@ def update_ui_language(lang):
     When the language selection changes, update the labels of various UI components.
     Returns updated values for the title markdown and for components that support update.
     """
+    import gradio as gr
+    
     messages = lang_labels[lang]
     updates = [
         gr.update(value=f"# {messages['title']}"),                # title_markdown
@@ -0,0 +1,182 @@
+import os
+import queue
+import atexit
+import uuid
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from PIL import Image
+from .config import get_setting
+from .language import lang_labels
+from .encoding import encode_output
+
+# Defaults overridable with the output_queue_size (0 writes synchronously)
+# and output_writer_threads settings
+DEFAULT_OUTPUT_QUEUE_SIZE = 8
+DEFAULT_OUTPUT_WRITER_THREADS = 2
+
+_writer = None
+_writer_lock = threading.Lock()
+_deferred = threading.local()
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield a temporary path next to `path` to write to; it is renamed over
+    `path` once the block succeeds and removed otherwise, so readers (and
+    other tools watching the output folder) never see a partly written file.
+    """
+    folder, name = os.path.split(path)
+    # Hidden and without an image extension, so folder listings skip it
+    tmp_path = os.path.join(folder, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_save(image, path, **params):
+    """Save a PIL image to `path` through atomic_path; returns the path"""
+    image_format = params.pop("format", None)
+    if image_format is None:
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in Image.registered_extensions():
+            raise ValueError(f"unknown file extension: {ext}")
+        image_format = Image.registered_extensions()[ext]
+    with atomic_path(path) as tmp_path:
+        image.save(tmp_path, image_format, **params)
+    return path
+
+
+class OutputWriter:
+    """
+    Saves images in the background on `threads` daemon threads.
+
+    submit() queues a save and returns a Future of the written path. Once
+    `max_pending` saves are waiting, submit blocks until a thread picks one
+    up, so a handler producing images faster than the disk takes them is
+    slowed down instead of piling images up in memory. Files are written
+    with atomic_save, and the queue is drained at interpreter exit.
+    """
+
+    def __init__(self, max_pending=DEFAULT_OUTPUT_QUEUE_SIZE, threads=DEFAULT_OUTPUT_WRITER_THREADS):
+        self.threads = max(1, threads)
+        self._queue = queue.Queue(max(1, max_pending))
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def submit(self, image, path, **params):
+        self._start()
+        future = Future()
+        self._queue.put((future, image, path, params))
+        return future
+
+    def join(self):
+        """Wait until every queued save is written"""
+        self._queue.join()
+
+    def _start(self):
+        with self._lock:
+            if self._workers:
+                return
+            for _ in range(self.threads):
+                worker = threading.Thread(target=self._work, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            atexit.register(self.join)
+
+    def _work(self):
+        while True:
+            future, image, path, params = self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(atomic_save(image, path, **params))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+
+def get_output_writer():
+    """The shared OutputWriter, created on first use (None when writes are synchronous)"""
+    global _writer
+    max_pending = get_setting("output_queue_size", DEFAULT_OUTPUT_QUEUE_SIZE, int)
+    if max_pending <= 0:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = OutputWriter(max_pending, get_setting(
+                "output_writer_threads", DEFAULT_OUTPUT_WRITER_THREADS, int))
+        return _writer
+
+
+@contextmanager
+def deferred_writes(record_only=False):
+    """
+    Within the block, save_output calls of this thread queue their image on
+    the shared OutputWriter instead of saving it, and the block's list
+    collects (path, Future) pairs. With record_only (a process-pool worker,
+    see processing.offload) the list collects (image, path, params) requests
+    for the calling process to queue with queue_writes.
+    """
+    previous = getattr(_deferred, "state", None)
+    writes = []
+    _deferred.state = (writes, record_only)
+    try:
+        yield writes
+    finally:
+        _deferred.state = previous
+
+
+def deferring_writes():
+    """True when save_output in this thread queues instead of saving"""
+    state = getattr(_deferred, "state", None)
+    return state is not None and (state[1] or get_output_writer() is not None)
+
+
+def queue_writes(requests):
+    """Queue (image, path, params) requests recorded by deferred_writes(record_only=True)"""
+    writes = _deferred.state[0]
+    writer = get_output_writer()
+    for image, path, params in requests:
+        writes.append((path, writer.submit(image, path, **params)))
+
+
+def save_output(image, path, lang="English", encoding=None):
+    """
+    Save an output image with an encoding profile (see encode_output, which
+    may change the extension) and return the status line for it. Inside
+    deferred_writes the image is queued and the status says so; otherwise it
+    is saved now with atomic_save.
+    """
+    messages = lang_labels[lang]
+    try:
+        image, path, params = encode_output(image, path, encoding)
+        if deferring_writes():
+            writes, record_only = _deferred.state
+            if record_only:
+                writes.append((image, path, params))
+            else:
+                writes.append((path, get_output_writer().submit(image, path, **params)))
+            return messages["save_queued"].format(path)
+        atomic_save(image, path, **params)
+        return messages["save_success"].format(path)
+    except Exception as e:
+        return messages["save_failed"].format(str(e))
+
+
+def finish_writes(status, writes, lang="English"):
+    """Wait for the (path, Future) writes of a status and replace its queued lines with the outcome"""
+    messages = lang_labels[lang]
+    for path, future in writes:
+        try:
+            future.result()
+            outcome = messages["save_success"].format(path)
+        except Exception as e:
+            outcome = messages["save_failed"].format(f"{path}: {e}")
+        status = status.replace(messages["save_queued"].format(path), outcome)
+    return status
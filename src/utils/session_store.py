@@ -0,0 +1,83 @@
+import time
+import threading
+from collections import OrderedDict
+from .config import get_setting
+
+# Defaults overridable with the session_store_bytes and session_ttl (seconds) settings
+DEFAULT_SESSION_STORE_BYTES = 1024 * 1024 * 1024
+DEFAULT_SESSION_TTL = 3600
+
+
+class SessionStore:
+    """
+    Results kept per user session, keyed by Gradio's session hash.
+
+    Tools are shared by every user of the server, so anything a later event
+    of the same user needs (e.g. GLCM maps for Save) lives here instead of on
+    the tool. Entries expire `ttl` seconds after their last use, and the least
+    recently used sessions are dropped once the stored values exceed
+    `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_SESSION_STORE_BYTES, ttl=DEFAULT_SESSION_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def session_key(request):
+        """Session hash of a gr.Request, or None outside of a Gradio event"""
+        return getattr(request, "session_hash", None)
+
+    def get(self, session):
+        """Return the value stored for `session`, or None if absent or expired"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(session)
+            if entry is None:
+                return None
+            self._entries.move_to_end(session)
+            value, nbytes, _ = entry
+            self._entries[session] = (value, nbytes, time.monotonic())
+            return value
+
+    def put(self, session, value, nbytes):
+        with self._lock:
+            self._drop(session)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[session] = (value, nbytes, time.monotonic())
+            self.current_bytes += nbytes
+            self._expire()
+            while self.current_bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def pop(self, session):
+        with self._lock:
+            self._drop(session)
+
+    def _drop(self, session):
+        entry = self._entries.pop(session, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl
+        while self._entries:
+            session, (_, _, last_used) = next(iter(self._entries.items()))
+            if last_used >= deadline:
+                break
+            self._drop(session)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def create_session_store():
+    """SessionStore with the limits from the session_store_bytes / session_ttl settings"""
+    return SessionStore(
+        get_setting("session_store_bytes", DEFAULT_SESSION_STORE_BYTES, int),
+        get_setting("session_ttl", DEFAULT_SESSION_TTL, float)
+    )
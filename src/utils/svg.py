@@ -0,0 +1,75 @@
+import os
+import sys
+from functools import lru_cache
+from PIL import Image
+from .image_cache import ImageCache, image_cache
+
+# Long side used when an SVG is rasterized only to be displayed
+SVG_PREVIEW_SIZE = 1024
+
+# cairo ARGB32 pixels are native-endian premultiplied words
+_CAIRO_RAW_MODE = "BGRa" if sys.byteorder == "little" else "aRGB"
+
+
+class _SizeContext:
+    """Minimal stand-in for a cairosvg surface when resolving the root size"""
+    dpi = 96
+    font_size = 16  # 12pt at 96 dpi
+    context_width = None
+    context_height = None
+
+
+@lru_cache(maxsize=1024)
+def _svg_size(path, mtime_ns, file_size):
+    from cairosvg.parser import Tree
+    from cairosvg.helpers import node_format
+    width, height, _ = node_format(_SizeContext, Tree(url=path))
+    return width, height
+
+
+def svg_size(path):
+    """Intrinsic (width, height) of an SVG in CSS pixels at 96 dpi"""
+    stat = os.stat(path)
+    return _svg_size(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _render_svg(path, output_width=None, output_height=None):
+    from cairosvg.parser import Tree
+    from cairosvg.surface import PNGSurface
+    # Rendering without an output keeps the pixels in the cairo surface, so
+    # no PNG is encoded and decoded on the way to PIL
+    surface = PNGSurface(Tree(url=path), None, 96,
+                         output_width=output_width, output_height=output_height,
+                         background_color="white")
+    cairo_surface = surface.cairo
+    cairo_surface.flush()
+    image = Image.frombuffer("RGBA", (surface.width, surface.height),
+                             bytes(cairo_surface.get_data()), "raw",
+                             _CAIRO_RAW_MODE, cairo_surface.get_stride(), 1)
+    return image.convert("RGB")
+
+
+def rasterize_svg(path, output_width=None, output_height=None):
+    """
+    Render an SVG on a white background to an RGB image.
+
+    With one output side given the other follows the aspect ratio; with none
+    the intrinsic size is used. Rasters are cached in the shared image cache
+    per (file, mtime, output size) and must be treated as read-only.
+    """
+    output_width = int(round(output_width)) if output_width else None
+    output_height = int(round(output_height)) if output_height else None
+    key = ImageCache.make_key(path, ("svg", output_width, output_height))
+    image = image_cache.lookup(key)
+    if image is None:
+        image = _render_svg(path, output_width, output_height)
+        image_cache.put(key, image)
+    return image
+
+
+def rasterize_svg_to_fit(path, long_side):
+    """Render an SVG so that its longer side is `long_side` pixels"""
+    width, height = svg_size(path)
+    if width >= height:
+        return rasterize_svg(path, output_width=long_side)
+    return rasterize_svg(path, output_height=long_side)
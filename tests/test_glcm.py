@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.processing import glcm
+from src.processing.glcm import (GLCM_FEATURES, ANGLE_MAP, quantize_gray_levels,
+                                 glcm_window_features, glcm_window_features_parallel,
+                                 glcm_window_features_reference)
+
+
+def _test_image(height=56, width=48):
+    """Random texture with a flat band, so constant windows (correlation 1) are covered"""
+    image = np.random.default_rng(0).integers(0, 256, (height, width), dtype=np.uint8)
+    image[:20, :20] = 128
+    return image
+
+
+@pytest.mark.parametrize("distance", [1, 2, 3])
+@pytest.mark.parametrize("symmetric", [True, False])
+@pytest.mark.parametrize("normalize", [True, False])
+def test_vectorized_matches_reference(distance, symmetric, normalize):
+    image = _test_image()
+    angles_rad = list(ANGLE_MAP.values())
+    levels = 16
+    expected = glcm_window_features_reference(image, distance, angles_rad, levels, symmetric,
+                                              normalize, GLCM_FEATURES)
+    actual = glcm_window_features(quantize_gray_levels(image, levels), distance, angles_rad,
+                                  levels, symmetric, GLCM_FEATURES)
+    for name in GLCM_FEATURES:
+        assert np.allclose(actual[name], expected[name]), name
+
+
+@pytest.mark.parametrize("angle", list(ANGLE_MAP))
+def test_vectorized_matches_reference_per_angle(angle):
+    image = _test_image()
+    angles_rad = [ANGLE_MAP[angle]]
+    expected = glcm_window_features_reference(image, 1, angles_rad, 8, True, True,
+                                              GLCM_FEATURES, window_size=8, step_size=4)
+    actual = glcm_window_features(quantize_gray_levels(image, 8), 1, angles_rad, 8, True,
+                                  GLCM_FEATURES, window_size=8, step_size=4)
+    for name in GLCM_FEATURES:
+        assert np.allclose(actual[name], expected[name]), name
+
+
+def test_chunks_smaller_than_a_window_row(monkeypatch):
+    # Three windows per chunk, so every window row is split
+    monkeypatch.setattr(glcm, "MAX_GLCM_CHUNK_CELLS", 16 * 16 * 3)
+    image = _test_image()
+    angles_rad = list(ANGLE_MAP.values())
+    expected = glcm_window_features_reference(image, 1, angles_rad, 16, True, True,
+                                              GLCM_FEATURES, window_size=8, step_size=4)
+    actual = glcm_window_features(quantize_gray_levels(image, 16), 1, angles_rad, 16, True,
+                                  GLCM_FEATURES, window_size=8, step_size=4)
+    for name in GLCM_FEATURES:
+        assert np.allclose(actual[name], expected[name]), name
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_is_bit_identical(monkeypatch, workers):
+    # Small chunks, so the image is split into many bands
+    monkeypatch.setattr(glcm, "MAX_GLCM_CHUNK_CELLS", 32 * 32 * 20)
+    quantized = quantize_gray_levels(_test_image(200, 160), 32)
+    angles_rad = list(ANGLE_MAP.values())
+    expected = glcm_window_features_parallel(quantized, 2, angles_rad, 32, True, GLCM_FEATURES,
+                                             window_size=12, step_size=4, workers=1)
+    actual = glcm_window_features_parallel(quantized, 2, angles_rad, 32, True, GLCM_FEATURES,
+                                           window_size=12, step_size=4, workers=workers)
+    for name in GLCM_FEATURES:
+        assert np.array_equal(actual[name], expected[name]), name